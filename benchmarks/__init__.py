@@ -0,0 +1,14 @@
+"""Benchmarks for myapp hot paths.
+
+Run a single benchmark from the repository root with::
+
+    python -m benchmarks.bench_discovery
+
+Run the whole suite headless, store a baseline and check a later run
+against it with::
+
+    python -m benchmarks save
+    python -m benchmarks compare
+
+``compare`` exits with status 1 when a metric regressed, see suite.py.
+"""
@@ -0,0 +1,57 @@
+import os
+import time
+import typing
+
+PLUGIN_MANIFEST = """[plugin]
+Name={name}
+Module={name}.py
+ThreadedImport=true
+Resources=["{name}.js", "{name}.css"]
+"""
+
+PLUGIN_MODULE = """
+def activate():
+    pass
+
+
+def deactivate():
+    pass
+"""
+
+
+def makePlugins(directory: str, count: int, prefix: str = "bench") -> typing.List[str]:
+    """Create count synthetic plugins, each in its own sub directory."""
+    names = []
+    for i in range(count):
+        name = "{}{:04d}".format(prefix, i)
+        plugin_dir = os.path.join(directory, name)
+        os.makedirs(plugin_dir, exist_ok=True)
+        with open(os.path.join(plugin_dir, name + ".plugin"), "w") as f:
+            f.write(PLUGIN_MANIFEST.format(name=name))
+        with open(os.path.join(plugin_dir, name + ".py"), "w") as f:
+            f.write(PLUGIN_MODULE)
+        for ext in (".js", ".css"):
+            with open(os.path.join(plugin_dir, name + ext), "w") as f:
+                f.write("/* {} */\n".format(name))
+        names.append(name)
+
+    return names
+
+
+def timed(func: typing.Callable, repeat: int = 5) -> float:
+    """Best wall time of func over repeat runs, in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+
+def report(title: str, results: dict) -> None:
+    print(title)
+    for key, value in results.items():
+        print("  {:<40} {:>10.3f}".format(key, value))
@@ -0,0 +1,112 @@
+"""Loading plugins: unpacked directories vs single-file zip archives.
+
+Counts the files opened under the plugin directory while discovering,
+importing and reading the resources of every plugin.
+"""
+import os
+import sys
+import time
+import zipfile
+import marshal
+import tempfile
+import importlib.util
+
+from myapp.pluginindex import PluginIndex
+from myapp.pluginscheduler import PluginScheduler
+from myapp.pluginarchive import readFile
+
+from ._common import PLUGIN_MANIFEST, report
+
+PLUGIN_MODULE = """
+from .helpers import greeting
+
+
+def activate():
+    greeting()
+"""
+
+HELPERS_MODULE = """
+def greeting():
+    return "hello"
+"""
+
+_opened = []
+
+
+def _audit(event, args):
+    if event == "open" and isinstance(args[0], str):
+        _opened.append(args[0])
+
+
+def pluginFiles(name: str, bytecode: bool = False) -> dict:
+    files = {
+        name + ".plugin": PLUGIN_MANIFEST.format(name=name).encode(),
+        name + ".js": "/* {} */\n".format(name).encode(),
+        name + ".css": "/* {} */\n".format(name).encode(),
+    }
+    for module, source in ((name, PLUGIN_MODULE), ("helpers", HELPERS_MODULE)):
+        files[module + ".py"] = source.encode()
+        if bytecode:
+            code = compile(source, module + ".py", "exec", dont_inherit=True)
+            files[module + ".pyc"] = (importlib.util.MAGIC_NUMBER + b"\0" * 12
+                                      + marshal.dumps(code))
+
+    return files
+
+
+def makePluginDirs(directory: str, names) -> None:
+    for name in names:
+        plugin_dir = os.path.join(directory, name)
+        os.makedirs(plugin_dir)
+        for filename, data in pluginFiles(name).items():
+            with open(os.path.join(plugin_dir, filename), "wb") as f:
+                f.write(data)
+
+
+def makePluginArchives(directory: str, names, bytecode: bool = False) -> None:
+    os.makedirs(directory)
+    for name in names:
+        with zipfile.ZipFile(os.path.join(directory, name + ".zip"), "w") as archive:
+            for filename, data in pluginFiles(name, bytecode).items():
+                archive.writestr(filename, data)
+
+
+def loadAll(directory: str) -> None:
+    infos = PluginIndex().update([directory])
+    scheduler = PluginScheduler(infos)
+    scheduler.run(lambda name, module: module.activate())
+    assert not scheduler.errors, scheduler.errors
+    for info in infos:
+        for resource in info.resources():
+            assert readFile(resource) is not None
+
+
+def measure(directory: str) -> tuple:
+    del _opened[:]
+    start = time.perf_counter()
+    loadAll(directory)
+    elapsed = (time.perf_counter() - start) * 1000
+    opened = sum(1 for path in _opened if path.startswith(directory))
+    return elapsed, opened
+
+
+def run(count: int = 200) -> dict:
+    sys.addaudithook(_audit)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        variants = (("directories", lambda d, names: makePluginDirs(d, names)),
+                    ("archives", lambda d, names: makePluginArchives(d, names)),
+                    ("archives with bytecode", lambda d, names: makePluginArchives(d, names, True)))
+        for i, (label, make) in enumerate(variants):
+            directory = os.path.join(tmp, "plugins{}".format(i))
+            os.makedirs(directory)
+            make(os.path.join(directory, "p"), ["arch{}_{:04d}".format(i, n) for n in range(count)])
+            elapsed, opened = measure(directory)
+            results["{}, load (ms)".format(label)] = elapsed
+            results["{}, files opened".format(label)] = opened
+
+    return results
+
+
+if __name__ == "__main__":
+    report("plugin loading, 200 plugins", run())
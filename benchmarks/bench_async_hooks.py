@@ -0,0 +1,55 @@
+"""Plugin hooks doing I/O: sync hooks blocking the GUI thread vs async hooks
+scheduled concurrently on the asyncio loop run by the Qt event loop."""
+import sys
+import time
+import asyncio
+
+from PyQt5.QtCore import QCoreApplication
+
+from myapp import asyncloop
+from myapp.hooks import HookTable
+
+from ._common import report
+
+PLUGINS = 20
+IO_TIME = 0.02
+
+
+class SyncPlugin:
+    def loadFinished(self, page):
+        time.sleep(IO_TIME)
+
+
+class AsyncPlugin:
+    async def loadFinished(self, page):
+        await asyncio.sleep(IO_TIME)
+
+
+def dispatch(plugin, plugins: int) -> tuple:
+    """(ms the GUI thread is blocked in dispatch, ms until every hook is done)."""
+    table = HookTable(budget=1000)
+    for i in range(plugins):
+        table.register("plugin{}".format(i), plugin)
+
+    start = time.perf_counter()
+    tasks = table.dispatch("loadFinished", None)
+    blocked = (time.perf_counter() - start) * 1000
+    asyncloop.driver().wait(tasks)
+    return blocked, (time.perf_counter() - start) * 1000
+
+
+def run(plugins: int = PLUGINS) -> dict:
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    syncBlocked, syncTotal = dispatch(SyncPlugin(), plugins)
+    asyncBlocked, asyncTotal = dispatch(AsyncPlugin(), plugins)
+    del app
+    return {
+        "sync hooks, GUI thread blocked (ms)": syncBlocked,
+        "sync hooks, all done (ms)": syncTotal,
+        "async hooks, GUI thread blocked (ms)": asyncBlocked,
+        "async hooks, all done (ms)": asyncTotal,
+    }
+
+
+if __name__ == "__main__":
+    report("loadFinished hooks, {} plugins doing {:.0f} ms of I/O".format(PLUGINS, IO_TIME * 1000), run())
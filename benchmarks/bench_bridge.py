@@ -0,0 +1,80 @@
+"""Bridge calls: one message per call vs batched messages, and blocking
+handlers on the GUI thread vs the bridge thread pool.
+
+The javascript side is simulated by sending the JSON messages the client
+would send, so this runs without QtWebEngine.
+"""
+import sys
+import json
+import time
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop
+
+from myapp.bridge import Bridge, BridgeRegistry
+
+from ._common import report
+
+CALLS = 500
+BLOCKING_CALLS = 40
+IO_TIME = 0.005
+
+
+def add(a, b):
+    return a + b
+
+
+def slowRead(n):
+    time.sleep(IO_TIME)
+    return n
+
+
+def roundTrip(bridge: Bridge, messages: list, expected: int) -> float:
+    """Send messages and run the event loop until expected replies arrived, in ms."""
+    received = []
+    loop = QEventLoop()
+
+    def resolved(message):
+        received.extend(json.loads(message))
+        if len(received) >= expected:
+            loop.quit()
+
+    bridge.resolved.connect(resolved)
+    start = time.perf_counter()
+    for message in messages:
+        bridge.call(message)
+    if len(received) < expected:
+        loop.exec_()
+    elapsed = (time.perf_counter() - start) * 1000
+    bridge.resolved.disconnect(resolved)
+    return elapsed
+
+
+def run(calls: int = CALLS, blockingCalls: int = BLOCKING_CALLS) -> dict:
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    methods = BridgeRegistry(workers=8)
+    methods.expose("math.add", add)
+    methods.expose("io.inline", slowRead)
+    methods.expose("io.pooled", slowRead, blocking=True)
+    bridge = Bridge(methods)
+
+    single = [json.dumps([[i, "math.add", [i, 1]]]) for i in range(calls)]
+    batched = [json.dumps([[i, "math.add", [i, 1]] for i in range(calls)])]
+    inline = [json.dumps([[i, "io.inline", [i]] for i in range(blockingCalls)])]
+    pooled = [json.dumps([[i, "io.pooled", [i]] for i in range(blockingCalls)])]
+
+    results = {
+        "{} calls, one message each (ms)".format(calls): roundTrip(bridge, single, calls),
+        "{} calls, one batch (ms)".format(calls): roundTrip(bridge, batched, calls),
+        "{} blocking calls, GUI thread (ms)".format(blockingCalls):
+            roundTrip(bridge, inline, blockingCalls),
+        "{} blocking calls, thread pool (ms)".format(blockingCalls):
+            roundTrip(bridge, pooled, blockingCalls),
+        "math.add p50 latency (us)": methods.stats()["math.add"]["p50"] * 1e6,
+    }
+    methods.shutdown()
+    del app
+    return results
+
+
+if __name__ == "__main__":
+    report("bridge calls", run())
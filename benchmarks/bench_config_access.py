@@ -0,0 +1,73 @@
+"""Config reads and writes on a large tree: get of present and missing keys,
+compiled accessors, set, defaults set in the plugins layer, and save."""
+import os
+import tempfile
+
+from myapp.config import Configuration
+
+from ._common import timed, report
+
+PLUGINS = 5000
+LOOKUPS = 20000
+
+
+def makeConfig(directory: str, plugins: int) -> Configuration:
+    path = os.path.join(directory, "myapp.yml")
+    with open(path, "w") as f:
+        f.write("pluginManager:\n  lazy: true\nplugins:\n")
+        for i in range(plugins):
+            f.write("  bench{:04d}:\n    enabled: true\n    options:\n"
+                    "      size: {}\n      name: plugin {}\n".format(i, i, i))
+
+    return Configuration(path)
+
+
+def run(plugins: int = PLUGINS, lookups: int = LOOKUPS) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        configuration = makeConfig(tmp, plugins)
+        keys = ["plugins.bench{:04d}.options.size".format(i % plugins) for i in range(lookups)]
+        missing = ["plugins.bench{:04d}.options.color".format(i % plugins) for i in range(lookups)]
+        accessor = configuration.accessor("pluginManager.lazy")
+
+        def get():
+            for key in keys:
+                configuration.get(key)
+
+        def getMissing():
+            for key in missing:
+                configuration.get(key, "red")
+
+        def getAccessor():
+            for _ in range(lookups):
+                accessor.get(False)
+
+        def set():
+            for i, key in enumerate(keys[:1000]):
+                configuration.set(key, i)
+
+        def getAfterSet():
+            # a set only invalidates the memoized keys along its path
+            for i, key in enumerate(keys[:1000]):
+                configuration.set(key, i)
+                configuration.get(keys[-1 - i])
+                configuration.get("pluginManager.lazy")
+
+        def setDefaults():
+            for i in range(plugins):
+                configuration.setDefaults("extra{:04d}".format(i), {"enabled": True})
+
+        results["get, {} keys (ms)".format(lookups)] = timed(get)
+        results["get missing, {} keys (ms)".format(lookups)] = timed(getMissing)
+        results["accessor get, {} reads (ms)".format(lookups)] = timed(getAccessor)
+        results["set, 1000 keys (ms)"] = timed(set)
+        results["set + 2 gets, 1000 keys (ms)"] = timed(getAfterSet)
+        results["plugin defaults, {} keys (ms)".format(plugins)] = timed(setDefaults)
+        results["save (ms)"] = timed(configuration.save)
+        results["saved file (KiB)"] = os.path.getsize(configuration.loadFrom) / 1024
+
+    return results
+
+
+if __name__ == "__main__":
+    report("config access, {} plugins".format(PLUGINS), run())
@@ -0,0 +1,59 @@
+"""Config loading: pure Python yaml vs libyaml and the parsed-config cache."""
+import os
+import tempfile
+
+import yaml
+
+from myapp import config as configmodule
+from myapp.config import Configuration
+
+from ._common import timed, report
+
+
+def makeConfigFile(directory: str, plugins: int) -> str:
+    path = os.path.join(directory, "myapp.yml")
+    with open(path, "w") as f:
+        f.write("pluginManager:\n  lazy: true\nplugins:\n")
+        for i in range(plugins):
+            f.write("  bench{:04d}:\n    enabled: true\n    options:\n"
+                    "      width: {}\n      label: plugin {}\n".format(i, i, i))
+
+    return path
+
+
+def run(plugins: int = 5000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = makeConfigFile(tmp, plugins)
+
+        def pureYaml():
+            with open(path) as f:
+                yaml.safe_load(f.read())
+
+        def libyaml():
+            with open(path) as f:
+                configmodule.parseYaml(f)
+
+        def coldCache():
+            configmodule._parsedFiles.clear()
+            cache_path = configmodule._cachePath(path)
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            Configuration(path)
+
+        def diskCache():
+            configmodule._parsedFiles.clear()
+            Configuration(path)
+
+        configuration = Configuration(path)
+
+        return {
+            "yaml.safe_load (ms)": timed(pureYaml),
+            "CSafeLoader (ms)": timed(libyaml),
+            "Configuration, no cache (ms)": timed(coldCache),
+            "Configuration, binary cache (ms)": timed(diskCache),
+            "loadConfig(key), in memory (ms)": timed(lambda: configuration.loadConfig("pluginManager")),
+        }
+
+
+if __name__ == "__main__":
+    report("config loading, 5000 plugin entries", run())
@@ -0,0 +1,66 @@
+"""Config writes: save per set vs transactions and debounced autosave."""
+import os
+import time
+import tempfile
+
+from myapp.config import Configuration
+
+from ._common import report
+
+
+class CountingConfiguration(Configuration):
+    writes = 0
+
+    def _writeFile(self, path, data):
+        CountingConfiguration.writes += 1
+        super()._writeFile(path, data)
+
+
+def makeConfig(directory: str, plugins: int) -> CountingConfiguration:
+    path = os.path.join(directory, "myapp.yml")
+    with open(path, "w") as f:
+        f.write("plugins:\n")
+        for i in range(plugins):
+            f.write("  bench{:04d}:\n    enabled: true\n".format(i))
+
+    return CountingConfiguration(path)
+
+
+def run(plugins: int = 1000, changes: int = 50) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        configuration = makeConfig(tmp, plugins)
+        keys = ["plugins.bench{:04d}.enabled".format(i % plugins) for i in range(changes)]
+
+        CountingConfiguration.writes = 0
+        start = time.perf_counter()
+        for key in keys:
+            configuration.set(key, False)
+            configuration.save()
+        results["save per set (ms)"] = (time.perf_counter() - start) * 1000
+        results["save per set (writes)"] = CountingConfiguration.writes
+
+        CountingConfiguration.writes = 0
+        start = time.perf_counter()
+        with configuration.transaction():
+            for key in keys:
+                configuration.set(key, True)
+        configuration.save()
+        results["transaction + save (ms)"] = (time.perf_counter() - start) * 1000
+        results["transaction + save (writes)"] = CountingConfiguration.writes
+
+        configuration.setAutosave(True, 0.05)
+        CountingConfiguration.writes = 0
+        start = time.perf_counter()
+        for key in keys:
+            configuration.set(key, False)
+        results["autosave, GUI thread time (ms)"] = (time.perf_counter() - start) * 1000
+        configuration.flush()
+        results["autosave (writes)"] = CountingConfiguration.writes
+        configuration.setAutosave(False)
+
+    return results
+
+
+if __name__ == "__main__":
+    report("config writes, 1000 plugins, 50 changes", run())
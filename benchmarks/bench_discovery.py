@@ -0,0 +1,60 @@
+"""Plugin discovery: legacy directory walk vs the persistent plugin index."""
+import os
+import tempfile
+
+from myapp.utils import findFiles
+from myapp.pluginindex import PluginIndex, PluginInfo
+
+from ._common import makePlugins, timed, report
+
+
+def legacyScan(directories):
+    identities_paths = []
+    for directory in directories:
+        identities_paths += findFiles("*.plugin", directory)
+
+    return [PluginInfo(f) for f in identities_paths]
+
+
+def run(count: int = 1000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        plugins_dir = os.path.join(tmp, "plugins")
+        names = makePlugins(plugins_dir, count)
+        index_path = os.path.join(tmp, "index.json")
+        dirs = [plugins_dir]
+
+        def coldIndex():
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            index = PluginIndex(index_path)
+            index.update(dirs)
+            index.save()
+
+        def warmIndex():
+            PluginIndex(index_path).update(dirs)
+
+        index = PluginIndex(index_path)
+        index.update(dirs)
+
+        def legacyLookup():
+            name = names[-1]
+            for info in legacyScan(dirs):
+                if info.get("plugin", "Name") == name:
+                    return info
+
+        def indexLookup():
+            return index.find(names[-1])
+
+        results = {
+            "legacy scan (ms)": timed(lambda: legacyScan(dirs)),
+            "index cold scan (ms)": timed(coldIndex),
+            "index warm scan (ms)": timed(warmIndex),
+            "legacy _loadPlugin lookup (ms)": timed(legacyLookup),
+            "index _loadPlugin lookup (ms)": timed(indexLookup),
+        }
+
+    return results
+
+
+if __name__ == "__main__":
+    report("plugin discovery, 1000 plugins", run())
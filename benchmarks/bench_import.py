@@ -0,0 +1,28 @@
+"""Import time of the application, see importtime.py for the breakdown by
+module. myapp.MyApplication imports QtWebEngine when the application is
+created, not when it's imported."""
+from .importtime import measureImport
+from ._common import report
+
+CORE = "myapp.config, myapp.bridge, myapp.hooks, myapp.pluginscheduler, myapp.pluginindex"
+# imported on demand only, none of them may be imported by CORE
+LAZY = ("yaml", "asyncio", "zipfile", "multiprocessing")
+
+
+def run(repeat: int = 5) -> dict:
+    results = {}
+    records, total, error = measureImport(CORE, repeat)
+    if not error:
+        results["import core modules (ms)"] = total / 1000
+        imported = {record.name for record in records}
+        results["eager imports of lazy modules"] = len(imported & set(LAZY))
+
+    records, total, error = measureImport("myapp.MyApplication", repeat)
+    if not error:
+        results["import myapp.MyApplication (ms)"] = total / 1000
+
+    return results
+
+
+if __name__ == "__main__":
+    report("import time, best of 5", run())
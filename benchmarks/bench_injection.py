@@ -0,0 +1,59 @@
+"""Script injection: building QWebEngineScripts from plugin resources, from
+disk and from the script cache, and installing them in a page. Needs
+QtWebEngine, nothing is measured without it."""
+import os
+import sys
+import tempfile
+
+from ._common import timed, report
+
+RESOURCES = 200
+
+
+def run(resources: int = RESOURCES) -> dict:
+    try:
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineScript
+        from myapp.WebView import _createWebengineScript, installScript, scriptCache
+    except ImportError:
+        return {}
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(resources):
+            path = os.path.join(tmp, "resource{:04d}.{}".format(i, "js" if i % 2 else "css"))
+            with open(path, "w") as f:
+                f.write("/* resource {} */\n".format(i) * 64)
+            paths.append(path)
+
+        def build():
+            for path in paths:
+                _createWebengineScript(path, os.path.basename(path), QWebEngineScript.DocumentReady,
+                                       path.endswith(".css"))
+
+        def cold():
+            for path in paths:
+                scriptCache.invalidate(path)
+            build()
+
+        def install():
+            page = QWebEnginePage()
+            scripts = page.scripts()
+            for path in paths:
+                installScript(scripts, path, os.path.basename(path), QWebEngineScript.DocumentReady,
+                              path.endswith(".css"))
+            page.deleteLater()
+
+        results["build from disk (ms)"] = timed(cold)
+        build()
+        results["build from the cache (ms)"] = timed(build)
+        results["install in a new page (ms)"] = timed(install)
+
+    del app
+    return results
+
+
+if __name__ == "__main__":
+    report("script injection, {} resources".format(RESOURCES), run())
@@ -0,0 +1,73 @@
+"""Time the logging thread spends reporting messages: print vs the queued
+myapp loggers, with stdout consumed slowly like a pipe to a log collector,
+and how many lines the rate limiting lets through."""
+import sys
+import time
+import logging
+
+from myapp import log
+
+from ._common import timed, report
+
+MESSAGES = 2000
+# time a write to the slow stdout blocks, like a full pipe being drained
+WRITE_DELAY = 0.00005
+
+
+class SlowStream:
+    def __init__(self, delay: float = WRITE_DELAY):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        self.lines += text.count("\n")
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def run(messages: int = MESSAGES) -> dict:
+    results = {}
+    stdout = sys.stdout
+    stream = SlowStream()
+    logger = logging.getLogger("myapp.bench")
+    try:
+        sys.stdout = stream
+
+        start = time.perf_counter()
+        for i in range(messages):
+            print(f"plugin bench{i:04d} loaded")
+        results["print, caller (ms)"] = (time.perf_counter() - start) * 1000
+
+        log.setup({"level": "info", "rateLimit": False})
+        start = time.perf_counter()
+        for i in range(messages):
+            logger.info("plugin bench%04d loaded", i)
+        results["queued logging, caller (ms)"] = (time.perf_counter() - start) * 1000
+        log.shutdown()
+        results["queued logging, all written (ms)"] = (time.perf_counter() - start) * 1000
+
+        log.setup({"level": "info"})
+        stream.lines = 0
+        for i in range(messages):
+            logger.warning("function %s not removed from signal", i)
+        log.shutdown()
+        results["{} repeated warnings, lines written".format(messages)] = stream.lines
+
+        def disabled():
+            for i in range(messages):
+                logger.debug("plugin bench%04d loaded", i)
+
+        results["{} disabled debug calls (ms)".format(messages)] = timed(disabled)
+    finally:
+        sys.stdout = stdout
+        log.setup({"level": "info", "stream": "none"})
+        log.shutdown()
+
+    return results
+
+
+if __name__ == "__main__":
+    report("logging {} messages to a slow stdout".format(MESSAGES), run())
@@ -0,0 +1,112 @@
+"""PluginManager with synthetic plugins: discovery and load when the plugin
+directory is registered, and page events fanned out to every plugin through
+_beforeLoad, _loadStarted and _loadFinished. Needs QtWebEngine, nothing is
+measured without it."""
+import os
+import sys
+import time
+import tempfile
+
+from ._common import timed, report
+
+PLUGINS = 200
+EVENTS = 50
+
+PLUGIN_MANIFEST = """[plugin]
+Name={name}
+Module={name}.py
+ThreadedImport=true
+Hooks=beforeLoad,loadStarted,loadFinished
+"""
+
+PLUGIN_MODULE = """
+calls = 0
+
+
+def activate():
+    pass
+
+
+def deactivate():
+    pass
+
+
+def beforeLoad(channel, page):
+    global calls
+    calls += 1
+
+
+def loadStarted(page):
+    global calls
+    calls += 1
+
+
+def loadFinished(page):
+    global calls
+    calls += 1
+"""
+
+
+def makePlugins(directory: str, count: int) -> list:
+    names = []
+    for i in range(count):
+        name = "hooked{:04d}".format(i)
+        os.makedirs(os.path.join(directory, name))
+        with open(os.path.join(directory, name, name + ".plugin"), "w") as f:
+            f.write(PLUGIN_MANIFEST.format(name=name))
+        with open(os.path.join(directory, name, name + ".py"), "w") as f:
+            f.write(PLUGIN_MODULE)
+        names.append(name)
+
+    return names
+
+
+def run(plugins: int = PLUGINS, events: int = EVENTS) -> dict:
+    try:
+        from PyQt5.QtCore import Qt
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401
+        from myapp.MyApplication import MyApplication
+    except ImportError:
+        return {}
+
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            names = makePlugins(os.path.join(tmp, "plugins"), plugins)
+            with open(os.path.join(tmp, "myapp.yml"), "w") as f:
+                f.write("windowPool:\n  size: 0\nplugins:\n")
+                for name in names:
+                    f.write("  {}:\n    enabled: true\n".format(name))
+
+            QApplication.setAttribute(Qt.AA_ShareOpenGLContexts, True)
+            app = MyApplication(sys.argv[:1])
+            manager = app.pluginManager
+
+            start = time.perf_counter()
+            app.registerPluginDir(os.path.join(tmp, "plugins"))
+            results["discover and load, cold index (ms)"] = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            manager._discoverPlugins()
+            results["discover, warm index (ms)"] = (time.perf_counter() - start) * 1000
+
+            def fanOut():
+                for _ in range(events):
+                    manager._beforeLoad(None, None)
+                    manager._loadStarted(None)
+                    manager._loadFinished(None)
+
+            results["{} page loads fanned out (ms)".format(events)] = timed(fanOut)
+            manager.shutdown()
+            del app
+        finally:
+            os.chdir(cwd)
+
+    return results
+
+
+if __name__ == "__main__":
+    report("plugin manager, {} plugins".format(PLUGINS), run())
@@ -0,0 +1,110 @@
+"""Cold vs warm page loads through a profile configured by ProfileManager.
+
+A local HTTP server serves a page with cacheable assets. The cold load uses
+an empty profile storage, the warm load a new profile on the same storage,
+like the next launch of the application. Needs QtWebEngine, nothing is
+measured without it."""
+import os
+import sys
+import time
+import tempfile
+import threading
+import http.server
+import functools
+
+from ._common import report
+
+ASSETS = 100
+ASSET_SIZE = 64 * 1024
+
+
+class CachingHandler(http.server.SimpleHTTPRequestHandler):
+    served = 0
+
+    def end_headers(self):
+        self.send_header("Cache-Control", "max-age=3600")
+        super().end_headers()
+
+    def do_GET(self):
+        CachingHandler.served += 1
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def makeSite(directory: str, assets: int = ASSETS) -> None:
+    tags = []
+    for i in range(assets):
+        name = "asset{:04d}.js".format(i)
+        with open(os.path.join(directory, name), "w") as f:
+            line = "var a{} = {};\n".format(i, i)
+            f.write(line * (ASSET_SIZE // len(line)))
+        tags.append('<script src="{}"></script>'.format(name))
+
+    with open(os.path.join(directory, "index.html"), "w") as f:
+        f.write("<html><head>{}</head><body>bench</body></html>".format("".join(tags)))
+
+
+def run(assets: int = ASSETS) -> dict:
+    try:
+        from PyQt5.QtCore import QUrl, QEventLoop, QTimer
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtWebEngineWidgets import QWebEnginePage
+        from myapp.profiles import ProfileManager
+    except ImportError:
+        return {}
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    def load(profile, url):
+        page = QWebEnginePage(profile)
+        loop = QEventLoop()
+        page.loadFinished.connect(lambda ok: loop.quit())
+        CachingHandler.served = 0
+        start = time.perf_counter()
+        page.setUrl(QUrl(url))
+        loop.exec_()
+        elapsed = (time.perf_counter() - start) * 1000
+        page.deleteLater()
+        return elapsed, CachingHandler.served
+
+    def release(manager):
+        # pages and profiles are deleted before a profile reopens the same storage
+        manager.deleteLater()
+        loop = QEventLoop()
+        QTimer.singleShot(200, loop.quit)
+        loop.exec_()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as site, tempfile.TemporaryDirectory() as storage:
+        makeSite(site, assets)
+        server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), functools.partial(CachingHandler, directory=site))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = "http://127.0.0.1:{}/index.html".format(server.server_address[1])
+
+        for cacheType in ("none", "memory", "disk"):
+            options = {cacheType: {"cacheType": cacheType,
+                                   "storagePath": os.path.join(storage, cacheType),
+                                   "cachePath": os.path.join(storage, cacheType, "cache")}}
+            # a new manager for each load is a new launch of the application
+            cold = ProfileManager(options, parent=app)
+            elapsed, served = load(cold.profile(cacheType), url)
+            results["{} cache, cold load (ms)".format(cacheType)] = elapsed
+            results["{} cache, cold requests".format(cacheType)] = served
+            release(cold)
+
+            warm = ProfileManager(options, parent=app)
+            elapsed, served = load(warm.profile(cacheType), url)
+            results["{} cache, warm load (ms)".format(cacheType)] = elapsed
+            results["{} cache, warm requests".format(cacheType)] = served
+            release(warm)
+
+        server.shutdown()
+
+    return results
+
+
+if __name__ == "__main__":
+    report("page load of {} assets of {} KiB over http".format(ASSETS, ASSET_SIZE // 1024), run())
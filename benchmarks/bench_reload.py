@@ -0,0 +1,62 @@
+"""Picking up a plugin change: reloading the changed plugin in place vs
+importing every plugin again, as a restart of the application does, and the
+time the watcher takes to report the change."""
+import os
+import sys
+import time
+import tempfile
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from myapp.pluginindex import PluginIndex
+from myapp.pluginscheduler import preparePlugin, execPlugin, unloadPluginModules
+from myapp.pluginwatcher import PluginWatcher
+
+from ._common import makePlugins, timed, report
+
+PLUGINS = 100
+
+
+def run(plugins: int = PLUGINS) -> dict:
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        names = makePlugins(tmp, plugins, prefix="reload")
+        infos = {info.name(): info for info in PluginIndex().update([tmp])}
+
+        def importAll():
+            for name in names:
+                unloadPluginModules(name)
+                execPlugin(infos[name], *preparePlugin(infos[name]))
+
+        def reloadOne():
+            unloadPluginModules(names[0])
+            execPlugin(infos[names[0]], *preparePlugin(infos[names[0]]))
+
+        results["import every plugin (ms)"] = timed(importAll)
+        results["reload one plugin (ms)"] = timed(reloadOne)
+
+        # without the delay collecting the notifications of a save
+        watcher = PluginWatcher(delay=0)
+        watcher.watchPlugin(names[0], os.path.join(tmp, names[0]))
+        loop = QEventLoop()
+        reported = []
+        watcher.pluginChanged.connect(
+            lambda name: (reported.append(time.perf_counter()), loop.quit()))
+        QTimer.singleShot(2000, loop.quit)
+        start = time.perf_counter()
+        with open(os.path.join(tmp, names[0], names[0] + ".py"), "a") as f:
+            f.write("\nCHANGED = True\n")
+        loop.exec_()
+        if reported:
+            results["change reported after (ms)"] = (reported[0] - start) * 1000
+
+        for name in names:
+            unloadPluginModules(name)
+
+    del app
+    return results
+
+
+if __name__ == "__main__":
+    report("plugin reload, {} plugins".format(PLUGINS), run())
@@ -0,0 +1,95 @@
+"""Serving static content: disk reads vs the app:// resource cache, and page
+load time over app:// vs file:// when QtWebEngine is available."""
+import os
+import sys
+import time
+import tempfile
+
+from myapp.resourcecache import ResourceCache
+
+from ._common import timed, report
+
+ASSETS = 200
+
+
+def makeSite(directory: str, assets: int = ASSETS) -> str:
+    """A page referencing assets small scripts and stylesheets, returns the page path."""
+    tags = []
+    for i in range(assets):
+        ext = "js" if i % 2 else "css"
+        name = "asset{:04d}.{}".format(i, ext)
+        with open(os.path.join(directory, name), "w") as f:
+            f.write("/* {} */\n".format(name) * 64)
+        if ext == "js":
+            tags.append('<script src="{}"></script>'.format(name))
+        else:
+            tags.append('<link rel="stylesheet" href="{}">'.format(name))
+
+    page = os.path.join(directory, "index.html")
+    with open(page, "w") as f:
+        f.write("<html><head>{}</head><body>bench</body></html>".format("".join(tags)))
+
+    return page
+
+
+def readFiles(paths):
+    for path in paths:
+        with open(path, "rb") as f:
+            f.read()
+
+
+def pageLoads(directory: str, loads: int = 5) -> dict:
+    """Average page load time over app:// and file://, empty if QtWebEngine can't be used."""
+    try:
+        from PyQt5.QtCore import QUrl, QEventLoop
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineProfile
+        from myapp.SchemeHandler import AppSchemeHandler, registerAppScheme
+    except ImportError:
+        return {}
+
+    registerAppScheme()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    handler = AppSchemeHandler(app)
+    handler.mount("bench", directory)
+    profile = QWebEngineProfile(app)
+    profile.installUrlSchemeHandler(b"app", handler)
+
+    def load(url):
+        page = QWebEnginePage(profile)
+        loop = QEventLoop()
+        page.loadFinished.connect(lambda ok: loop.quit())
+        start = time.perf_counter()
+        page.setUrl(QUrl(url))
+        loop.exec_()
+        elapsed = (time.perf_counter() - start) * 1000
+        page.deleteLater()
+        return elapsed
+
+    results = {}
+    for label, url in (("file:// page load (ms)", "file://" + os.path.join(directory, "index.html")),
+                       ("app:// page load (ms)", "app://bench/index.html")):
+        load(url)
+        results[label] = sum(load(url) for _ in range(loads)) / loads
+
+    return results
+
+
+def run(assets: int = ASSETS) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        makeSite(tmp, assets)
+        paths = [os.path.join(tmp, name) for name in sorted(os.listdir(tmp))]
+        cache = ResourceCache()
+        for path in paths:
+            cache.get(path)
+
+        results = {
+            "read from disk (ms)": timed(lambda: readFiles(paths)),
+            "ResourceCache hits (ms)": timed(lambda: [cache.get(path) for path in paths]),
+        }
+        results.update(pageLoads(tmp))
+        return results
+
+
+if __name__ == "__main__":
+    report("static content, {} assets".format(ASSETS), run())
@@ -0,0 +1,37 @@
+"""Cost of a tracing span, with tracing disabled and enabled."""
+from myapp import tracing
+
+from ._common import timed, report
+
+SPANS = 100000
+
+
+def run(spans: int = SPANS) -> dict:
+    def nested():
+        for _ in range(spans // 2):
+            with tracing.span("outer", "bench"):
+                with tracing.span("inner", "bench", n=1):
+                    pass
+
+    def bare():
+        for _ in range(spans // 2):
+            pass
+
+    results = {}
+    wasEnabled, path = tracing.tracer.enabled, tracing.tracer.path
+    try:
+        tracing.tracer.disable()
+        base = timed(bare)
+        results["disabled span (ns)"] = (timed(nested) - base) / spans * 1e6
+
+        tracing.tracer.enabled = True
+        results["enabled span (ns)"] = (timed(nested, repeat=3) - base) / spans * 1e6
+    finally:
+        tracing.tracer.clear()
+        tracing.tracer.enabled, tracing.tracer.path = wasEnabled, path
+
+    return results
+
+
+if __name__ == "__main__":
+    report("tracing span cost, {} spans".format(SPANS), run())
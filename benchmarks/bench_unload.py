@@ -0,0 +1,107 @@
+"""Leak check of plugin unloading: a plugin allocating memory and connecting
+a signal is imported and unloaded repeatedly, the way PluginManager enables
+and disables it, while tracemalloc attributes memory to the plugin."""
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from myapp.utils import Signal, disconnectModule
+from myapp.pluginindex import PluginIndex
+from myapp.pluginmemory import PluginMemory
+from myapp.pluginscheduler import preparePlugin, execPlugin, unloadPluginModules
+
+from ._common import timed, report
+
+CYCLES = 50
+NAME = "leakcheck"
+
+MANIFEST = """[plugin]
+Name={name}
+Module={name}.py
+"""
+
+MODULE = """from .helpers import table
+
+CACHE = [bytes(1024) for _ in range(256)]
+
+
+def onChanged(value):
+    table[value] = CACHE
+
+
+def beforeLoad(host):
+    host.changed.connect(onChanged)
+"""
+
+HELPERS = """table = {}
+"""
+
+
+class Host:
+    changed = Signal()
+
+
+def makePlugin(directory: str) -> None:
+    root = os.path.join(directory, NAME)
+    os.makedirs(root)
+    for filename, content in ((NAME + ".plugin", MANIFEST.format(name=NAME)),
+                              (NAME + ".py", MODULE), ("helpers.py", HELPERS)):
+        with open(os.path.join(root, filename), "w") as f:
+            f.write(content)
+
+
+def run(cycles: int = CYCLES) -> dict:
+    results = {}
+    memory = PluginMemory()
+    memory.start()
+    host = Host()
+    with tempfile.TemporaryDirectory() as tmp:
+        makePlugin(tmp)
+        info = PluginIndex().update([tmp])[0]
+        memory.watch(NAME, os.path.join(tmp, NAME))
+
+        def load():
+            module = execPlugin(info, *preparePlugin(info))
+            module.beforeLoad(host)
+            host.changed.emit(NAME)
+
+        def unload(disconnect=True):
+            memory.unloaded(NAME, unloadPluginModules(NAME))
+            if disconnect:
+                disconnectModule(f"myapp.plugins.{NAME}")
+
+        load()
+        results["plugin memory while loaded (KiB)"] = memory.usage(NAME)[NAME] / 1024
+        unload()
+        memory.leaked()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        for _ in range(cycles):
+            load()
+            unload()
+        results["unloaded modules leaked"] = sum(len(m) for m in memory.leaked().values())
+        results["plugin memory after unload (KiB)"] = memory.usage(NAME)[NAME] / 1024
+        results["growth over {} cycles (KiB)".format(cycles)] = max(
+            0, tracemalloc.get_traced_memory()[0] - baseline) / 1024
+
+        # the subscriber keeps the old modules alive unless it's disconnected
+        load()
+        unload(disconnect=False)
+        results["modules leaked without disconnect"] = sum(
+            len(m) for m in memory.leaked().values())
+        disconnectModule(f"myapp.plugins.{NAME}")
+        memory.leaked()
+
+        def cycle():
+            load()
+            unload()
+
+        results["load + unload (ms)"] = timed(cycle)
+
+    memory.stop()
+    return results
+
+
+if __name__ == "__main__":
+    report("plugin unload, {} enable/disable cycles".format(CYCLES), run())
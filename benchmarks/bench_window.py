@@ -0,0 +1,55 @@
+"""BrowserWindow creation and time from loadUrl to loadFinished of a local
+page. Needs QtWebEngine, nothing is measured without it."""
+import os
+import sys
+import time
+import tempfile
+
+from ._common import report
+
+WINDOWS = 5
+
+PAGE = "<html><head><title>bench</title></head><body>{}</body></html>"
+
+
+def run(windows: int = WINDOWS) -> dict:
+    try:
+        from PyQt5.QtCore import Qt, QEventLoop, QUrl
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401
+        from myapp.BrowserWindow import BrowserWindow
+    except ImportError:
+        return {}
+
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts, True)
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    created = []
+    loaded = []
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.path.join(tmp, "index.html")
+        with open(url, "w") as f:
+            f.write(PAGE.format("<p>paragraph</p>" * 500))
+
+        for _ in range(windows):
+            start = time.perf_counter()
+            window = BrowserWindow()
+            created.append((time.perf_counter() - start) * 1000)
+
+            loop = QEventLoop()
+            window.webview.loadFinished.connect(lambda ok: loop.quit())
+            start = time.perf_counter()
+            window.loadUrl(QUrl.fromLocalFile(url))
+            loop.exec_()
+            loaded.append((time.perf_counter() - start) * 1000)
+            window.close()
+            window.deleteLater()
+
+    del app
+    return {
+        "create window (ms)": sorted(created)[len(created) // 2],
+        "loadUrl to loadFinished (ms)": sorted(loaded)[len(loaded) // 2],
+    }
+
+
+if __name__ == "__main__":
+    report("browser window, median of {}".format(WINDOWS), run())
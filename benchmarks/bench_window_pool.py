@@ -0,0 +1,93 @@
+"""Time to first paint of a new window: built on demand vs prepared ahead
+by the window pool. Needs QtWebEngine, nothing is measured without it."""
+import os
+import sys
+import time
+import tempfile
+
+from ._common import report
+
+WINDOWS = 5
+
+PAGE = "<html><body><h1>first paint</h1></body></html>"
+
+# milliseconds elapsed since the first paint of the document
+SINCE_FIRST_PAINT = """
+(function() {
+  const paint = performance.getEntriesByType("paint");
+  return paint.length ? performance.now() - paint[0].startTime : -1;
+})()
+"""
+
+
+def firstPaint(window, url) -> float:
+    """Load url in window and return the wall clock time of its first paint."""
+    from PyQt5.QtCore import QEventLoop, QUrl, QTimer
+
+    loop = QEventLoop()
+    painted = []
+
+    def poll(ok=True):
+        def check(elapsed):
+            if elapsed is not None and elapsed >= 0:
+                painted.append(time.perf_counter() - elapsed / 1000)
+                loop.quit()
+            else:
+                QTimer.singleShot(5, poll)
+        window.webview.page().runJavaScript(SINCE_FIRST_PAINT, check)
+
+    window.webview.loadFinished.connect(poll)
+    window.loadUrl(QUrl.fromLocalFile(url))
+    loop.exec_()
+    window.webview.loadFinished.disconnect(poll)
+    return painted[0]
+
+
+def run(windows: int = WINDOWS) -> dict:
+    try:
+        from PyQt5.QtCore import QEventLoop, QTimer
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401
+        from myapp.BrowserWindow import BrowserWindow
+    except ImportError:
+        return {}
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.path.join(tmp, "index.html")
+        with open(url, "w") as f:
+            f.write(PAGE)
+
+        def onDemand():
+            start = time.perf_counter()
+            window = BrowserWindow()
+            window.show()
+            return (firstPaint(window, url) - start) * 1000, window
+
+        def pooled():
+            window = BrowserWindow()
+            window.prepare()
+            # idle time in which the pool warms the window
+            loop = QEventLoop()
+            QTimer.singleShot(1000, loop.quit)
+            loop.exec_()
+            start = time.perf_counter()
+            window.warming = False
+            window.show()
+            return (firstPaint(window, url) - start) * 1000, window
+
+        results = {}
+        for label, create in (("on demand", onDemand), ("from the pool", pooled)):
+            times = []
+            for _ in range(windows):
+                elapsed, window = create()
+                times.append(elapsed)
+                window.close()
+            results["window {}, first paint (ms)".format(label)] = sorted(times)[len(times) // 2]
+
+    del app
+    return results
+
+
+if __name__ == "__main__":
+    report("new window time to first paint, median of {}".format(WINDOWS), run())
@@ -0,0 +1,109 @@
+"""Round trip of hooks and bridge calls of a plugin running in a worker
+process, compared to the same plugin imported in the application."""
+import os
+import sys
+import json
+import time
+import tempfile
+
+from PyQt5.QtCore import QCoreApplication
+
+from myapp import asyncloop
+from myapp.bridge import Bridge, BridgeRegistry
+from myapp.pluginindex import PluginIndex
+from myapp.pluginprocess import WorkerPool
+from myapp.pluginscheduler import preparePlugin, execPlugin
+
+from ._common import report
+
+CALLS = 200
+
+MANIFEST = """[plugin]
+Name={name}
+Module={name}
+Isolated={isolated}
+"""
+
+MODULE = """
+from myapp import bridge
+
+
+def activate():
+    bridge.registry.expose("{name}.echo", lambda value: value, owner="{name}")
+
+
+def loadFinished(page):
+    return page
+"""
+
+
+def makePlugin(directory: str, name: str, isolated: bool) -> None:
+    plugin_dir = os.path.join(directory, name)
+    os.makedirs(plugin_dir)
+    with open(os.path.join(plugin_dir, name + ".plugin"), "w") as f:
+        f.write(MANIFEST.format(name=name, isolated="true" if isolated else "false"))
+    with open(os.path.join(plugin_dir, name + ".py"), "w") as f:
+        f.write(MODULE.format(name=name))
+
+
+def perCall(func, calls: int) -> float:
+    """Average time of an awaited call, in microseconds."""
+    driver = asyncloop.driver()
+    start = time.perf_counter()
+    for _ in range(calls):
+        result = func()
+        if result is not None and hasattr(result, "__await__"):
+            driver.wait([driver.schedule(result)])
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def bridgeRoundTrip(bridge: Bridge, method: str, calls: int) -> float:
+    """Average time of a bridge call resolved back to the page, in microseconds."""
+    from PyQt5.QtCore import QEventLoop
+
+    loop = QEventLoop()
+    bridge.resolved.connect(lambda message: loop.quit())
+    start = time.perf_counter()
+    for i in range(calls):
+        bridge.call(json.dumps([[i, method, [i]]]))
+        loop.exec_()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(calls: int = CALLS) -> dict:
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    from myapp import bridge as bridgemodule
+
+    with tempfile.TemporaryDirectory() as tmp:
+        makePlugin(tmp, "benchlocal", False)
+        makePlugin(tmp, "benchworker", True)
+        index = PluginIndex()
+        index.update([tmp])
+
+        local = execPlugin(index.find("benchlocal"), *preparePlugin(index.find("benchlocal")))
+        local.activate()
+
+        pool = WorkerPool(1)
+        start = time.perf_counter()
+        proxy = pool.load(index.find("benchworker"))
+        startup = (time.perf_counter() - start) * 1000
+        driver = asyncloop.driver()
+        driver.wait([driver.schedule(proxy.activate())])
+
+        page = {"url": "app://static/index.html", "title": "bench"}
+        bridge = Bridge(bridgemodule.registry)
+        results = {
+            "worker start and plugin import (ms)": startup,
+            "in-process hook (us)": perCall(lambda: local.loadFinished(page), calls),
+            "proxied hook round trip (us)": perCall(lambda: proxy.loadFinished(page), calls),
+            "in-process bridge call (us)": bridgeRoundTrip(bridge, "benchlocal.echo", calls),
+            "proxied bridge call (us)": bridgeRoundTrip(bridge, "benchworker.echo", calls),
+        }
+        pool.shutdown()
+
+    del app
+    return results
+
+
+if __name__ == "__main__":
+    report("isolated plugins, {} calls".format(CALLS), run())
@@ -0,0 +1,178 @@
+"""Import cost of myapp modules and of each plugin, from ``python -X importtime``.
+
+From the repository root::
+
+    python -m benchmarks.importtime                      # import myapp.MyApplication
+    python -m benchmarks.importtime myapp.config --top 30
+    python -m benchmarks.importtime --plugins plugins    # and every plugin in plugins/
+    python -m benchmarks.importtime --budget 400         # exit status 1 over 400 ms
+
+Every measurement runs in a new interpreter with ``QT_QPA_PLATFORM=offscreen``,
+the best of ``--repeat`` runs is reported.
+"""
+import os
+import re
+import sys
+import json
+import typing
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TARGET = "myapp.MyApplication"
+# written to stderr before the measured code runs, what's logged before is interpreter startup
+MARKER = "myapp-importtime-start"
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+PLUGIN_RUNNER = """
+import sys, time, json
+from myapp.pluginindex import PluginIndex
+from myapp.pluginscheduler import preparePlugin, execPlugin
+info = [info for info in PluginIndex().update([{directory!r}]) if info.name() == {name!r}][0]
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+execPlugin(info, *preparePlugin(info))
+print(json.dumps((time.perf_counter() - start) * 1000000))
+"""
+
+
+class ImportRecord(typing.NamedTuple):
+    name: str
+    self: int
+    cumulative: int
+    depth: int
+
+
+def parseImportTime(output: str) -> typing.List[ImportRecord]:
+    """Records of the ``-X importtime`` lines of output, in the order they were printed."""
+    records = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match is not None:
+            records.append(ImportRecord(match.group(4), int(match.group(1)), int(match.group(2)),
+                                        (len(match.group(3)) - 1) // 2))
+
+    return records
+
+
+def _run(code: str) -> typing.Tuple[subprocess.CompletedProcess, str]:
+    """The process running code and the importtime output logged once code started."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             cwd=ROOT, env=env, capture_output=True, text=True)
+    return process, process.stderr.split(MARKER, 1)[-1]
+
+
+def _error(process: subprocess.CompletedProcess) -> str:
+    lines = [line for line in process.stderr.splitlines() if not line.startswith("import time:")]
+    return lines[-1] if lines else f"exit code {process.returncode}"
+
+
+def measureImport(module: str, repeat: int = 3) -> typing.Tuple[typing.List[ImportRecord], int, str]:
+    """(records, total microseconds, error) of the fastest import of module in a new interpreter."""
+    best = None
+    for _ in range(max(1, repeat)):
+        process, output = _run(
+            f"import sys; sys.stderr.write({MARKER!r} + '\\n'); sys.stderr.flush(); import {module}")
+        if process.returncode != 0:
+            return [], 0, _error(process)
+
+        records = parseImportTime(output)
+        total = sum(record.cumulative for record in records if record.depth == 0)
+        if best is None or total < best[1]:
+            best = (records, total, "")
+
+    return best
+
+
+def measurePlugin(directory: str, name: str, repeat: int = 3) -> typing.Tuple[typing.List[ImportRecord], int, str]:
+    """(records of the modules the plugin imported, microseconds spent running it, error)."""
+    best = None
+    code = PLUGIN_RUNNER.format(directory=os.path.abspath(directory), name=name, marker=MARKER)
+    for _ in range(max(1, repeat)):
+        process, output = _run(code)
+        if process.returncode != 0:
+            return [], 0, _error(process)
+
+        total = int(json.loads(process.stdout.strip().splitlines()[-1]))
+        if best is None or total < best[1]:
+            best = (parseImportTime(output), total, "")
+
+    return best
+
+
+def byPackage(records: typing.List[ImportRecord]) -> typing.Dict[str, int]:
+    """Self time by top-level package, myapp modules are kept apart."""
+    totals = {}
+    for record in records:
+        if record.name.startswith("myapp.plugins."):
+            key = ".".join(record.name.split(".")[:3])
+        elif record.name.startswith("myapp"):
+            key = record.name
+        else:
+            key = record.name.split(".")[0]
+        totals[key] = totals.get(key, 0) + record.self
+
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def plugins(directory: str) -> typing.List[str]:
+    from myapp.pluginindex import PluginIndex
+    return sorted(info.name() for info in PluginIndex().update([os.path.abspath(directory)])
+                  if info.isValid())
+
+
+def _ms(us: int) -> str:
+    return "{:>9.2f} ms".format(us / 1000)
+
+
+def main(argv: typing.List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.importtime",
+                                     description=__doc__.split("\n\n")[0])
+    parser.add_argument("module", nargs="?", default=DEFAULT_TARGET)
+    parser.add_argument("--top", type=int, default=15, help="packages and modules listed")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--plugins", metavar="DIRECTORY", help="also measure every plugin in DIRECTORY")
+    parser.add_argument("--budget", type=float, help="milliseconds the import of module may take")
+    args = parser.parse_args(argv)
+
+    records, total, error = measureImport(args.module, args.repeat)
+    if error:
+        print(f"import {args.module} failed: {error}")
+        return 2
+
+    print(f"import {args.module}: {_ms(total)}")
+    print("\nby package, self time:")
+    for name, us in list(byPackage(records).items())[:args.top]:
+        print(f"  {name:<50} {_ms(us)}")
+
+    own = [record for record in records if record.name.startswith("myapp")]
+    print("\nmyapp modules, self / cumulative:")
+    for record in sorted(own, key=lambda record: -record.cumulative):
+        print(f"  {record.name:<50} {_ms(record.self)} {_ms(record.cumulative)}")
+
+    if args.plugins:
+        print("\nplugins, run time / modules imported:")
+        for name in plugins(args.plugins):
+            imported, elapsed, error = measurePlugin(args.plugins, name, args.repeat)
+            if error:
+                print(f"  {name:<50} failed: {error}")
+                continue
+            top = sorted((record for record in imported if record.depth == 0),
+                         key=lambda record: -record.cumulative)[:3]
+            modules = ", ".join("{} {:.1f} ms".format(record.name, record.cumulative / 1000)
+                                for record in top)
+            print(f"  {name:<50} {_ms(elapsed)}  {modules}")
+
+    if args.budget is not None and total / 1000 > args.budget:
+        print(f"\nimport {args.module} took {total / 1000:.1f} ms, over its {args.budget:.0f} ms budget")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Run every benchmark headless, store the results as a JSON baseline and
+compare later runs against it.
+
+Each benchmark module runs in its own interpreter, with
+``QT_QPA_PLATFORM=offscreen`` unless the variable is already set, so Qt
+application objects and imported plugins don't leak between benchmarks.
+Metrics are lower-is-better unless their name matches HIGHER_IS_BETTER.
+"""
+import os
+import re
+import sys
+import json
+import time
+import typing
+import argparse
+import platform
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+RESULT_MARKER = "BENCHMARK-RESULT "
+# relative slowdown reported as a regression
+THRESHOLD = 0.25
+# differences below this many units (ms, ns, files...) are noise
+MIN_DELTA = 0.05
+HIGHER_IS_BETTER = re.compile(r"\b(hits|per second|speedup)\b")
+
+RUNNER = """
+import json, sys
+import benchmarks.{name} as bench
+print({marker!r} + json.dumps(bench.run()))
+"""
+
+
+def available() -> typing.List[str]:
+    """Names of the benchmark modules, bench_*.py."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return sorted(name[:-3] for name in os.listdir(directory)
+                  if name.startswith("bench_") and name.endswith(".py"))
+
+
+def runBenchmark(name: str, timeout: float = 600) -> typing.Tuple[typing.Optional[dict], str]:
+    """(metrics, error) of one run of a benchmark module in a new interpreter."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        process = subprocess.run(
+            [sys.executable, "-c", RUNNER.format(name=name, marker=RESULT_MARKER)],
+            cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None, f"timed out after {timeout:.0f} seconds"
+
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):]), ""
+
+    lines = (process.stderr or process.stdout).strip().splitlines()
+    return None, lines[-1] if lines else f"exit code {process.returncode}"
+
+
+def runSuite(names: typing.Iterable[str], repeat: int = 1, verbose: bool = True) -> dict:
+    """Results of the benchmarks, the best value of every metric over repeat runs."""
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "qt": _qtVersion(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "benchmarks": {},
+        "skipped": {},
+    }
+    for name in names:
+        best = None
+        for _ in range(max(1, repeat)):
+            metrics, error = runBenchmark(name)
+            if metrics is None:
+                results["skipped"][name] = error
+                best = None
+                break
+            best = metrics if best is None else {
+                key: _best(key, best.get(key), value) for key, value in metrics.items()}
+
+        if best == {}:
+            results["skipped"][name] = "nothing measured, QtWebEngine is probably unavailable"
+        elif best is not None:
+            results["benchmarks"][name] = best
+
+        if verbose:
+            status = "skipped: " + results["skipped"][name] if name in results["skipped"] else "done"
+            print(f"{name}: {status}", file=sys.stderr)
+
+    return results
+
+
+def _best(metric: str, previous, value):
+    if previous is None:
+        return value
+    if HIGHER_IS_BETTER.search(metric):
+        return max(previous, value)
+    return min(previous, value)
+
+
+def _qtVersion() -> typing.Optional[str]:
+    try:
+        from PyQt5.QtCore import QT_VERSION_STR
+    except ImportError:
+        return None
+    return QT_VERSION_STR
+
+
+def compare(baseline: dict, results: dict, threshold: float = THRESHOLD,
+            minDelta: float = MIN_DELTA) -> typing.List[dict]:
+    """Every metric measured in both runs, with its relative change and
+    whether it's a regression."""
+    rows = []
+    for name, metrics in sorted(results.get("benchmarks", {}).items()):
+        previous = baseline.get("benchmarks", {}).get(name, {})
+        for metric, value in metrics.items():
+            base = previous.get(metric)
+            if not isinstance(base, (int, float)) or not isinstance(value, (int, float)):
+                continue
+
+            delta = value - base
+            if HIGHER_IS_BETTER.search(metric):
+                delta = -delta
+            change = delta / base if base else 0.0
+            rows.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": base,
+                "value": value,
+                "change": change,
+                "regression": change > threshold and abs(delta) > minDelta,
+            })
+
+    return rows
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def printComparison(rows: typing.List[dict]) -> None:
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print("{:<20} {:<42} {:>10.3f} {:>10.3f} {:>+8.1%} {}".format(
+            row["benchmark"][len("bench_"):], row["metric"][:42], row["baseline"],
+            row["value"], row["change"], flag))
+
+
+def main(argv: typing.List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list the benchmarks")
+
+    runParser = commands.add_parser("run", help="run benchmarks and write their results")
+    saveParser = commands.add_parser("save", help="run benchmarks and store them as the baseline")
+    compareParser = commands.add_parser("compare", help="compare results with the baseline")
+    for sub in (runParser, saveParser, compareParser):
+        sub.add_argument("names", nargs="*", help="benchmarks to run, all of them by default")
+        sub.add_argument("--repeat", type=int, default=1, help="runs per benchmark, the best is kept")
+    runParser.add_argument("--output", help="write the results to this JSON file")
+    saveParser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    compareParser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    compareParser.add_argument("--results", help="compare this results file instead of running")
+    compareParser.add_argument("--threshold", type=float, default=THRESHOLD,
+                               help="relative slowdown flagged as a regression")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        print("\n".join(available()))
+        return 0
+
+    names = [name if name.startswith("bench_") else "bench_" + name for name in args.names]
+    unknown = set(names) - set(available())
+    if unknown:
+        parser.error("unknown benchmarks: " + ", ".join(sorted(unknown)))
+
+    # checked before running the suite, which takes minutes
+    if args.command == "compare" and not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, create one with: python -m benchmarks save",
+              file=sys.stderr)
+        return 2
+
+    if args.command == "compare" and args.results:
+        results = load(args.results)
+    else:
+        results = runSuite(names or available(), args.repeat)
+
+    if args.command == "run":
+        if args.output:
+            save(results, args.output)
+        else:
+            json.dump(results, sys.stdout, indent=2, sort_keys=True)
+            print()
+        return 0
+
+    if args.command == "save":
+        save(results, args.baseline)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    rows = compare(load(args.baseline), results, args.threshold)
+    printComparison(rows)
+    regressions = [row for row in rows if row["regression"]]
+    print(f"{len(rows)} metrics compared, {len(regressions)} regressions")
+    return 1 if regressions else 0
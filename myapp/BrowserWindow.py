@@ -1,41 +1,84 @@
 
+import logging
+
 from PyQt5.QtCore import Qt, QSize, QUrl
 from PyQt5.QtWidgets import QWidget, QApplication, QVBoxLayout
 from PyQt5.QtWebChannel import QWebChannel
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile
 
 
 from .WebView import MyWebView
+from .bridge import Bridge, BRIDGE_OBJECT, BRIDGE_SCRIPT
 from .usertypes import LoadEvent, Url
 from .utils import Signal
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+
+def _isApplication(app) -> bool:
+    """Whether app is a MyApplication, checked by its plugin manager since
+    importing MyApplication here would be circular."""
+    return app is not None and getattr(app, "pluginManager", None) is not None
 
 
 class BrowserWindow(QWidget):
     app = None
     onClose = Signal()
     bridgeInitialized = False
+    # load events of a window being prepared or recycled by the window pool are not
+    # forwarded to plugins
+    warming = False
     webview: MyWebView = None
 
-    def __init__(self, application=None):
+    def __init__(self, application=None, profile: QWebEngineProfile = None):
         super().__init__()
-        from .MyApplication import MyApplication
-        if application is not None and isinstance(application, MyApplication):
-            self.app = application
-            self.app.addWindow(self)
+        with tracing.span("create window", "window"):
+            if _isApplication(application):
+                self.app = application
+                self.app.addWindow(self)
+
+            self.setWindowFlags(Qt.Window)
+            self.setAttribute(Qt.WA_DeleteOnClose, True)
+            self.setMinimumSize(QSize(640, 480))
 
-        self.setWindowFlags(Qt.Window)
-        self.setAttribute(Qt.WA_DeleteOnClose, True)
-        self.setMinimumSize(QSize(640, 480))
+            self.layout = QVBoxLayout(self)
+            self.layout.setContentsMargins(0, 0, 0, 0)
 
-        self.layout = QVBoxLayout(self)
-        self.layout.setContentsMargins(0, 0, 0, 0)
+            self._createChannel()
 
+            self.webview = MyWebView(parent=self, profile=profile)
+            self.webview.loadChanged.connect(self._loadChanged)
+            self.layout.addWidget(self.webview)
+
+    def _createChannel(self):
         self.channel = QWebChannel()
+        self.bridge = Bridge(parent=self)
+        self.channel.registerObject(BRIDGE_OBJECT, self.bridge)
+
+    def _isWarmingEvent(self, e) -> bool:
+        """Whether e belongs to the blank document loaded by prepare()."""
+        if not self.warming:
+            return False
+
+        if self.app is not None and e == LoadEvent.BEFORE_LOAD:
+            # a url requested by the application the window was handed to
+            return False
 
-        self.webview = MyWebView(parent=self)
-        self.webview.loadChanged.connect(self._loadChanged)
-        self.layout.addWidget(self.webview)
+        url = self.webview.page().url()
+        if self.app is None or url.isEmpty() or url.toString() == "about:blank":
+            if e == LoadEvent.FINISHED:
+                self.warming = False
+            return True
+
+        # the blank document was replaced by the requested url before it finished loading
+        self.warming = False
+        return False
 
     def _loadChanged(self, e):
+        if self._isWarmingEvent(e):
+            return
+
         app = self.app
         if app is None:
             app = QApplication.instance()
@@ -44,8 +87,7 @@ class BrowserWindow(QWidget):
             self._initBridge()
             self.bridgeInitialized = True
 
-        from .MyApplication import MyApplication
-        if app is not None and isinstance(app, MyApplication):
+        if _isApplication(app):
             page = self.webview.page()
             if e == LoadEvent.BEFORE_LOAD:
                 app.pluginManager.beforeLoad.emit(self.channel, page)
@@ -55,21 +97,57 @@ class BrowserWindow(QWidget):
                 app.pluginManager.loadFinished.emit(page)
 
     def _initBridge(self):
-        print("Initializing web channel bridge...")
+        logger.debug("initializing web channel bridge")
         page = self.webview.page()
 
-        page.injectScript(":/qtwebchannel/qwebchannel.js", "QWebChannel API")
+        with tracing.span("inject bridge", "window"):
+            page.injectScript(":/qtwebchannel/qwebchannel.js", "QWebChannel API")
+            page.injectScript(BRIDGE_SCRIPT, "myapp bridge")
 
-        app = self.app
-        if app is None:
-            app = QApplication.instance()
+            app = self.app
+            if app is None:
+                app = QApplication.instance()
 
-        # app is probably None in test
-        from .MyApplication import MyApplication
-        if app is not None and isinstance(app, MyApplication):
-            app.pluginManager.bridgeInitialize.emit(page)
+            # app is probably None in test
+            if _isApplication(app):
+                app.pluginManager.bridgeInitialize.emit(page)
 
+            page.setWebChannel(self.channel)
+
+    def prepare(self) -> None:
+        """Initialize the bridge and start the renderer of the page with a blank document,
+        so the window is ready to load a url."""
+        if not self.bridgeInitialized:
+            self._initBridge()
+            self.bridgeInitialized = True
+
+        self.warming = True
+        tracing.instant("prepare window", "window")
+        self.webview.page().setUrl(QUrl("about:blank"))
+
+    def attach(self, application) -> None:
+        """Hand a prepared window to application."""
+        self.app = application
+        self.app.addWindow(self)
+        # warming until the blank document is loaded, its load events aren't forwarded
+        # resources of the plugins enabled since the window was prepared
+        application.pluginManager.bridgeInitialize.emit(self.webview.page())
+
+    def recycle(self) -> None:
+        """Reset a closed window so it can be handed out again."""
+        self.app = None
+        # subscribers and channel objects of the previous owner
+        self.__dict__.pop("onClose", None)
+        self.bridge.deleteLater()
+        self.channel.deleteLater()
+        self._createChannel()
+        page = self.webview.page()
         page.setWebChannel(self.channel)
+        page.history().clear()
+        self.prepare()
+
+    def profile(self) -> QWebEngineProfile:
+        return self.webview.page().profile()
 
     def loadUrl(self, url: Url) -> None:
         if isinstance(url, QUrl):
@@ -82,4 +160,8 @@ class BrowserWindow(QWidget):
         self.onClose.emit()
         # unregister our window from application
         if self.app is not None:
-            self.app.removeWindow(self)
+            app = self.app
+            app.removeWindow(self)
+            if app.windowPool is not None and app.windowPool.release(self):
+                # kept by the pool instead of being deleted
+                self.setAttribute(Qt.WA_DeleteOnClose, False)
@@ -1,14 +1,29 @@
 import os
+import sys
 import typing
 import signal
+import logging
 from os import path
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtWidgets import QApplication
 
-from .BrowserWindow import BrowserWindow
-from .PluginManager import PluginManager
 from .utils import Signal
-from .config import config, Configuration
+from .config import config, Configuration, change_filter, registerChangeFilters
+from . import bridge
+from . import tracing
+from . import log
+
+# QtWebEngine and the modules using it are imported when the application is
+# created, importing this module stays cheap, e.g. for tools and tests
+if typing.TYPE_CHECKING:
+    from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+    from .BrowserWindow import BrowserWindow
+    from .PluginManager import PluginManager
+    from .windowpool import WindowPool
+    from .profiles import ProfileManager
+    from .SchemeHandler import AppSchemeHandler
+
+logger = logging.getLogger(__name__)
 
 myapp = None
 
@@ -26,15 +41,20 @@ def run(argsv):
 
     global myapp
     QApplication.setAttribute(Qt.AA_ShareOpenGLContexts, True)
-
-    myapp = MyApplication(argsv)
-    myapp.setOrganizationName("MyOrganization")
-    myapp.setApplicationName("MyApp")
-    myapp.registerPluginDir(os.path.join(os.getcwd(), "plugins"))
-
-    url = "file://" + os.path.join(os.getcwd(), "static", "index.html")
-    window = BrowserWindow(myapp)
-    window.loadUrl(url)
+    from .SchemeHandler import registerAppScheme
+    registerAppScheme()
+
+    with tracing.span("create application", "startup"):
+        myapp = MyApplication(argsv)
+        myapp.setOrganizationName("MyOrganization")
+        myapp.setApplicationName("MyApp")
+    with tracing.span("register plugins", "startup"):
+        myapp.registerPluginDir(os.path.join(os.getcwd(), "plugins"))
+
+    url = "app://static/index.html"
+    with tracing.span("open first window", "startup", url=url):
+        window = myapp.createWindow()
+        window.loadUrl(url)
     # Python cannot handle signals while the Qt event loop is running.
     # so we need to use QTimer to let the interpreter run from time to time.
     # https://stackoverflow.com/questions/4938723/what-is-the-correct-way-to-make-my-pyqt-application-quit-when-killed-from-the-co
@@ -48,46 +68,126 @@ def run(argsv):
 
 
 class MyApplication(QApplication):
-    windows: typing.List[BrowserWindow] = []
+    windows: typing.List["BrowserWindow"] = []
     windowAdded = Signal()
     windowRemoved = Signal()
     beforeRun = Signal()
     pluginsDirs: typing.List[str] = []
-    pluginManager: PluginManager = None
+    pluginManager: "PluginManager" = None
+    schemeHandler: "AppSchemeHandler" = None
+    profiles: "ProfileManager" = None
+    windowPool: "WindowPool" = None
 
     def __init__(self, argv, name="myapp"):
+        # QtWebEngineWidgets must be imported before the application is created
+        from .PluginManager import PluginManager
+        from .windowpool import WindowPool
+        from .profiles import ProfileManager
+        from .SchemeHandler import AppSchemeHandler
+
         super().__init__(argv)
+        registerChangeFilters(self)
         if config is None:
-            self.config = Configuration(
-                path.join(os.getcwd(), "{}.yml".format(name)))
+            with tracing.span("load configuration", "startup"):
+                self.config = Configuration(
+                    path.join(os.getcwd(), "{}.yml".format(name)))
         else:
             self.config = config
 
-        self.pluginManager = PluginManager()
+        # log records are written by a background thread from now on
+        log.setup(self.config.get("logging", {}))
+
+        if self.config.get("configuration.autosave", False):
+            self.config.setAutosave(
+                True, self.config.get("configuration.autosaveDelay", 1.0))
+        self.aboutToQuit.connect(self.config.flush)
+
+        # the asyncio loop running async plugin hooks is created, and asyncio
+        # imported, when the first coroutine is scheduled
+        self.aboutToQuit.connect(self._closeAsyncLoop)
+
+        bridge.registry.setWorkers(self.config.get("bridge.workers", None))
+        self.aboutToQuit.connect(bridge.registry.shutdown)
+
+        with tracing.span("create plugin manager", "startup"):
+            self.pluginManager = PluginManager(
+                indexPath=path.join(os.getcwd(), ".{}-plugins.json".format(name)))
+        self.aboutToQuit.connect(self.pluginManager.shutdown)
+
+        self.schemeHandler = AppSchemeHandler(
+            self,
+            maxBytes=self.config.get("appScheme.cacheBytes", 32 * 1024 * 1024),
+            mmapThreshold=self.config.get("appScheme.mmapThreshold", 1024 * 1024))
+        self.schemeHandler.mount("static", path.join(os.getcwd(), "static"))
+        self.schemeHandler.pluginDirectory = self.pluginManager.pluginDirectory
+
+        # named web engine profiles, each with the app scheme installed
+        self.profiles = ProfileManager(
+            self.config.get("profiles", {}), basePath=os.getcwd(), parent=self)
+        self.profiles.profileCreated.connect(self._profileCreated)
+
+        self.windowPool = WindowPool(
+            self,
+            size=self.config.get("windowPool.size", 1),
+            recycle=self.config.get("windowPool.recycle", True),
+            warmDelay=self.config.get("windowPool.warmDelay", 500),
+            profile=self.profiles.profile(self.config.get("windowPool.profile", None)))
+        self.aboutToQuit.connect(self.windowPool.clear)
+        self.aboutToQuit.connect(log.shutdown)
+
+    @change_filter("logging")
+    def _loggingChanged(self, key: str, value) -> None:
+        log.applyLevels(self.config.get("logging", {}))
+
+    @property
+    def asyncLoop(self):
+        """The asyncio driver running async plugin hooks, see asyncloop."""
+        from . import asyncloop
+        return asyncloop.driver()
+
+    def _closeAsyncLoop(self) -> None:
+        asyncloop = sys.modules.get("myapp.asyncloop")
+        if asyncloop is not None:
+            asyncloop.close()
 
     def exec_(self):
-        self.beforeRun.emit()
+        with tracing.span("beforeRun", "startup"):
+            self.beforeRun.emit()
+        self.windowPool.start()
         return super().exec_()
 
+    def createWindow(self, profile: str = None) -> "BrowserWindow":
+        """A new browser window using the profile called profile, taken from the
+        window pool when one is ready."""
+        if profile is None:
+            return self.windowPool.acquire()
+
+        return self.windowPool.acquire(self.profiles.profile(profile))
+
+    def profile(self, name: str = None) -> "QWebEngineProfile":
+        """The web engine profile called name, see ProfileManager."""
+        return self.profiles.profile(name)
+
+    def _profileCreated(self, name: str, profile: "QWebEngineProfile") -> None:
+        profile.installUrlSchemeHandler(b"app", self.schemeHandler)
+
     def registerPluginDir(self, directory: str) -> None:
         """Register directory as plugin base path directory"""
         if path.isabs(directory) and path.exists(directory):
             self.pluginManager.addPluginPath(directory)
         elif path.isabs(directory) and not path.exists(directory):
-            print(
-                "Plugin directory provided doesn't exists, trying to create the folder...")
+            logger.info("plugin directory %s doesn't exist, trying to create it", directory)
             writable = os.access(path.dirname(directory), os.W_OK)
             if writable:
                 os.makedirs(directory, 0o755, exist_ok=True)
                 self.pluginManager.addPluginPath(directory)
             else:
-                print(
-                    "Plugin directory provided is not writable, ignoring it.")
+                logger.warning("plugin directory %s is not writable, ignoring it", directory)
 
-    def addWindow(self, window: BrowserWindow) -> None:
+    def addWindow(self, window: "BrowserWindow") -> None:
         self.windows.append(window)
         self.windowAdded.emit(window)
 
-    def removeWindow(self, window: BrowserWindow) -> None:
+    def removeWindow(self, window: "BrowserWindow") -> None:
         self.windows.remove(window)
         self.windowRemoved.emit(window)
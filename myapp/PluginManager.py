@@ -1,27 +1,33 @@
 import os
 import re
-import ast
+import time
 import typing
-import importlib
-import configparser
+import inspect
+import logging
+import threading
 
 from PyQt5.QtCore import QObject
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtWebEngineWidgets import QWebEngineScript
 
-from .utils import Signal, findFiles
-from .config import change_filter, getInstance
+from .utils import Signal, definedIn, disconnectModule
+from .WebView import installScript, StylesheetBundle, scriptCache, stylesheetSource
+from .config import change_filter, registerChangeFilters, getInstance, PLUGINS_LAYER
+from .pluginindex import PluginIndex, PluginInfo
+from .hooks import HookTable
+from .hookprofiler import HookProfiler, HookDiagnostics
+from .pluginscheduler import (PluginScheduler, preparePlugin, execPlugin, criticalPath,
+                              unloadPluginModules)
+from .pluginarchive import pathExists
+from .pluginmemory import PluginMemory, DEFAULT_FRAMES
+from .log import pluginLogger
+from . import bridge
+from . import tracing
 
+logger = logging.getLogger(__name__)
 
-class PluginInfo(configparser.ConfigParser):
-    def __init__(self, filepath):
-        super().__init__()
-        self._filepath = filepath
-        self.read(self._filepath, encoding='utf-8')
-
-    def isValid(self) -> bool:
-        """"""
-        return self.has_section("plugin") and self.has_option("plugin", "Module")
+# events a plugin manifest can list in ActivateOn to be activated lazily
+LAZY_EVENTS = ("beforeLoad", "loadStarted", "loadFinished", "bridgeInitialize")
 
 
 class PluginManager(QObject):
@@ -29,13 +35,16 @@ class PluginManager(QObject):
     pluginRemoved = Signal()
     pluginActivated = Signal()
     pluginDeactivated = Signal()
+    pluginReloaded = Signal()
     loadStarted = Signal()
     loadFinished = Signal()
     beforeLoad = Signal()
     bridgeInitialize = Signal()
 
-    def __init__(self, pluginDirs: typing.List[str] = [], parent=None):
+    def __init__(self, pluginDirs: typing.List[str] = [], parent=None, indexPath: str = None,
+                 lazy: bool = None, workers: int = None):
         super().__init__(parent)
+        registerChangeFilters(self)
         app = QApplication.instance()
 
         from .MyApplication import MyApplication
@@ -44,185 +53,331 @@ class PluginManager(QObject):
         self._plugins = {}
         self._loadedPlugins = {}
         self._pluginsResources = {}
-        self._pluginDirs = pluginDirs
+        self._pluginDirs = list(pluginDirs)
+        self._index = PluginIndex(indexPath)
+        # plugins enabled but waiting for one of their activation events
+        self._pending = {}
+        self._pendingEvents = {event: {} for event in LAZY_EVENTS}
+        # opt-in, pluginManager.lazy: plugins whose ActivateOn, or Hooks when
+        # there is no ActivateOn, only lists LAZY_EVENTS are imported and
+        # activated on the first of these events instead of at startup
+        if lazy is None:
+            lazy = self._option("lazy", False)
+        self._lazy = bool(lazy)
+        # install plugin resources once per profile instead of once per page
+        self._profileScripts = bool(self._option("profileScripts", False))
+        self._stylesheets = StylesheetBundle(
+            minify=bool(self._option("minifyStylesheets", False)))
+        self._workers = workers
+        # wall and cpu time of every hook call, calls over slowHookBudget
+        # milliseconds are reported
+        self._profiler = None
+        if self._option("profileHooks", False):
+            self._profiler = HookProfiler(
+                budget=self._option("slowHookBudget"),
+                disableAfter=self._option("disableSlowPlugins"),
+                warnInterval=self._option("slowHookWarnInterval", 10.0))
+            self._profiler.budgetExceeded.connect(self._disableSlowPlugin)
+            bridge.registry.exposeObject("hooks", HookDiagnostics(self._profiler))
+        # milliseconds an async hook may run before it's cancelled
+        self._hooks = HookTable(budget=self._option("hookBudget"), profiler=self._profiler)
+        self._awaitBeforeLoad = bool(self._option("awaitBeforeLoad", False))
+        # tasks of async hooks and activations which are not done yet
+        self._tasks = set()
+        # worker processes of the plugins declaring Isolated=true, started
+        # when the first of them is loaded
+        self._workerPool = None
+        self._workerPoolLock = threading.Lock()
+        # plugins are reloaded in place when their files change
+        self._watcher = None
+        # disabled plugins whose modules were dropped, not imported again by a rescan
+        self._unloaded = set()
+        self._memory = PluginMemory()
+        if self._option("traceMemory", False):
+            self._memory.start(self._option("traceMemoryFrames", DEFAULT_FRAMES))
+        if self._option("hotReload", False):
+            from .pluginwatcher import PluginWatcher
+            self._watcher = PluginWatcher(self._option("reloadDelay", 200), self)
+            self._watcher.pluginChanged.connect(self.reloadPlugin)
+            self._watcher.pluginsAdded.connect(self._loadPlugins)
+        self.loadTimings = {}
+        self.reloadTimings = {}
         self.loadStarted.connect(self._loadStarted)
         self.beforeLoad.connect(self._beforeLoad)
         self.loadFinished.connect(self._loadFinished)
         self.bridgeInitialize.connect(self._bridgeInitialize)
         self._loadPlugins()
 
+    def _option(self, name: str, defaultValue=None):
+        if getInstance() is None:
+            return defaultValue
+
+        return getInstance().get(f"pluginManager.{name}", defaultValue)
+
     def _bridgeInitialize(self, page):
+        self._activatePending("bridgeInitialize")
+        self._installResources(page)
+
+    def _pageScripts(self, page):
+        return page.profile().scripts() if self._profileScripts else page.scripts()
+
+    def _installResources(self, page):
+        scripts = self._pageScripts(page)
+        stylesheets = []
         for name, resources in self._pluginsResources.items():
+            enabled = name in self._plugins.keys() or name in self._pending.keys()
             for resource in resources:
                 scriptName = name + "_" + os.path.basename(resource)
 
                 if resource.endswith(".js"):
                     injectionPoint = QWebEngineScript.DocumentReady
-                    page.injectScript(resource, scriptName, injectionPoint)
-                elif resource.endswith(".css"):
-                    injectionPoint = QWebEngineScript.DocumentReady
-                    page.injectStylesheet(
-                        resource, scriptName, injectionPoint)
+                    installScript(scripts, resource, scriptName, injectionPoint)
+                elif resource.endswith(".css") and enabled:
+                    stylesheets.append(resource)
+
+        # css of every enabled plugin is applied as one bundle before first paint
+        self._stylesheets.install(scripts, stylesheets)
+        return stylesheets
 
     def _beforeLoad(self, channel, page):
-        for name, plugin in self._plugins.items():
-            if 'beforeLoad' in dir(plugin):
-                plugin.beforeLoad(channel, page)
-            elif 'before_load' in dir(plugin):
-                plugin.before_load(channel, page)
+        self._activatePending("beforeLoad")
+        self._track(self._hooks.dispatch("beforeLoad", channel, page))
+        if self._awaitBeforeLoad:
+            self.waitForPlugins(self._hooks.budget)
 
     def _loadStarted(self, page):
-        for name, plugin in self._plugins.items():
-            if 'loadStarted' in dir(plugin):
-                plugin.loadStarted(page)
-            elif 'load_started' in dir(plugin):
-                plugin.load_started(page)
+        self._activatePending("loadStarted")
+        self._track(self._hooks.dispatch("loadStarted", page))
 
     def _loadFinished(self, page):
-        for name, plugin in self._plugins.items():
-            if 'loadFinished' in dir(plugin):
-                plugin.loadStarted(page)
-            elif 'load_finished' in dir(plugin):
-                plugin.load_started(page)
+        self._activatePending("loadFinished")
+        self._track(self._hooks.dispatch("loadFinished", page))
+
+    def _track(self, tasks) -> None:
+        for task in tasks:
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _runAsync(self, name: str, what: str, func) -> None:
+        """Call a plugin function and schedule its result if it's a coroutine."""
+        with tracing.span(f"{name}.{what}", "plugin"):
+            if self._profiler is not None:
+                result = self._profiler.call(name, what, func)
+            else:
+                result = func()
+        if inspect.isawaitable(result):
+            from . import asyncloop
+            self._track([asyncloop.schedule(
+                result, self._hooks.budget, f"plugin {name} {what}")])
+
+    def _disableSlowPlugin(self, name: str, hook: str) -> None:
+        if name not in self._plugins.keys():
+            return
+
+        pluginLogger(name).warning("plugin %s exceeded its %s budget %d times in a row, "
+                                   "it will be disabled", name, hook, self._profiler.disableAfter)
+        # disabled through the configuration, so it stays disabled on the next start
+        getInstance().set(f"plugins.{name}.enabled", False)
+
+    def hookStats(self, name: str = None) -> typing.Dict[str, typing.Dict[str, dict]]:
+        """{plugin: {hook: statistics}} of the hook calls, times in milliseconds,
+        empty if pluginManager.profileHooks is disabled."""
+        if self._profiler is None:
+            return {}
+
+        return self._profiler.stats(name)
+
+    def slowHooks(self, limit: int = 10) -> typing.List[dict]:
+        """The plugin hooks with the highest 95th percentile wall time."""
+        if self._profiler is None:
+            return []
+
+        return self._profiler.slowest(limit)
+
+    def pendingTasks(self) -> list:
+        """Tasks of the async hooks and activations still running."""
+        return list(self._tasks)
+
+    def waitForPlugins(self, timeout: float = None) -> bool:
+        """Process events until the async work of every plugin is done.
+
+        Returns False if some of it was still running after timeout seconds.
+        """
+        if not self._tasks:
+            return True
+
+        from . import asyncloop
+        return asyncloop.driver().wait(self.pendingTasks(), timeout)
 
     def addPluginPath(self, path: str):
         assert os.path.isabs(path)
         if not path in self._pluginDirs:
             self._pluginDirs.append(path)
+            if self._watcher is not None:
+                self._watcher.watchDirectory(path)
             self._loadPlugins()
 
+    def _watchPlugin(self, info: PluginInfo) -> None:
+        root = info.archive() or os.path.dirname(info.filepath)
+        self._memory.watch(info.name(), root)
+        if self._watcher is not None:
+            self._watcher.watchPlugin(info.name(), root)
+
+    def _importPlugin(self, info: PluginInfo):
+        name = info.name()
+        with tracing.span(f"{name}.import", "plugin", isolated=info.isolated()):
+            if info.isolated():
+                module = self._isolate(info)
+            else:
+                module = execPlugin(info, *preparePlugin(info))
+        self._loadedPlugins[name] = module
+        self._pluginsResources[name] = info.resources()
+        self._watchPlugin(info)
+        return module
+
+    def _discoverPlugins(self) -> typing.List[PluginInfo]:
+        with tracing.span("discover plugins", "plugin") as span:
+            infos = self._index.update(self._pluginDirs)
+            self._index.save()
+            span.set(plugins=len(infos))
+        return infos
+
     def _loadPlugin(self, pluginName):
         if pluginName in self._loadedPlugins.keys():
             return self._loadedPlugins[pluginName]
 
-        identities_paths = []
-        for directory in self._pluginDirs:
-            identities_paths += findFiles("*.plugin", directory)
+        info = self._index.find(pluginName)
+        if info is None:
+            # the plugin may have been installed after the last scan
+            self._discoverPlugins()
+            info = self._index.find(pluginName)
 
         module = None
-        for f in identities_paths:
-            info = PluginInfo(f)
-            name = f
-            if info.has_section("plugin") and info.has_option("plugin", "Name"):
-                name = info.get("plugin", "Name")
-            else:
-                continue
+        if info is None:
+            return module
 
-            if name == pluginName:
-                if not info.isValid():
-                    print(f"Plugin identity {name} is not valid, please read documentation "
-                          "about how to write plugin.")
-                else:
-                    parentdir = os.path.dirname(f)
-                    module_path = os.path.join(
-                        parentdir, info.get("plugin", "Module"))
-                    if(not module_path.endswith(".py")):
-                        module_path += ".py"
-
-                    if os.path.exists(module_path):
-                        try:
-                            module_path = module_path
-                            package = f"myapp.plugins.{name}"
-                            spec = importlib.util.spec_from_file_location(
-                                package, module_path)
-                            module = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(module)
-                            self._loadedPlugins[name] = module
-                        except ImportError:
-                            print(
-                                f"Unable to load plugin module {name}")
-
-                        break
-                    else:
-                        print(
-                            f"module specified in {name} doesn't exists, it will be ignored.")
+        if not info.isValid():
+            logger.warning("plugin identity %s is not valid, please read the documentation "
+                           "about how to write a plugin", pluginName)
+        elif pathExists(info.modulePath()):
+            try:
+                module = self._importPlugin(info)
+            except ImportError:
+                pluginLogger(pluginName).exception("unable to load plugin module %s", pluginName)
+        else:
+            logger.warning("module specified in %s doesn't exist, it will be ignored", pluginName)
 
         return module
 
     def _loadPlugins(self):
         """"""
-        identities_paths = []
-        for directory in self._pluginDirs:
-            identities_paths += findFiles("*.plugin", directory)
-
         plugins: typing.List[PluginInfo] = []
 
-        for f in identities_paths:
-            info = PluginInfo(f)
-            name = f
-            if info.has_section("plugin") and info.has_option("plugin", "Name"):
-                name = info.get("plugin", "Name")
+        for info in self._discoverPlugins():
+            name = info.name()
+            if name is None:
+                name = info.filepath
 
             # if it's already exists it means that user just add a new plugins directory
-            if name in self._loadedPlugins.keys():
+            if name in self._loadedPlugins.keys() or name in self._pending.keys():
+                continue
+            if name in self._unloaded:
                 continue
 
             if not info.isValid():
-                print(f"Plugin identity {name} is not valid, please read documentation "
-                      "about how to write plugin.")
+                logger.warning("plugin identity %s is not valid, please read the documentation "
+                               "about how to write a plugin", name)
+            elif pathExists(info.modulePath()):
+                plugins.append(info)
             else:
-                parentdir = os.path.dirname(f)
-                module_path = os.path.join(
-                    parentdir, info.get("plugin", "Module"))
-                if(not module_path.endswith(".py")):
-                    module_path += ".py"
-
-                if os.path.exists(module_path):
-                    info.set("plugin", "Path", module_path)
-                    plugins.append(info)
-                else:
-                    print(
-                        f"module specified in {f} doesn't exists, it will be ignored.")
-
-        print(f"{len(plugins)} plugins found.")
+                logger.warning("module specified in %s doesn't exist, it will be ignored",
+                               info.filepath)
+
+        logger.info("%d plugins found", len(plugins))
+        deferred = self._deferrablePlugins(plugins)
+        eager = []
         for plugin in plugins:
-            try:
-                name = plugin.get("plugin", "Name")
-
-                module_path = plugin.get("plugin", "Path")
-                package = f"myapp.plugins.{name}"
-                spec = importlib.util.spec_from_file_location(
-                    package, module_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                self._loadedPlugins[name] = module
-
-                """
-                By default plugin will be enabled if there was no plugin configuration.
-                """
-                cfg = getInstance().get(f"plugins.{name}")
-                shouldLoad = True
-                if cfg is None:
-                    shouldLoad = False
-                    cfg = dict()
-                    cfg['enabled'] = True
-                    getInstance().set(f"plugins.{name}.enabled", True)
-
-                # if this is the first time the plugin is registered code above will trigger _pluginStateChange
-                # and activate it, so we don't need to activate it again here
-                if cfg['enabled'] and shouldLoad:
-                    if 'activate' in dir(module):
-                        module.activate()
-                        self._plugins[name] = module
-
-                if plugin.has_option("plugin", "Resources"):
-                    resources = ast.literal_eval(
-                        plugin.get("plugin", "Resources"))
-                    base_path = os.path.dirname(module_path)
-
-                    def to_abspath(path: str):
-                        if not os.path.isabs(path):
-                            return os.path.join(base_path, path)
-
-                        return path
-
-                    resources = list(map(to_abspath, resources))
-                    self._pluginsResources[name] = resources
-
-            except ImportError as e:
-                name = plugin.get("plugin", "Name")
-                print(
-                    f"Unable to load plugin module {name} : ${e.msg}")
+            name = plugin.name()
+            if name in deferred:
+                self._pluginsResources[name] = plugin.resources()
+                if self._shouldActivate(name):
+                    self._deferPlugin(plugin)
+            else:
+                eager.append(plugin)
+
+        scheduler = PluginScheduler(
+            eager, set(self._loadedPlugins.keys()) | deferred, self._workers,
+            isolate=self._isolate)
+        scheduler.run(self._startPlugin)
+        for name, error in scheduler.errors.items():
+            pluginLogger(name).error("unable to load plugin module %s: %s", name, error)
+
+        self.loadTimings.update(scheduler.timings)
+        if scheduler.timings:
+            total = max(timing.finished for timing in scheduler.timings.values())
+            path = " -> ".join("{} ({:.1f} ms)".format(name, scheduler.timings[name].total)
+                               for name in criticalPath(scheduler.timings))
+            logger.info("%d plugins loaded in %.1f ms, critical path: %s",
+                        len(scheduler.timings), total, path)
+
+    def _startPlugin(self, name: str, module):
+        """Register a module loaded by the scheduler and activate it if it's enabled."""
+        info = self._index.find(name)
+        self._loadedPlugins[name] = module
+        self._pluginsResources[name] = info.resources()
+        self._watchPlugin(info)
+        # if this is the first time the plugin is registered _shouldActivate will trigger
+        # _pluginStateChange and activate it, so we don't need to activate it again here
+        if self._shouldActivate(name) and self._requirementsActive(name, info):
+            if 'activate' in dir(module):
+                self._runAsync(name, "activate", module.activate)
+                self._addActivePlugin(name, module)
+
+    def _shouldActivate(self, name: str) -> bool:
+        """
+        By default plugin will be enabled if there was no plugin configuration.
+        """
+        enabled = getInstance().get(f"plugins.{name}.enabled")
+        if enabled is None:
+            # a default, it isn't written to the user's configuration file
+            getInstance().set(f"plugins.{name}.enabled", True, layer=PLUGINS_LAYER)
+            return False
+
+        return bool(enabled)
+
+    def _deferrablePlugins(self, plugins: typing.List[PluginInfo]) -> set:
+        """Names of the plugins that can be activated lazily, plugins required
+        by an eagerly loaded plugin are loaded eagerly too."""
+        deferred = {info.name() for info in plugins if self._isDeferrable(info)}
+        changed = True
+        while changed:
+            changed = False
+            for info in plugins:
+                if info.name() in deferred:
+                    continue
+                for req in info.requires():
+                    if req in deferred:
+                        deferred.discard(req)
+                        changed = True
+
+        return deferred
+
+    def _requirementsActive(self, name: str, info: PluginInfo) -> bool:
+        """Activate the pending plugins name requires, return False if one of them is not active."""
+        for req in info.requires():
+            if req in self._pending.keys():
+                self._undeferPlugin(req)
+                self._activatePlugin(req)
+
+            module = self._loadedPlugins.get(req)
+            active = req in self._plugins.keys() or (
+                module is not None and "activate" not in dir(module))
+            if not active:
+                pluginLogger(name).warning("plugin %s requires %s which is not active, "
+                                           "it will not be activated", name, req)
+                return False
+
+        return True
 
     @change_filter("plugins")
     def _pluginsStateChanged(self, key: str, value):
@@ -235,28 +390,243 @@ class PluginManager(QObject):
             elif value:
                 self.enablePlugin(name)
 
+    def _isDeferrable(self, info: PluginInfo) -> bool:
+        """Whether the plugin can wait for its activation events instead of
+        being imported and activated right away."""
+        if not self._lazy:
+            return False
+
+        events = info.activationEvents()
+        return len(events) > 0 and all(event in LAZY_EVENTS for event in events)
+
+    def _deferPlugin(self, info: PluginInfo):
+        name = info.name()
+        self._pending[name] = info
+        self._pluginsResources[name] = info.resources()
+        self._watchPlugin(info)
+        for event in info.activationEvents():
+            self._pendingEvents[event][name] = info
+
+    def _undeferPlugin(self, name: str):
+        self._pending.pop(name, None)
+        for names in self._pendingEvents.values():
+            names.pop(name, None)
+
+    def _activatePending(self, event: str):
+        """Import and activate the pending plugins waiting for event."""
+        names = self._pendingEvents[event]
+        if not names:
+            return
+
+        for name in list(names.keys()):
+            self._undeferPlugin(name)
+            self._activatePlugin(name)
+
+    def _addActivePlugin(self, name: str, module):
+        self._plugins[name] = module
+        info = self._index.find(name)
+        self._hooks.register(name, module, info.priority() if info is not None else 0)
+
+    def _isolate(self, info: PluginInfo):
+        """Import a plugin in a worker process, can be called from any thread."""
+        with self._workerPoolLock:
+            if self._workerPool is None:
+                from .pluginprocess import WorkerPool
+                self._workerPool = WorkerPool(self._option("workerProcesses", 2))
+
+        return self._workerPool.load(info)
+
+    def _isIsolated(self, module) -> bool:
+        if self._workerPool is None:
+            return False
+
+        from .pluginprocess import PluginProxy
+        return isinstance(module, PluginProxy)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes of isolated plugins."""
+        if self._workerPool is not None:
+            self._workerPool.shutdown()
+
+    def pluginDirectory(self, name: str) -> typing.Optional[str]:
+        """Directory of the plugin main module, None if the plugin isn't installed."""
+        info = self._index.find(name)
+        if info is None or not info.isValid():
+            return None
+
+        return os.path.dirname(info.modulePath())
+
+    def isPending(self, name: str) -> bool:
+        """Whether the plugin is enabled but not activated yet."""
+        return name in self._pending.keys()
+
     def enablePlugin(self, name: str):
         """"""
-        print(f"enabling plugin {name}")
+        logger.info("enabling plugin %s", name)
+        self._unloaded.discard(name)
+        if self._profiler is not None:
+            # a plugin disabled for being slow starts over
+            self._profiler.reset(name)
+        if name in self._plugins.keys() or name in self._pending.keys():
+            return
+
+        info = None
+        if self._lazy and name not in self._loadedPlugins.keys():
+            info = self._index.find(name)
+
+        if info is not None and info.isValid() and self._isDeferrable(info):
+            self._deferPlugin(info)
+        else:
+            self._activatePlugin(name)
+
+    def _activatePlugin(self, name: str):
         if not name in self._plugins.keys():
+            info = self._index.find(name)
+            if info is not None and not self._requirementsActive(name, info):
+                return
+
             module = self._loadPlugin(name)
             if module is not None:
                 if "activate" in dir(module):
-                    module.activate()
+                    self._runAsync(name, "activate", module.activate)
                     self.pluginActivated.emit(name)
-                    self._plugins[name] = module
+                    self._addActivePlugin(name, module)
                     self.pluginAdded.emit(name)
             else:
-                print(f"Unable activate plugin {name}")
+                pluginLogger(name).error("unable to activate plugin %s", name)
 
     def disablePlugin(self, name: str):
-        """"""
-        print(f"disabling plugin {name}")
+        """Deactivate a plugin and unload it, see _unloadPlugin."""
+        logger.info("disabling plugin %s", name)
+        wasPending = name in self._pending.keys()
+        self._undeferPlugin(name)
         if name in self._plugins.keys():
-            module = self._plugins[name]
+            module = self._stopPlugin(name)
             if "deactivate" in dir(module):
-                module.deactivate()
                 self.pluginDeactivated.emit(name)
 
-            self._plugins.pop(name, None)
+            self._unloadPlugin(name)
             self.pluginRemoved.emit(name)
+        elif wasPending or name in self._loadedPlugins.keys():
+            self._unloadPlugin(name)
+
+    def _stopPlugin(self, name: str):
+        """Deactivate an active plugin and remove its hooks and bridge methods."""
+        module = self._plugins.pop(name)
+        if "deactivate" in dir(module):
+            self._runAsync(name, "deactivate", module.deactivate)
+        self._hooks.unregister(name)
+        bridge.registry.removeOwner(name)
+        return module
+
+    def _unloadModules(self, name: str) -> None:
+        """Drop the modules of a plugin, the signal subscribers and web channel
+        objects they defined, so nothing keeps them alive."""
+        module = self._loadedPlugins.pop(name, None)
+        if self._isIsolated(module):
+            # the worker keeps running the plugin until it's unloaded
+            self._workerPool.unload(name)
+        else:
+            self._memory.unloaded(name, unloadPluginModules(name))
+
+        package = f"myapp.plugins.{name}"
+        disconnectModule(package)
+        for window in self._windows():
+            for obj in list(window.channel.registeredObjects().values()):
+                if definedIn(type(obj), package):
+                    window.channel.deregisterObject(obj)
+
+    def _unloadPlugin(self, name: str) -> None:
+        """Unload a disabled plugin: its modules, what they connected and its page scripts."""
+        self._unloadModules(name)
+        self._unloaded.add(name)
+        resources = self._pluginsResources.pop(name, [])
+        for resource in resources:
+            scriptCache.invalidate(resource)
+        self._reinstallResources(name, resources)
+
+    def memoryUsage(self, name: str = None) -> typing.Dict[str, int]:
+        """{plugin name: bytes allocated by the plugin}, empty unless
+        pluginManager.traceMemory is enabled."""
+        return self._memory.usage(name)
+
+    def unloadLeaks(self) -> typing.Dict[str, typing.List[str]]:
+        """{plugin name: modules still alive after the plugin was unloaded or reloaded}."""
+        return self._memory.leaked()
+
+    def reloadPlugin(self, name: str) -> bool:
+        """Reload a plugin whose files changed, without touching the other plugins.
+
+        The plugin is deactivated, its modules are dropped and imported
+        again, and it's activated again if it was active. Its resources are
+        installed again in the open pages and applied to their current
+        documents. Returns False if the plugin wasn't loaded.
+        """
+        if name not in self._loadedPlugins and name not in self._pending:
+            return False
+
+        start = time.perf_counter()
+        with tracing.span(f"{name}.reload", "plugin"):
+            wasActive = name in self._plugins
+            wasPending = name in self._pending
+            self._undeferPlugin(name)
+            if wasActive:
+                self._stopPlugin(name)
+
+            self._unloadModules(name)
+            previous = self._pluginsResources.pop(name, [])
+            for resource in previous:
+                scriptCache.invalidate(resource)
+
+            self._discoverPlugins()
+            info = self._index.find(name)
+            if info is None or not info.isValid():
+                logger.info("plugin %s was removed, it will not be reloaded", name)
+                if self._watcher is not None:
+                    self._watcher.unwatchPlugin(name)
+            elif wasActive:
+                self._activatePlugin(name)
+            elif wasPending:
+                self._deferPlugin(info)
+            else:
+                self._loadPlugin(name)
+
+            self._reinstallResources(name, previous)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.reloadTimings[name] = elapsed
+        logger.info("plugin %s reloaded in %.1f ms", name, elapsed)
+        self.pluginReloaded.emit(name)
+        return True
+
+    def _windows(self) -> list:
+        """Open and pooled windows."""
+        app = QApplication.instance()
+        windows = list(app.windows)
+        if app.windowPool is not None:
+            windows += app.windowPool.windows()
+        return windows
+
+    def _reinstallResources(self, name: str, previous: typing.List[str]) -> None:
+        """Replace the scripts of a reloaded or unloaded plugin in every open or pooled page."""
+        resources = self._pluginsResources.get(name, [])
+        for window in self._windows():
+            page = window.webview.page()
+            scripts = self._pageScripts(page)
+            for resource in previous:
+                for script in scripts.findScripts(name + "_" + os.path.basename(resource)):
+                    scripts.remove(script)
+
+            stylesheets = self._installResources(page)
+            if window.warming or window.app is None:
+                continue
+
+            # scripts only run on the next navigation, the current document
+            # gets the new sources right away
+            for resource in resources:
+                entry = scriptCache.source(resource)
+                if resource.endswith(".js") and entry is not None:
+                    page.runJavaScript(entry[1])
+            bundle = self._stylesheets.script(stylesheets)
+            page.runJavaScript(bundle.sourceCode() if bundle is not None
+                               else stylesheetSource("", StylesheetBundle.NAME))
@@ -0,0 +1,114 @@
+import os
+import typing
+
+from PyQt5.QtCore import QBuffer, QIODevice
+from PyQt5.QtWebEngineCore import QWebEngineUrlScheme, QWebEngineUrlSchemeHandler, QWebEngineUrlRequestJob
+
+from .resourcecache import ResourceCache
+
+SCHEME = b"app"
+
+
+def registerAppScheme() -> None:
+    """Register the app:// scheme, must be called before the QApplication is created."""
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme |
+                    QWebEngineUrlScheme.LocalAccessAllowed |
+                    QWebEngineUrlScheme.CorsEnabled)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+class MappedFileDevice(QIODevice):
+    """Read only QIODevice over a memory mapped file.
+
+    The mapping is shared with the ResourceCache, closing the device doesn't
+    close it, it's unmapped once it was evicted and no device reads it anymore.
+    """
+
+    def __init__(self, mapped, parent=None):
+        super().__init__(parent)
+        self._mapped = mapped
+        self._pos = 0
+        self.open(QIODevice.ReadOnly)
+
+    def isSequential(self) -> bool:
+        return False
+
+    def size(self) -> int:
+        return len(self._mapped)
+
+    def seek(self, pos: int) -> bool:
+        super().seek(pos)
+        self._pos = pos
+        return 0 <= pos <= len(self._mapped)
+
+    def readData(self, maxlen: int) -> bytes:
+        data = self._mapped[self._pos:self._pos + maxlen]
+        self._pos += len(data)
+        return data
+
+    def writeData(self, data) -> int:
+        return -1
+
+
+class AppSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Serve app:// urls from mounted directories through a ResourceCache.
+
+    ``app://static/index.html`` is served from the directory mounted as
+    ``static`` and ``app://plugins/<name>/<path>`` from the directory of
+    plugin <name>, given by pluginDirectory.
+    """
+
+    def __init__(self, parent=None, maxBytes: int = 32 * 1024 * 1024,
+                 mmapThreshold: int = 1024 * 1024):
+        super().__init__(parent)
+        self.cache = ResourceCache(maxBytes, mmapThreshold)
+        self._mounts = {}
+        self.pluginDirectory: typing.Callable[[str], typing.Optional[str]] = None
+
+    def mount(self, host: str, directory: str) -> None:
+        self._mounts[host] = os.path.abspath(directory)
+
+    def resolve(self, host: str, path: str) -> typing.Optional[str]:
+        """File path for the url app://<host>/<path>, None if it's outside of the mounted directory."""
+        segments = [s for s in path.split("/") if s]
+        root = self._mounts.get(host)
+        if root is None and host == "plugins" and segments and self.pluginDirectory is not None:
+            root = self.pluginDirectory(segments.pop(0))
+        if root is None:
+            return None
+
+        filepath = os.path.normpath(os.path.join(root, *segments))
+        if filepath != root and not filepath.startswith(root + os.sep):
+            return None
+
+        if os.path.isdir(filepath):
+            filepath = os.path.join(filepath, "index.html")
+
+        return filepath
+
+    def requestStarted(self, job: QWebEngineUrlRequestJob) -> None:
+        if bytes(job.requestMethod()) not in (b"GET", b"HEAD"):
+            job.fail(QWebEngineUrlRequestJob.RequestDenied)
+            return
+
+        url = job.requestUrl()
+        filepath = self.resolve(url.host(), url.path())
+        if filepath is None:
+            job.fail(QWebEngineUrlRequestJob.RequestDenied)
+            return
+
+        resource = self.cache.get(filepath)
+        if resource is None:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+            return
+
+        if resource.mapped is not None:
+            device = MappedFileDevice(resource.mapped, job)
+        else:
+            device = QBuffer(job)
+            device.setData(resource.data)
+            device.open(QIODevice.ReadOnly)
+
+        job.reply(resource.mime.encode(), device)
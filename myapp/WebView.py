@@ -1,67 +1,306 @@
-from PyQt5.QtCore import QFile
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
+import os
+import re
+import json
+import typing
+import hashlib
+import logging
+
+from PyQt5.QtCore import QFile, QFileSystemWatcher, QUrl
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile
 from PyQt5.QtWebEngineWidgets import QWebEngineScript
 
 from .usertypes import LoadEvent, Url
 from .utils import Signal
+from .pluginarchive import splitArchivePath, readFile
+from . import tracing
+
+logger = logging.getLogger(__name__)
 
 
 class MyWebView(QWebEngineView):
     loadChanged = Signal(LoadEvent)
 
-    def __init__(self, parent):
+    def __init__(self, parent, profile: QWebEngineProfile = None):
         super().__init__(parent)
         self.loadStarted.connect(self._loadStarted)
         self.loadFinished.connect(self._loadFinished)
 
-        page = MyWebPage(profile=None, parent=self)
+        if profile is None:
+            profile = QWebEngineProfile.defaultProfile()
+        page = MyWebPage(profile=profile, parent=self)
         self.setPage(page)
 
     def _loadStarted(self):
         self.contentLoaded = False
-        self.loadChanged.emit(LoadEvent.STARTED)
+        with tracing.span("loadStarted", "page"):
+            self.loadChanged.emit(LoadEvent.STARTED)
 
-    def _loadFinished(self):
+    def _loadFinished(self, ok=True):
         self.contentLoaded = True
-        self.loadChanged.emit(LoadEvent.FINISHED)
+        tracing.end("page load", id(self), "page", ok=ok)
+        with tracing.span("loadFinished", "page"):
+            self.loadChanged.emit(LoadEvent.FINISHED)
 
     def load(self, url):
         self.setUrl(url)
 
     def setUrl(self, url):
-        self.loadChanged.emit(LoadEvent.BEFORE_LOAD)
+        tracing.begin("page load", id(self), "page", url=url.toString())
+        with tracing.span("beforeLoad", "page"):
+            self.loadChanged.emit(LoadEvent.BEFORE_LOAD)
         return super().setUrl(url)
 
 
-def _createWebengineScript(path: Url, name: str, injectionPoint=None, isStylesheet: bool = False) -> QWebEngineScript:
+_CSS_TOKENS = re.compile(
+    r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|(/\*.*?\*/)|(\s+)', re.S)
 
-    if injectionPoint is None:
-        injectionPoint = QWebEngineScript.DocumentCreation
 
+def minifyCss(css: str) -> str:
+    """Remove comments, insignificant whitespace and the semicolon ending a
+    block, quoted strings are kept as is."""
+    out = []
+    # whether out[-1] is css rather than a quoted string
+    raw = False
+
+    def append(text):
+        nonlocal raw
+        if not text:
+            return
+        text = text.replace(";}", "}")
+        if text[0] == "}" and raw and out[-1][-1] == ";":
+            out[-1] = out[-1][:-1]
+        out.append(text)
+        raw = True
+
+    pos = 0
+    for match in _CSS_TOKENS.finditer(css):
+        append(css[pos:match.start()])
+        pos = match.end()
+        if match.group(1):
+            out.append(match.group(1))
+            raw = False
+        elif match.group(3):
+            previous = out[-1][-1:] if out else ""
+            following = css[pos:pos + 1]
+            if previous and following and previous not in "{};,>" and following not in "{};,>":
+                append(" ")
+    append(css[pos:])
+
+    return "".join(out).strip()
+
+
+def stylesheetSource(css: str, key: str = None) -> str:
+    """Javascript applying css to the document.
+
+    The css is embedded as a JSON string, so it can contain any character.
+    It's applied as a constructed stylesheet, which works from
+    DocumentCreation, before anything is painted, and falls back to a
+    <style> element when adoptedStyleSheets isn't supported. Running the
+    script again with the same key replaces the css applied before.
+    """
+    return ("(function() {\n"
+            "const css = " + json.dumps(css) + ";\n"
+            "const key = " + json.dumps(key or "") + ";\n"
+            "const applied = window.__myappStylesheets || (window.__myappStylesheets = {});\n"
+            "if (applied[key]) {\n"
+            "  if (applied[key].replaceSync) {\n"
+            "    applied[key].replaceSync(css);\n"
+            "  } else {\n"
+            "    applied[key].textContent = css;\n"
+            "  }\n"
+            "  return;\n"
+            "}\n"
+            "if ('adoptedStyleSheets' in document && CSSStyleSheet.prototype.replaceSync) {\n"
+            "  const sheet = new CSSStyleSheet();\n"
+            "  sheet.replaceSync(css);\n"
+            "  document.adoptedStyleSheets = document.adoptedStyleSheets.concat([sheet]);\n"
+            "  applied[key] = sheet;\n"
+            "  return;\n"
+            "}\n"
+            "const append = function() {\n"
+            "  const style = document.createElement('style');\n"
+            "  style.textContent = css;\n"
+            "  (document.head || document.documentElement).appendChild(style);\n"
+            "  applied[key] = style;\n"
+            "};\n"
+            "if (document.documentElement) {\n"
+            "  append();\n"
+            "} else {\n"
+            "  document.addEventListener('DOMContentLoaded', append);\n"
+            "}\n"
+            "})();")
+
+
+def _buildWebengineScript(source: str, name: str, injectionPoint, isStylesheet: bool) -> QWebEngineScript:
     script = QWebEngineScript()
-    script_file = QFile(path)
-
-    if script_file.open(QFile.ReadOnly):
-        script_string = str(script_file.readAll(), 'utf-8')
-        script.setInjectionPoint(injectionPoint)
-        script.setName(name)
-        script.setRunsOnSubFrames(True)
-        script.setWorldId(QWebEngineScript.MainWorld)
-        if isStylesheet:
-            source = ("(function(){"
-                      ""
-                      "const css = document.createElement('style');\n"
-                      "css.type = 'text/css';\n"
-                      "css.innerText = `" + script_string.strip() + "`\n"
-                      "document.head.appendChild(css);\n"
-                      "})()")
-            script.setSourceCode(source)
-        else:
-            script.setSourceCode(script_string)
+    script.setInjectionPoint(injectionPoint)
+    script.setName(name)
+    script.setRunsOnSubFrames(True)
+    script.setWorldId(QWebEngineScript.MainWorld)
+    if isStylesheet:
+        source = stylesheetSource(source, name)
+    script.setSourceCode(source)
 
     return script
 
 
+class ScriptCache:
+    """Scripts built from resource files, shared by every page.
+
+    A file is read once and its content kept under its digest, built
+    scripts are keyed by that digest, so identical files share their
+    scripts. Files on disk are watched and dropped from the cache when they
+    change, Qt resources (``:/...``) never change. Files inside a plugin
+    archive are read from the archive, which is watched instead.
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._scripts = {}
+        self._watcher = None
+
+    def source(self, path: str) -> typing.Optional[typing.Tuple[str, str]]:
+        """(digest, content) of the file at path, None if it can't be read."""
+        entry = self._sources.get(path)
+        if entry is None:
+            location = splitArchivePath(path)
+            if location is not None:
+                data = readFile(path)
+                if data is None:
+                    return None
+
+                content = str(data, 'utf-8')
+            else:
+                script_file = QFile(path)
+                if not script_file.open(QFile.ReadOnly):
+                    return None
+
+                content = str(script_file.readAll(), 'utf-8')
+                script_file.close()
+            entry = (hashlib.sha1(content.encode('utf-8')).hexdigest(), content)
+            self._sources[path] = entry
+            self._watch(location[0] if location is not None else path)
+
+        return entry
+
+    def script(self, path: str, name: str, injectionPoint,
+               isStylesheet: bool) -> typing.Optional[QWebEngineScript]:
+        """The script called name built from the file at path, None if it can't be read."""
+        entry = self.source(path)
+        if entry is None:
+            return None
+
+        key = (entry[0], name, int(injectionPoint), isStylesheet)
+        script = self._scripts.get(key)
+        if script is None:
+            script = _buildWebengineScript(
+                entry[1], name, injectionPoint, isStylesheet)
+            self._scripts[key] = script
+
+        return script
+
+    def invalidate(self, path: str) -> None:
+        # a changed archive invalidates every file read from it
+        prefix = path + os.sep
+        stale = [source for source in self._sources
+                 if source == path or source.startswith(prefix)]
+        for source in stale:
+            del self._sources[source]
+
+        if stale:
+            digests = {digest for digest, _ in self._sources.values()}
+            self._scripts = {key: script for key, script in self._scripts.items()
+                             if key[0] in digests}
+
+    def _watch(self, path: str) -> None:
+        if path.startswith(":") or path.startswith("qrc:"):
+            return
+
+        if self._watcher is None:
+            self._watcher = QFileSystemWatcher()
+            self._watcher.fileChanged.connect(self.invalidate)
+
+        self._watcher.addPath(path)
+
+
+scriptCache = ScriptCache()
+
+
+class StylesheetBundle:
+    """Single script applying the css of several files at DocumentCreation.
+
+    The bundle is only rebuilt when the list of files or the content of one
+    of them changes.
+    """
+    NAME = "myapp_stylesheets"
+
+    def __init__(self, cache: ScriptCache = None, minify: bool = False):
+        self._cache = cache if cache is not None else scriptCache
+        self._minify = minify
+        self._key = None
+        self._script = None
+
+    def script(self, paths: typing.List[str]) -> typing.Optional[QWebEngineScript]:
+        """The bundle of paths, None if there is no css to apply."""
+        sources = []
+        for path in paths:
+            entry = self._cache.source(path)
+            if entry is not None:
+                sources.append((path, entry))
+
+        key = tuple((path, entry[0]) for path, entry in sources)
+        if key != self._key:
+            self._key = key
+            self._script = None
+            if sources:
+                css = "\n".join("/* {} */\n{}".format(path, entry[1])
+                                 for path, entry in sources)
+                if self._minify:
+                    css = minifyCss(css)
+                self._script = _buildWebengineScript(
+                    css, self.NAME, QWebEngineScript.DocumentCreation, True)
+
+        return self._script
+
+    def install(self, scripts, paths: typing.List[str]) -> None:
+        """Install the bundle of paths in a QWebEngineScriptCollection, replacing an outdated one."""
+        script = self.script(paths)
+        for installed in scripts.findScripts(self.NAME):
+            if script is not None and installed.sourceCode() == script.sourceCode():
+                return
+            scripts.remove(installed)
+
+        if script is not None:
+            scripts.insert(script)
+
+
+def _createWebengineScript(path: Url, name: str, injectionPoint=None,
+                           isStylesheet: bool = False) -> typing.Optional[QWebEngineScript]:
+
+    if injectionPoint is None:
+        injectionPoint = QWebEngineScript.DocumentCreation
+
+    if isinstance(path, QUrl):
+        path = path.toLocalFile() if path.isLocalFile() else path.toString()
+
+    return scriptCache.script(path, name, injectionPoint, isStylesheet)
+
+
+def installScript(scripts, path: Url, name: str, injectionPoint=None, isStylesheet: bool = False) -> bool:
+    """Insert a script in a QWebEngineScriptCollection unless one with the same name
+    is there. Returns False if it wasn't inserted."""
+    if scripts.findScripts(name):
+        return False
+
+    script = _createWebengineScript(path, name, injectionPoint, isStylesheet)
+    if script is None:
+        logger.warning("cannot read script %s, %s is not installed", path, name)
+        return False
+
+    scripts.insert(script)
+    return True
+
+
 class MyWebPage(QWebEnginePage):
 
     def __init__(self, profile, parent):
@@ -69,10 +308,15 @@ class MyWebPage(QWebEnginePage):
 
     def injectScript(self, path: Url, name: str, injectionPoint=None):
         """Inject javascript to a web page."""
-        script = _createWebengineScript(path, name, injectionPoint, False)
-        self.scripts().insert(script)
+        self._insert(_createWebengineScript(path, name, injectionPoint, False), path)
 
     def injectStylesheet(self, path: Url, name: str, injectionPoint=None):
         """Inject stylesheet to a web page."""
-        script = _createWebengineScript(path, name, injectionPoint, True)
+        self._insert(_createWebengineScript(path, name, injectionPoint, True), path)
+
+    def _insert(self, script: typing.Optional[QWebEngineScript], path: Url) -> None:
+        if script is None:
+            logger.warning("cannot read script %s, it's not injected", path)
+            return
+
         self.scripts().insert(script)
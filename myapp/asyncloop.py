@@ -0,0 +1,222 @@
+import time
+import typing
+import asyncio
+import logging
+
+from PyQt5.QtCore import QObject, QTimer, QEventLoop, QSocketNotifier, QCoreApplication
+
+# wait between two iterations of a loop whose state can't be inspected,
+# while it has unfinished tasks
+POLL_INTERVAL = 10
+# seconds the asyncio loop may keep the Qt event loop waiting while callbacks are ready
+STEP_BUDGET = 0.002
+
+logger = logging.getLogger(__name__)
+
+_driver = None
+
+
+class AsyncioDriver(QObject):
+    """Run an asyncio event loop from the Qt event loop.
+
+    The asyncio loop never blocks: each time something is ready, one
+    iteration of it runs from a Qt timer, with ``loop.stop`` scheduled
+    before ``loop.run_forever()``.
+
+    The event loops of the standard library, ``asyncio.BaseEventLoop``, are
+    inspected, see _canInspect, to run ready callbacks on the next Qt
+    iteration and to map their timers to a single shot QTimer, socket
+    readiness, including ``call_soon_threadsafe`` wakeups, is signaled by a
+    QSocketNotifier on their selector. Other loops are iterated every
+    ``POLL_INTERVAL`` ms while they have unfinished tasks.
+    """
+
+    def __init__(self, parent=None, loop: asyncio.AbstractEventLoop = None):
+        super().__init__(parent)
+        self.loop = loop if loop is not None else asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._step)
+        self._notifier = None
+        self._inspectable = _canInspect(self.loop)
+        # whether the loop had unfinished tasks after the last step, when it can't be inspected
+        self._busy = False
+        if not self._inspectable:
+            logger.debug("%s can't be inspected, it's polled every %d ms",
+                         type(self.loop).__name__, POLL_INTERVAL)
+        selector = getattr(self.loop, "_selector", None) if self._inspectable else None
+        if selector is not None and hasattr(selector, "fileno"):
+            try:
+                self._notifier = QSocketNotifier(selector.fileno(), QSocketNotifier.Read, self)
+                self._notifier.activated.connect(self._step)
+            except (OSError, ValueError, NotImplementedError):
+                self._notifier = None
+
+    def _step(self) -> None:
+        if self.loop.is_closed():
+            return
+
+        if self.loop.is_running():
+            # called from a nested Qt event loop started by an asyncio callback
+            self.wakeup(POLL_INTERVAL)
+            return
+
+        # chained callbacks, e.g. a future resolving a task, run in the same
+        # step instead of one Qt iteration each
+        deadline = time.perf_counter() + STEP_BUDGET
+        while True:
+            self._tick()
+            if not self._inspectable or not self.loop._ready or time.perf_counter() > deadline:
+                break
+
+        self._rearm()
+
+    def _tick(self) -> None:
+        """Run one iteration of the loop, the callbacks ready when it starts."""
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+
+    def _rearm(self) -> None:
+        if not self._inspectable:
+            busy = bool(asyncio.all_tasks(self.loop))
+            if busy:
+                self.wakeup(POLL_INTERVAL)
+            elif self._busy:
+                # done callbacks of the last tasks are run by the next iteration
+                self.wakeup(0)
+            self._busy = busy
+        elif self.loop._ready:
+            self.wakeup(0)
+        elif self.loop._scheduled:
+            delay = self.loop._scheduled[0].when() - self.loop.time()
+            self.wakeup(max(0, int(delay * 1000) + 1))
+        elif self._notifier is None:
+            self.wakeup(POLL_INTERVAL)
+
+    def wakeup(self, delay: int = 0) -> None:
+        """Run an iteration of the asyncio loop in delay milliseconds, or sooner."""
+        if not self._timer.isActive() or self._timer.remainingTime() > delay:
+            self._timer.start(delay)
+
+    def schedule(self, coro: typing.Awaitable, timeout: float = None, name: str = None) -> asyncio.Task:
+        """Run coro as a task on the loop, cancelled if it runs longer than timeout seconds."""
+        if timeout is not None and timeout > 0:
+            coro = _budgeted(coro, timeout, name)
+        elif not asyncio.iscoroutine(coro):
+            coro = _awaited(coro)
+
+        task = self.loop.create_task(coro, name=name)
+        task.add_done_callback(_report)
+
+        self.wakeup(0)
+        return task
+
+    def wait(self, tasks: typing.Iterable[asyncio.Future], timeout: float = None) -> bool:
+        """Run the Qt event loop until every task is done.
+
+        The user interface keeps processing events while waiting. Returns
+        False if the tasks were not done before timeout seconds.
+        """
+        pending = [task for task in tasks if not task.done()]
+        if not pending:
+            return True
+
+        if self.loop.is_running():
+            logger.warning("can't wait for tasks from a coroutine, await them instead")
+            return False
+
+        eventLoop = QEventLoop()
+        remaining = len(pending)
+
+        def done(_):
+            nonlocal remaining
+            remaining -= 1
+            if remaining == 0:
+                eventLoop.quit()
+
+        for task in pending:
+            task.add_done_callback(done)
+        if timeout is not None:
+            timer = QTimer(eventLoop)
+            timer.setSingleShot(True)
+            timer.timeout.connect(eventLoop.quit)
+            timer.start(int(timeout * 1000))
+
+        self.wakeup(0)
+        eventLoop.exec_()
+        for task in pending:
+            task.remove_done_callback(done)
+
+        return all(task.done() for task in pending)
+
+    def close(self) -> None:
+        """Cancel the remaining tasks and close the loop."""
+        if self.loop.is_closed():
+            return
+
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+        self._timer.stop()
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+        self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        self.loop.close()
+
+
+def _canInspect(loop: asyncio.AbstractEventLoop) -> bool:
+    """Whether the ready queue and timer heap of loop can be read.
+
+    They're the private ``_ready`` and ``_scheduled`` attributes of CPython's
+    ``asyncio.BaseEventLoop``, not an API, so they're only used when they
+    exist. Other loops fall back to a POLL_INTERVAL timer.
+    """
+    return isinstance(loop, asyncio.BaseEventLoop) and \
+        hasattr(loop, "_ready") and hasattr(loop, "_scheduled")
+
+
+async def _awaited(awaitable: typing.Awaitable):
+    return await awaitable
+
+
+async def _budgeted(coro: typing.Awaitable, timeout: float, name: str):
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        logger.warning("%s cancelled after %.0f ms, its budget is %.0f ms",
+                       name or "coroutine", (time.perf_counter() - start) * 1000, timeout * 1000)
+        raise
+
+
+def _report(task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+
+    error = task.exception()
+    if error is not None and not isinstance(error, asyncio.TimeoutError):
+        logger.error("%s failed", task.get_name(),
+                     exc_info=(type(error), error, error.__traceback__))
+
+
+def driver() -> AsyncioDriver:
+    """The asyncio driver of the application, created on first use."""
+    global _driver
+    if _driver is None:
+        _driver = AsyncioDriver(QCoreApplication.instance())
+
+    return _driver
+
+
+def schedule(coro: typing.Awaitable, timeout: float = None, name: str = None) -> asyncio.Task:
+    return driver().schedule(coro, timeout, name)
+
+
+def close() -> None:
+    """Close the loop of the driver if it was created."""
+    if _driver is not None:
+        _driver.close()
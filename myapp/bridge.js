@@ -0,0 +1,74 @@
+(function() {
+  "use strict";
+  if (window.myapp && window.myapp.call) {
+    return;
+  }
+
+  const pending = new Map();
+  let queue = [];
+  let nextId = 1;
+  let bridge = null;
+  let scheduled = false;
+  let resolveChannel;
+  const channel = new Promise(function(resolve) { resolveChannel = resolve; });
+
+  // calls made in the same tick are sent as one message
+  function flush() {
+    scheduled = false;
+    if (bridge === null || queue.length === 0) {
+      return;
+    }
+    const batch = queue;
+    queue = [];
+    bridge.call(JSON.stringify(batch));
+  }
+
+  function call(method) {
+    const args = Array.prototype.slice.call(arguments, 1);
+    return new Promise(function(resolve, reject) {
+      const id = nextId++;
+      pending.set(id, { resolve: resolve, reject: reject });
+      queue.push([id, method, args]);
+      if (!scheduled) {
+        scheduled = true;
+        queueMicrotask(flush);
+      }
+    });
+  }
+
+  function resolved(message) {
+    const replies = JSON.parse(message);
+    for (let i = 0; i < replies.length; i++) {
+      const callback = pending.get(replies[i][0]);
+      if (callback === undefined) {
+        continue;
+      }
+      pending.delete(replies[i][0]);
+      if (replies[i][1]) {
+        callback.resolve(replies[i][2]);
+      } else {
+        callback.reject(new Error(replies[i][2]));
+      }
+    }
+  }
+
+  function connect() {
+    if (typeof qt === "undefined" || typeof QWebChannel === "undefined") {
+      return false;
+    }
+    new QWebChannel(qt.webChannelTransport, function(webChannel) {
+      bridge = webChannel.objects.myappBridge;
+      bridge.resolved.connect(resolved);
+      resolveChannel(webChannel);
+      flush();
+    });
+    return true;
+  }
+
+  // a page creating its own QWebChannel would replace the transport handler,
+  // myapp.channel resolves with the channel shared with the bridge instead
+  window.myapp = Object.assign(window.myapp || {}, { call: call, channel: channel });
+  if (!connect()) {
+    document.addEventListener("DOMContentLoaded", connect);
+  }
+})();
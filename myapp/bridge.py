@@ -0,0 +1,246 @@
+import os
+import json
+import inspect
+import time
+import typing
+import logging
+import threading
+import concurrent.futures
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+from .utils import SignalStats, postToEventLoop
+
+logger = logging.getLogger(__name__)
+
+# name the bridge object is published with on the web channel
+BRIDGE_OBJECT = "myappBridge"
+# javascript client exposing window.myapp.call(), must be injected after qwebchannel.js
+BRIDGE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bridge.js")
+
+
+def blocking(func: typing.Callable) -> typing.Callable:
+    """Mark a bridge method as blocking, it's called on the bridge thread pool
+    instead of the GUI thread."""
+    func._bridgeBlocking = True
+    return func
+
+
+class MethodStats(SignalStats):
+    """Call counters and latency histogram of a bridge method."""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = 0
+
+    def asDict(self) -> dict:
+        stats = super().asDict()
+        stats["calls"] = stats.pop("emits")
+        stats["errors"] = self.errors
+        return stats
+
+
+class BridgeMethod:
+    __slots__ = ("name", "func", "blocking", "owner", "stats")
+
+    def __init__(self, name: str, func: typing.Callable, blocking: bool, owner: str):
+        self.name = name
+        self.func = func
+        self.blocking = blocking
+        self.owner = owner
+        self.stats = MethodStats()
+
+
+def _owner(func: typing.Callable) -> typing.Optional[str]:
+    """Name of the plugin func was defined in, from its module myapp.plugins.<name>."""
+    module = getattr(func, "__module__", None) or ""
+    if module.startswith("myapp.plugins."):
+        return module.split(".")[2]
+
+    return None
+
+
+class BridgeRegistry:
+    """Python methods callable from javascript with ``myapp.call(name, ...args)``.
+
+    The registry is shared by the bridges of every window. Methods exposed
+    by a plugin module are removed when the plugin is disabled.
+    """
+
+    def __init__(self, workers: int = None):
+        self._methods: typing.Dict[str, BridgeMethod] = {}
+        self._workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def setWorkers(self, workers: int = None) -> None:
+        """Size of the thread pool running blocking methods, applied when it's next created."""
+        self._workers = workers
+
+    def expose(self, name: str, func: typing.Callable, blocking: bool = None,
+               owner: str = None) -> None:
+        """Make func callable as name, blocking defaults to the @blocking marker of func
+        and owner to the plugin func is defined in."""
+        if blocking is None:
+            blocking = getattr(func, "_bridgeBlocking", False)
+        if owner is None:
+            owner = _owner(func)
+
+        self._methods[name] = BridgeMethod(name, func, blocking, owner)
+
+    def exposeObject(self, namespace: str, obj) -> None:
+        """Expose every public callable attribute of obj as <namespace>.<attribute>."""
+        for attr in dir(obj):
+            if not attr.startswith("_"):
+                func = getattr(obj, attr)
+                if callable(func):
+                    self.expose(f"{namespace}.{attr}", func)
+
+    def remove(self, name: str) -> None:
+        self._methods.pop(name, None)
+
+    def removeOwner(self, owner: str) -> None:
+        """Remove the methods exposed by the plugin owner."""
+        self._methods = {name: method for name, method in self._methods.items()
+                         if method.owner != owner}
+
+    def names(self, owner: str = None) -> typing.List[str]:
+        """Names of the exposed methods, only the ones of the plugin owner if it's given."""
+        return [name for name, method in self._methods.items()
+                if owner is None or method.owner == owner]
+
+    def method(self, name: str) -> typing.Optional[BridgeMethod]:
+        return self._methods.get(name)
+
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self._workers, thread_name_prefix="bridge")
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def stats(self) -> typing.Dict[str, dict]:
+        """Call statistics of every method that was called, by method name."""
+        return {name: method.stats.asDict()
+                for name, method in self._methods.items() if method.stats.emits}
+
+
+registry = BridgeRegistry()
+
+
+class Bridge(QObject):
+    """Web channel object dispatching batched calls to a BridgeRegistry.
+
+    The javascript client sends every call made in the same tick as one
+    JSON message ``[[id, method, args], ...]``. Results are sent back the
+    same way with the ``resolved`` signal, ``[[id, ok, value], ...]``,
+    replies completed in the same event loop iteration are batched too.
+    """
+    resolved = pyqtSignal(str)
+
+    def __init__(self, methods: BridgeRegistry = None, parent=None):
+        super().__init__(parent)
+        self._registry = methods if methods is not None else registry
+        self._replies = []
+        self._flushTimer = QTimer(self)
+        self._flushTimer.setSingleShot(True)
+        self._flushTimer.setInterval(0)
+        self._flushTimer.timeout.connect(self._flush)
+
+    @pyqtSlot(str)
+    def call(self, batch: str) -> None:
+        try:
+            calls = [(callId, name, list(args)) for callId, name, args in json.loads(batch)]
+        except (ValueError, TypeError):
+            logger.warning("bridge received an invalid batch")
+            return
+
+        for callId, name, args in calls:
+            self._invoke(callId, name, args)
+
+    def _invoke(self, callId, name: str, args: list) -> None:
+        method = self._registry.method(name)
+        if method is None:
+            self._reply(callId, False, f"no bridge method {name}")
+            return
+
+        start = time.perf_counter()
+        if method.blocking:
+            future = self._registry.executor().submit(method.func, *args)
+            future.add_done_callback(
+                lambda f: postToEventLoop(self._complete, method, callId, start, f))
+            return
+
+        try:
+            result = method.func(*args)
+        except Exception as e:
+            self._failed(method, callId, start, e)
+            return
+
+        if inspect.isawaitable(result):
+            # async def methods run on the asyncio loop, the call is
+            # resolved when the coroutine returns
+            from . import asyncloop
+            task = asyncloop.schedule(result, name=f"bridge method {name}")
+            task.add_done_callback(
+                lambda t: self._complete(method, callId, start, t))
+        else:
+            self._succeeded(method, callId, start, result)
+
+    def _complete(self, method: BridgeMethod, callId, start: float, future) -> None:
+        if sip.isdeleted(self):
+            # the window was closed while the call was running
+            return
+
+        if future.cancelled():
+            self._failed(method, callId, start, RuntimeError("call cancelled"))
+            return
+
+        error = future.exception()
+        if error is not None:
+            self._failed(method, callId, start, error)
+        else:
+            self._succeeded(method, callId, start, future.result())
+
+    def _succeeded(self, method: BridgeMethod, callId, start: float, result) -> None:
+        method.stats.record(time.perf_counter() - start, 1)
+        self._reply(callId, True, result)
+
+    def _failed(self, method: BridgeMethod, callId, start: float, error: BaseException) -> None:
+        method.stats.record(time.perf_counter() - start, 1)
+        method.stats.errors += 1
+        logger.error("bridge method %s failed", method.name,
+                     exc_info=(type(error), error, error.__traceback__))
+        self._reply(callId, False, str(error))
+
+    def _reply(self, callId, ok: bool, value) -> None:
+        self._replies.append([callId, ok, value])
+        if not self._flushTimer.isActive():
+            self._flushTimer.start()
+
+    def _flush(self) -> None:
+        replies, self._replies = self._replies, []
+        if not replies:
+            return
+
+        try:
+            message = json.dumps(replies)
+        except (TypeError, ValueError):
+            # send what can be serialized, fail the other calls
+            message = json.dumps([self._serializable(reply) for reply in replies])
+
+        self.resolved.emit(message)
+
+    def _serializable(self, reply: list) -> list:
+        try:
+            json.dumps(reply[2])
+            return reply
+        except (TypeError, ValueError):
+            return [reply[0], False, "result is not JSON serializable"]
@@ -1,15 +1,122 @@
 import os
-import traceback  # noqa
+import copy
+import time
+import struct
+import marshal
 import typing
+import logging
+import weakref
+import tempfile
 import functools
+import threading
+import contextlib
 
 from typing import Callable
 
-import yaml
 from .utils import Signal
 
+logger = logging.getLogger(__name__)
+
 config = None
-change_filters = {}
+
+# configuration layers, from the lowest to the highest priority: built-in
+# defaults, defaults registered by plugins, the user's file and overrides
+# made while the application runs. Only the user layer is saved.
+DEFAULTS_LAYER = "defaults"
+PLUGINS_LAYER = "plugins"
+USER_LAYER = "user"
+RUNTIME_LAYER = "runtime"
+LAYERS = (DEFAULTS_LAYER, PLUGINS_LAYER, USER_LAYER, RUNTIME_LAYER)
+
+# built-in defaults of the options read at startup
+DEFAULTS = {
+    "configuration": {"autosave": False, "autosaveDelay": 1.0},
+    "appScheme": {"cacheBytes": 32 * 1024 * 1024, "mmapThreshold": 1024 * 1024},
+    "windowPool": {"size": 1, "recycle": True, "warmDelay": 500},
+    "pluginManager": {"lazy": False, "profileHooks": False, "slowHookBudget": 50,
+                      "slowHookWarnInterval": 10.0, "hotReload": False, "reloadDelay": 200,
+                      "workerProcesses": 2},
+    "logging": {"level": "info", "stream": "stdout",
+                "rateLimit": {"burst": 5, "interval": 10.0}},
+}
+
+CACHE_MAGIC = b"myapp-config-cache\x01"
+_CACHE_HEADER = struct.Struct("<qq")
+# path -> (mtime_ns, size, marshalled tree) of the yaml files already parsed
+_parsedFiles = {}
+
+
+def _cachePath(path: str) -> str:
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, "." + filename + ".cache")
+
+
+def _readCache(path: str, st: os.stat_result) -> typing.Optional[bytes]:
+    try:
+        with open(_cachePath(path), "rb") as f:
+            if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                return None
+            mtime, size = _CACHE_HEADER.unpack(f.read(_CACHE_HEADER.size))
+            if mtime != st.st_mtime_ns or size != st.st_size:
+                return None
+            data = f.read()
+        marshal.loads(data)
+        return data
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+
+
+def _writeCache(path: str, st: os.stat_result, data: bytes) -> None:
+    cache_path = _cachePath(path)
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(CACHE_MAGIC)
+            f.write(_CACHE_HEADER.pack(st.st_mtime_ns, st.st_size))
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # the cache is optional, e.g. the config directory is read-only
+        pass
+
+
+def parseYaml(stream):
+    # yaml is imported on first use, a config in the parsed-config cache is
+    # loaded without it. libyaml is used when PyYAML was built with it.
+    import yaml
+    return yaml.load(stream, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def dumpYaml(tree) -> str:
+    import yaml
+    return yaml.dump(tree, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+
+
+def loadYaml(path: str):
+    """Parse a yaml file, reusing the previous result while the file doesn't change.
+
+    Parsed trees are kept in memory and in a binary cache file next to the
+    yaml file, both keyed by the file mtime and size. Every call returns a
+    new copy of the tree.
+    """
+    st = os.stat(path)
+    entry = _parsedFiles.get(path)
+    if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        return marshal.loads(entry[2])
+
+    data = _readCache(path, st)
+    if data is None:
+        with open(path, 'r') as f:
+            tree = parseYaml(f)
+        try:
+            data = marshal.dumps(tree)
+        except ValueError:
+            # values marshal can't store, e.g. timestamps, are parsed each time
+            return tree
+        _writeCache(path, st, data)
+
+    _parsedFiles[path] = (st.st_mtime_ns, st.st_size, data)
+    return marshal.loads(data)
 
 
 def getInstance():
@@ -17,15 +124,121 @@ def getInstance():
     return config
 
 
+class ConfigKey:
+    """A dotted config key split once into its path."""
+    __slots__ = ("key", "parts", "parents", "last", "prefixes")
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.parts = tuple(key.split("."))
+        self.parents = self.parts[:-1]
+        self.last = self.parts[-1]
+        # keys of the ancestors and of the key itself, a, a.b, a.b.c
+        self.prefixes = tuple(".".join(self.parts[:i]) for i in range(1, len(self.parts) + 1))
+
+    def lookup(self, tree: dict):
+        """Value at this path in tree, None if it doesn't exist."""
+        try:
+            for k in self.parts:
+                tree = tree[k]
+        except (KeyError, TypeError, IndexError):
+            return None
+
+        return tree
+
+
+@functools.lru_cache(maxsize=4096)
+def compileKey(key: str) -> ConfigKey:
+    return ConfigKey(key)
+
+
+class ConfigAccessor:
+    """Cached read access to a single config key.
+
+    The resolved value is kept until the configuration version changes.
+    """
+
+    def __init__(self, configuration, key: str) -> None:
+        self._configuration = configuration
+        self._key = compileKey(key)
+        self._version = -1
+        self._value = None
+
+    def get(self, defaultValue=None):
+        if self._version != self._configuration.version:
+            self._value = self._configuration._lookup(self._key)
+            self._version = self._configuration.version
+
+        if self._value is None and defaultValue is not None:
+            return defaultValue
+
+        return self._value
+
+
+class FilterTrie:
+    """Change filters indexed by their dotted option path.
+
+    A change of ``a.b.c`` only visits the nodes ``a``, ``a.b`` and ``a.b.c``,
+    so the lookup cost depends on the key depth, not the number of filters.
+    """
+
+    def __init__(self) -> None:
+        self._root = {}
+        self._filters = "__filters__"
+
+    def add(self, option: str, changeFilter) -> None:
+        node = self._root
+        for k in compileKey(option).parts:
+            node = node.setdefault(k, {})
+        node.setdefault(self._filters, []).append(changeFilter)
+
+    def remove(self, option: str, changeFilter) -> None:
+        node = self._root
+        for k in compileKey(option).parts:
+            node = node.get(k)
+            if node is None:
+                return
+        filters = node.get(self._filters, [])
+        if changeFilter in filters:
+            filters.remove(changeFilter)
+
+    def match(self, option: str) -> list:
+        """Filters registered on option or one of its ancestors."""
+        matches = []
+        node = self._root
+        for k in compileKey(option).parts:
+            node = node.get(k)
+            if node is None:
+                break
+            matches.extend(node.get(self._filters, ()))
+
+        return matches
+
+
+change_filters = FilterTrie()
+
+
+def _dispatchChange(option: str, value) -> None:
+    for changeFilter in change_filters.match(option):
+        changeFilter.notify(option, value)
+
+
 class change_filter:
+    """Call the decorated function or method when a matching option changes.
+
+    Filters are registered on ``Configuration.changed`` automatically. For
+    methods, the instances of the owner class receive changes once they're
+    passed to registerChangeFilters, early in their ``__init__`` so
+    changes made during construction are already delivered.
+    """
+
     def __init__(self, option, function: bool = False) -> None:
         self._option = option
         self._function = function
+        self._instances = weakref.WeakSet()
+        self.callback = None
 
-        if not option in change_filters.keys():
-            change_filters[option] = []
-
-        change_filters[option].append(self)
+        change_filters.add(option, self)
 
     def checkMatch(self, option: str = None) -> bool:
         """Check if the given option matches the filter."""
@@ -40,6 +253,17 @@ class change_filter:
         else:
             return False
 
+    def notify(self, option: str, value) -> None:
+        """Deliver a change of option to the decorated function or methods."""
+        if self.callback is None:
+            return
+
+        if self._function:
+            self.callback(option, value)
+        else:
+            for instance in list(self._instances):
+                self.callback(instance, option, value)
+
     def __call__(self, func: Callable) -> Callable:
         """Filter calls to the decorated function.
 
@@ -73,16 +297,239 @@ class change_filter:
                     return func(self_wrapper, option, value)
                 return None
             self.callback = meth_wrapper
-            return meth_wrapper
+            return _FilteredMethod(self, meth_wrapper)
+
+
+class _FilteredMethod:
+    """Method decorated with change_filter, recorded on the owner class."""
+
+    def __init__(self, changeFilter: change_filter, func: Callable) -> None:
+        self._filter = changeFilter
+        self._func = func
+        functools.update_wrapper(self, func)
+
+    def __set_name__(self, owner, name) -> None:
+        if "_changeFilters" not in owner.__dict__:
+            owner._changeFilters = []
+        owner._changeFilters.append(self._filter)
+
+    def __get__(self, obj, objtype=None):
+        return self._func.__get__(obj, objtype)
+
+
+def registerChangeFilters(instance) -> None:
+    """Call the change_filter methods of instance, and of its base classes,
+    on matching changes. instance is referenced weakly::
+
+        class Window(QWidget):
+            def __init__(self):
+                super().__init__()
+                registerChangeFilters(self)
+
+            @change_filter("window")
+            def _windowChanged(self, key, value):
+                ...
+    """
+    for klass in type(instance).__mro__:
+        for changeFilter in klass.__dict__.get("_changeFilters", ()):
+            changeFilter._instances.add(instance)
+
+
+_MISSING = object()
+
+
+def _merge(trees: typing.List[dict]) -> dict:
+    """Merge dicts, later ones taking precedence, None values don't override.
+    Only the dicts present in more than one tree are copied, other values
+    are shared."""
+    merged = dict(trees[0])
+    for tree in trees[1:]:
+        for k, value in tree.items():
+            if value is None and k in merged:
+                continue
+            previous = merged.get(k)
+            if isinstance(value, dict) and isinstance(previous, dict):
+                merged[k] = _merge([previous, value])
+            else:
+                merged[k] = value
+
+    return merged
+
+
+def _leaves(tree: dict, prefix: str) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+    """(dotted key, value) of the values of tree which aren't non-empty dicts."""
+    for k, value in tree.items():
+        key = f"{prefix}.{k}"
+        if isinstance(value, dict) and value:
+            yield from _leaves(value, key)
+        else:
+            yield key, value
+
+
+class MergedView:
+    """Memoized reads of the merged configuration layers.
+
+    A key is resolved the first time it's read, from the highest layer
+    defining it, dicts defined by several layers are merged. A layer defining
+    a value other than a dict at a key or one of its ancestors hides the key
+    in the layers below, None values are ignored. Resolved values
+    are kept until a set invalidates them: a change of ``a.b`` forgets
+    ``a``, ``a.b`` and the keys below ``a.b``, other keys stay memoized.
+    Values are shared with the layers, they must be changed with set.
+    """
+
+    def __init__(self, layers: typing.List[dict]) -> None:
+        self._layers = layers
+        # dotted key -> resolved value, None if no layer defines it
+        self.values = {}
+        # key parts of the memoized keys, to find the ones below a changed key
+        self._trie = {}
+
+    def get(self, compiled: ConfigKey):
+        value = self.values.get(compiled.key, _MISSING)
+        if value is _MISSING:
+            value = self._resolve(compiled)
+            self.values[compiled.key] = value
+            node = self._trie
+            for k in compiled.parts:
+                node = node.setdefault(k, {})
+
+        return value
+
+    def _resolve(self, compiled: ConfigKey):
+        dicts = []
+        for layer in reversed(self._layers):
+            value = layer
+            for k in compiled.parts:
+                if not isinstance(value, dict):
+                    # an ancestor of the key is a value, it hides the lower layers
+                    value = _MISSING
+                    break
+                value = value.get(k)
+                if value is None:
+                    break
+            if value is _MISSING:
+                break
+            if value is None:
+                continue
+            if not isinstance(value, dict):
+                if not dicts:
+                    return value
+                break
+            dicts.append(value)
+
+        if not dicts:
+            return None
+        if len(dicts) == 1:
+            return dicts[0]
+        return _merge(dicts[::-1])
+
+    def invalidate(self, compiled: ConfigKey) -> None:
+        values = self.values
+        for key in compiled.prefixes:
+            values.pop(key, None)
+
+        parent = None
+        node = self._trie
+        for k in compiled.parts:
+            parent, node = node, node.get(k)
+            if node is None:
+                return
+
+        stack = [(compiled.key, node)]
+        while stack:
+            prefix, node = stack.pop()
+            for k, child in node.items():
+                key = prefix + "." + k
+                self.values.pop(key, None)
+                stack.append((key, child))
+        del parent[compiled.last]
+
+    def clear(self) -> None:
+        self.values.clear()
+        self._trie.clear()
+
+
+class _Autosave(threading.Thread):
+    """Worker thread saving a configuration once it stopped changing for a while."""
+
+    def __init__(self, configuration) -> None:
+        super().__init__(name="config-autosave", daemon=True)
+        self._configuration = configuration
+        self._cond = threading.Condition()
+        self._due = None
+        self._saving = False
+        self._stopped = False
+        self.start()
+
+    def schedule(self, delay: float) -> None:
+        with self._cond:
+            self._due = time.monotonic() + delay
+            self._cond.notify_all()
+
+    def run(self) -> None:
+        while True:
+            with self._cond:
+                while self._due is None or self._due > time.monotonic():
+                    if self._stopped and self._due is None:
+                        return
+                    timeout = None if self._due is None else self._due - time.monotonic()
+                    self._cond.wait(timeout)
+                self._due = None
+                self._saving = True
+
+            try:
+                self._configuration._saveSnapshot()
+            except Exception:
+                logger.exception("cannot save config file %s", self._configuration.loadFrom)
+
+            with self._cond:
+                self._saving = False
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Save now if a save is pending and wait for it to finish."""
+        with self._cond:
+            if self._due is not None:
+                self._due = 0
+                self._cond.notify_all()
+            while self._due is not None or self._saving:
+                self._cond.wait()
+
+    def stop(self) -> None:
+        self.flush()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self.join()
 
 
 class Configuration:
+    """Configuration layers read through a MergedView.
+
+    ``config`` is the user layer, loaded from and saved to loadFrom.
+    """
     _filters = []
     changed = Signal()
+    # emitted once per set, or once per transaction, with a {key: value} dict
+    batchChanged = Signal()
 
     def __init__(self, path: str = None) -> None:
         self.loadFrom = path
         self.config = self.loadConfig()
+        self._layers = {DEFAULTS_LAYER: self.loadDefaultConfig(), PLUGINS_LAYER: {},
+                        USER_LAYER: self.config, RUNTIME_LAYER: {}}
+        self._view = MergedView([self._layers[name] for name in LAYERS])
+        # incremented on every change, lets callers cache resolved values
+        self.version = 0
+        self.changed.connect(_dispatchChange)
+        self._lock = threading.RLock()
+        self._saveLock = threading.Lock()
+        self._transaction = None
+        self._transactionDepth = 0
+        self._undo = None
+        self._autosaveDelay = None
+        self._autosave = None
 
         global config
         config = self  # noqa
@@ -103,87 +550,232 @@ class Configuration:
     def loadConfig(self, key: str = None) -> dict:
         config = dict()
         try:
-            with open(self.loadFrom, 'r') as f:
-                data = f.read()
+            if key is not None and self._filters:
+                # filters rewrite the raw text, so it can't come from the cache
+                with open(self.loadFrom, 'r') as f:
+                    data = self._filterData(key, f.read())
+                config = parseYaml(data)[key]
+            else:
+                config = loadYaml(self.loadFrom)
                 if key is not None:
-                    data = self._filterData(key, data)
-                    config = yaml.safe_load(data)
                     config = config[key]
-                else:
-                    config = yaml.safe_load(data)
         except Exception:
-            print(
-                "couldn't load config file from {}".format(self.loadFrom))
+            logger.warning("couldn't load config file from %s", self.loadFrom)
+
+        if config is None:
+            config = dict()
 
         return {key: value for key, value in config.items()}
 
     def keys(self):
-        return self.config.keys()
+        keys = {}
+        for name in LAYERS:
+            keys.update(dict.fromkeys(self._layers[name]))
+        return keys.keys()
+
+    def layer(self, name: str) -> dict:
+        """The tree of one of the LAYERS."""
+        return self._layers[name]
+
+    def _lookup(self, compiled: ConfigKey):
+        value = self._view.values.get(compiled.key, _MISSING)
+        if value is _MISSING:
+            with self._lock:
+                value = self._view.get(compiled)
+        return value
 
     def get(self, key: str, defaultValue=None):
-        temp = None
-        try:
-            for k in key.split("."):
-                if temp is None:
-                    temp = self.config[k]
-                else:
-                    temp = temp[k]
-        except Exception:
-            print("cannot get config value for {}".format(key))
-            temp = None
+        # memoized values are read without the lock, set invalidates them holding it
+        temp = self._view.values.get(key, _MISSING)
+        if temp is _MISSING:
+            with self._lock:
+                temp = self._view.get(compileKey(key))
 
         if temp is None and defaultValue is not None:
             return defaultValue
 
         return temp
 
-    def set(self, key, value) -> None:
-        temp = None
+    def accessor(self, key: str) -> ConfigAccessor:
+        """Cached accessor for key, cheaper than get for values read repeatedly."""
+        return ConfigAccessor(self, key)
+
+    def set(self, key, value, layer: str = USER_LAYER) -> None:
+        """Set key in layer, the user layer by default. changed is emitted
+        even if a higher layer overrides the value."""
         try:
-            splitted = key.split(".")
-            if len(splitted) > 1:
-                max_slice = len(splitted) - 1
-                for k in splitted[0:max_slice]:
-                    if temp is None:
-                        if not k in self.config.keys():
-                            self.config[k] = {}
-
-                        temp = self.config[k]
-                    else:
-                        if not k in temp.keys():
-                            temp[k] = {}
-
-                        temp = temp[k]
-
-                temp[splitted[max_slice]] = value
-            else:
-                self.config[key] = value
+            compiled = compileKey(key)
+            with self._lock:
+                temp = self._layers[layer]
+                for k in compiled.parents:
+                    if not k in temp.keys():
+                        temp[k] = {}
+                        if self._undo is not None:
+                            self._undo.append((temp, k, _MISSING))
 
-            self.changed.emit(key, value)
+                    temp = temp[k]
+
+                if self._undo is not None:
+                    self._undo.append(
+                        (temp, compiled.last, temp.get(compiled.last, _MISSING)))
+                temp[compiled.last] = value
+                self._view.invalidate(compiled)
+                self.version += 1
+
+            if self._transaction is not None:
+                self._transaction[key] = value
+            else:
+                self._notify({key: value})
 
         except Exception:
-            print("cannot set config value for {}".format(key))
-            temp = None
+            logger.exception("cannot set config value for %s", key)
+
+    def setDefaults(self, plugin: str, tree: dict) -> None:
+        """Register the default options of plugin, ``plugins.<plugin>.*``, in the
+        plugins layer. They're overridden by the user's file and aren't saved::
+
+            getInstance().setDefaults("myplugin", {"width": 80, "colors": {"fg": "black"}})
+        """
+        with self.transaction():
+            for key, value in _leaves(tree, f"plugins.{plugin}"):
+                self.set(key, value, layer=PLUGINS_LAYER)
+
+    def unset(self, key: str, layer: str = RUNTIME_LAYER) -> None:
+        """Remove key from layer, e.g. a runtime override, changed is emitted
+        with the value key falls back to."""
+        compiled = compileKey(key)
+        with self._lock:
+            # (container, key) of the key and of its ancestors, outermost first
+            path = []
+            container = self._layers[layer]
+            for k in compiled.parts:
+                if not isinstance(container, dict) or k not in container:
+                    return
+                path.append((container, k))
+                container = container[k]
+
+            # ancestors left empty are removed too, so save doesn't write them
+            for i, (container, k) in enumerate(reversed(path)):
+                if i > 0 and container[k]:
+                    break
+                if self._undo is not None:
+                    self._undo.append((container, k, container[k]))
+                del container[k]
+            self._view.invalidate(compiled)
+            self.version += 1
+
+        value = self.get(key)
+        if self._transaction is not None:
+            self._transaction[key] = value
+        else:
+            self._notify({key: value})
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Apply the sets made inside the block as a single change.
+
+        Values are visible to get right away. When the block ends, changed
+        is emitted once per key with its last value and batchChanged once
+        with all of them. If the block raises, the previous values are
+        restored and nothing is emitted. Nested transactions join the
+        outermost one.
+        """
+        if self._transactionDepth == 0:
+            self._transaction = {}
+            self._undo = []
+        self._transactionDepth += 1
+
+        committed = False
+        try:
+            yield self
+            committed = True
+        finally:
+            self._transactionDepth -= 1
+            if self._transactionDepth == 0:
+                changes, undo = self._transaction, self._undo
+                self._transaction = self._undo = None
+                if committed:
+                    if changes:
+                        self._notify(changes)
+                else:
+                    self._rollback(undo)
 
-    def save(self, path=None):
+    def _rollback(self, undo: list) -> None:
+        with self._lock:
+            for container, key, value in reversed(undo):
+                if value is _MISSING:
+                    container.pop(key, None)
+                else:
+                    container[key] = value
+            self._view.clear()
+            self.version += 1
 
-        if path is None:
+    def _notify(self, changes: dict) -> None:
+        for key, value in changes.items():
+            self.changed.emit(key, value)
+        self.batchChanged.emit(changes)
+
+        if self._autosave is not None:
+            self._autosave.schedule(self._autosaveDelay)
+
+    def setAutosave(self, enabled: bool = True, delay: float = 1.0) -> None:
+        """Save the config file from a worker thread once it didn't change for delay seconds."""
+        if enabled:
+            self._autosaveDelay = delay
+            if self._autosave is None:
+                self._autosave = _Autosave(self)
+        elif self._autosave is not None:
+            self._autosave.stop()
+            self._autosave = None
+
+    def flush(self) -> None:
+        """Write a pending autosave now and wait until it's done."""
+        if self._autosave is not None:
+            self._autosave.flush()
 
-            writable = os.access(os.path.dirname(self.loadFrom), os.W_OK)
-            data = yaml.dump(self.config)
-            if writable:
-                with open(self.loadFrom, "w+") as f:
-                    f.write(data)
-            else:
-                print(
-                    "Cannot save config file, file is not writable.")
+    def save(self, path=None):
+        """Write the user layer, defaults and runtime overrides aren't saved."""
+        target = self.loadFrom if path is None else path
+        if not os.access(os.path.dirname(os.path.abspath(target)), os.W_OK):
+            logger.warning("cannot save config file %s, it's not writable", target)
+            return
+
+        with self._saveLock:
+            with self._lock:
+                data = dumpYaml(self.config)
+            self._writeFile(target, data)
+
+    def _saveSnapshot(self) -> None:
+        """Save from the autosave thread, only copying the tree while holding the lock."""
+        if not os.access(os.path.dirname(os.path.abspath(self.loadFrom)), os.W_OK):
+            logger.warning("cannot save config file %s, it's not writable", self.loadFrom)
+            return
+
+        with self._saveLock:
+            with self._lock:
+                snapshot = copy.deepcopy(self.config)
+            self._writeFile(self.loadFrom, dumpYaml(snapshot))
+
+    def _writeFile(self, path: str, data: str) -> None:
+        """Replace path with data atomically, a crash leaves either the old or the new file."""
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(path):
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
 
     def loadDefaultConfig(self) -> dict:
-        load_from_orig = self.loadFrom  # noqa
-        self.loadFrom = __file__
-        defaultConfig = self.loadConfig("Example")
-
-        return defaultConfig
+        """A copy of the built-in defaults, the lowest configuration layer."""
+        return copy.deepcopy(DEFAULTS)
 
     @classmethod
     def removeFilter(cls, callback: Callable[[str, str], None]) -> None:
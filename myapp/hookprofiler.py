@@ -0,0 +1,210 @@
+"""Wall and CPU time of plugin hooks, per plugin and per hook.
+
+Every call of a hook or of ``activate``/``deactivate`` is timed. Its wall
+time is added to the totals and to a rolling window of the last calls,
+percentiles are computed from the window. Reading the CPU time of the
+thread costs more than most hooks, it's only measured for one call of a
+hook in ``CPU_SAMPLE``. Async hooks are timed until they return their awaitable, the time
+they run on the asyncio loop is bounded by ``pluginManager.hookBudget``.
+
+A call running longer than the budget is reported, at most once every
+``warnInterval`` seconds per hook, and ``budgetExceeded`` is emitted once a
+hook ran over budget ``disableAfter`` times in a row.
+"""
+import time
+import typing
+import logging
+import collections
+
+from .utils import Signal
+
+DEFAULT_WINDOW = 256
+# the CPU time of a hook is measured once every CPU_SAMPLE calls
+CPU_SAMPLE = 16
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(ordered: typing.List[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class HookStats:
+    """budget is in seconds."""
+    __slots__ = ("budget", "calls", "wallTime", "cpuCalls", "cpuTime", "maxWallTime",
+                 "overBudget", "consecutive", "wall", "cpu")
+
+    def __init__(self, window: int = DEFAULT_WINDOW, budget: float = None):
+        self.budget = budget if budget is not None else float("inf")
+        self.wall = collections.deque(maxlen=window)
+        self.cpu = collections.deque(maxlen=window)
+        self.clear()
+
+    def clear(self) -> None:
+        self.calls = 0
+        self.wallTime = 0.0
+        # calls whose CPU time was measured
+        self.cpuCalls = 0
+        self.cpuTime = 0.0
+        self.maxWallTime = 0.0
+        self.overBudget = 0
+        # calls over budget since the last one within it
+        self.consecutive = 0
+        self.wall.clear()
+        self.cpu.clear()
+
+    def record(self, wall: float, cpu: float = None) -> bool:
+        """Record a call of wall seconds, cpu seconds if its CPU time was
+        measured. Returns whether the call was over budget."""
+        self.calls += 1
+        self.wallTime += wall
+        self.wall.append(wall)
+        if cpu is not None:
+            self.cpuCalls += 1
+            self.cpuTime += cpu
+            self.cpu.append(cpu)
+        if wall > self.maxWallTime:
+            self.maxWallTime = wall
+        if wall > self.budget:
+            self.overBudget += 1
+            self.consecutive += 1
+            return True
+
+        self.consecutive = 0
+        return False
+
+    def asDict(self) -> dict:
+        """Times in milliseconds, percentiles of the rolling window. The CPU
+        time of all calls is estimated from the calls it was measured for."""
+        wall = sorted(self.wall)
+        cpu = sorted(self.cpu)
+        return {
+            "calls": self.calls,
+            "wallTime": self.wallTime * 1000,
+            "cpuTime": self.cpuTime * self.calls / self.cpuCalls * 1000 if self.cpuCalls else 0.0,
+            "maxWallTime": self.maxWallTime * 1000,
+            "overBudget": self.overBudget,
+            "wallP50": _percentile(wall, 50) * 1000,
+            "wallP95": _percentile(wall, 95) * 1000,
+            "wallP99": _percentile(wall, 99) * 1000,
+            "cpuP50": _percentile(cpu, 50) * 1000,
+            "cpuP95": _percentile(cpu, 95) * 1000,
+            "cpuP99": _percentile(cpu, 99) * 1000,
+        }
+
+
+class HookProfiler:
+    """budget is in milliseconds, None never reports a call. disableAfter
+    None or 0 never emits budgetExceeded."""
+    budgetExceeded = Signal(queued=True)
+
+    def __init__(self, budget: float = None, window: int = DEFAULT_WINDOW,
+                 disableAfter: int = None, warnInterval: float = 10.0):
+        self.budget = budget / 1000 if budget else None
+        self.window = window
+        self.disableAfter = disableAfter
+        self.warnInterval = warnInterval
+        # plugin name -> hook -> HookStats
+        self._stats: typing.Dict[str, typing.Dict[str, HookStats]] = {}
+        # (plugin, hook) -> HookStats, one lookup per call
+        self._calls: typing.Dict[typing.Tuple[str, str], HookStats] = {}
+        # (plugin, hook) -> (time of the last warning, warnings suppressed since)
+        self._warnings: typing.Dict[typing.Tuple[str, str], typing.Tuple[float, int]] = {}
+
+    def hookStats(self, plugin: str, hook: str) -> HookStats:
+        """The statistics of hook of plugin, created on first use. reset()
+        clears them in place, so a caller can keep them, as HookTable does."""
+        stats = self._calls.get((plugin, hook))
+        if stats is None:
+            stats = HookStats(self.window, self.budget)
+            self._stats.setdefault(plugin, {})[hook] = stats
+            self._calls[(plugin, hook)] = stats
+
+        return stats
+
+    def call(self, plugin: str, hook: str, func: typing.Callable, *args):
+        """Call func(*args) and record its time as hook of plugin, exceptions
+        are recorded and raised again."""
+        stats = self.hookStats(plugin, hook)
+        cpuStart = time.thread_time() if not stats.calls % CPU_SAMPLE else None
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            wall = time.perf_counter() - start
+            cpu = time.thread_time() - cpuStart if cpuStart is not None else None
+            if stats.record(wall, cpu):
+                self.overBudget(plugin, hook, wall, stats)
+
+    def record(self, plugin: str, hook: str, wall: float, cpu: float = None) -> None:
+        """Record a call of wall seconds, cpu seconds if its CPU time was measured."""
+        stats = self.hookStats(plugin, hook)
+        if stats.record(wall, cpu):
+            self.overBudget(plugin, hook, wall, stats)
+
+    def overBudget(self, plugin: str, hook: str, wall: float, stats: HookStats) -> None:
+        """Report a call of wall seconds recorded in stats as over budget."""
+        self._warn(plugin, hook, wall, stats)
+        if self.disableAfter and stats.consecutive == self.disableAfter:
+            self.budgetExceeded.emit(plugin, hook)
+
+    def _warn(self, plugin: str, hook: str, wall: float, stats: HookStats) -> None:
+        now = time.monotonic()
+        last, suppressed = self._warnings.get((plugin, hook), (None, 0))
+        if last is not None and now - last < self.warnInterval:
+            self._warnings[(plugin, hook)] = (last, suppressed + 1)
+            return
+
+        self._warnings[(plugin, hook)] = (now, 0)
+        logger.warning("plugin %s %s took %.1f ms, over its %.0f ms budget (%d of %d calls)%s",
+                       plugin, hook, wall * 1000, self.budget * 1000, stats.overBudget,
+                       stats.calls, f", {suppressed} similar warnings suppressed" if suppressed else "")
+
+    def stats(self, plugin: str = None) -> typing.Dict[str, typing.Dict[str, dict]]:
+        """{plugin: {hook: statistics}}, of every plugin or only plugin."""
+        plugins = [plugin] if plugin is not None else list(self._stats)
+        return {name: {hook: stats.asDict() for hook, stats in self._stats[name].items()
+                       if stats.calls}
+                for name in plugins if name in self._stats}
+
+    def slowest(self, limit: int = 10) -> typing.List[dict]:
+        """The hooks with the highest 95th percentile wall time."""
+        rows = [dict(stats.asDict(), plugin=plugin, hook=hook)
+                for plugin, hooks in self._stats.items() for hook, stats in hooks.items()
+                if stats.calls]
+        rows.sort(key=lambda row: -row["wallP95"])
+        return rows[:limit]
+
+    def reset(self, plugin: str = None) -> None:
+        """Clear the statistics of plugin, or of every plugin."""
+        for (name, hook), stats in self._calls.items():
+            if plugin is None or name == plugin:
+                stats.clear()
+        for key in [key for key in self._warnings if plugin is None or key[0] == plugin]:
+            del self._warnings[key]
+
+
+class HookDiagnostics:
+    """Bridge object of a HookProfiler, exposed as ``hooks.*``::
+
+        const slow = await myapp.call("hooks.slowest", 5);
+    """
+
+    def __init__(self, profiler: HookProfiler):
+        self._profiler = profiler
+
+    def stats(self, plugin: str = None) -> dict:
+        return self._profiler.stats(plugin)
+
+    def slowest(self, limit: int = 10) -> list:
+        return self._profiler.slowest(int(limit))
+
+    def budget(self) -> typing.Optional[float]:
+        """The budget of a hook call in milliseconds."""
+        budget = self._profiler.budget
+        return budget * 1000 if budget is not None else None
+
+    def reset(self, plugin: str = None) -> None:
+        self._profiler.reset(plugin)
@@ -0,0 +1,150 @@
+import time
+import bisect
+import typing
+import inspect
+
+from . import tracing
+from .log import pluginLogger
+from .hookprofiler import CPU_SAMPLE
+
+# page lifecycle events and the function names a plugin can implement them with
+HOOKS = {
+    "beforeLoad": ("beforeLoad", "before_load"),
+    "loadStarted": ("loadStarted", "load_started"),
+    "loadFinished": ("loadFinished", "load_finished"),
+}
+
+
+def resolveHooks(module) -> typing.Dict[str, typing.Callable]:
+    """Find the functions module implements for each event, camelCase first."""
+    hooks = {}
+    for event, names in HOOKS.items():
+        for attr in names:
+            func = getattr(module, attr, None)
+            if callable(func):
+                hooks[event] = func
+                break
+
+    return hooks
+
+
+class HookTable:
+    """Per-event dispatch lists of plugin hooks.
+
+    Hooks are resolved once when a plugin is registered. Each event keeps a
+    tuple of (plugin name, callable) ordered by descending priority, then
+    registration order, which is rebuilt on register/unregister, so
+    dispatching only iterates it and a hook may safely (un)register plugins
+    while an event is being dispatched.
+
+    Hooks may be ``async def`` functions, their coroutines are scheduled
+    concurrently on the asyncio loop and cancelled when they run longer than
+    ``budget`` milliseconds, ``self.budget`` is in seconds.
+
+    With a ``profiler``, a HookProfiler, every hook call is timed. The
+    statistics of each hook are looked up once, when the dispatch list is
+    rebuilt, and the call is timed inline.
+    """
+
+    def __init__(self, budget: float = None, profiler=None):
+        self.budget = budget / 1000 if budget else None
+        self.profiler = profiler
+        self._entries = {event: [] for event in HOOKS}
+        self._dispatch = {event: () for event in HOOKS}
+        # (plugin name, callable, HookStats) of each event, with a profiler
+        self._profiled = {event: () for event in HOOKS}
+        self._registered = set()
+        self._sequence = 0
+
+    def register(self, name: str, module, priority: int = 0) -> None:
+        self.unregister(name)
+        self._registered.add(name)
+        for event, func in resolveHooks(module).items():
+            self._sequence += 1
+            bisect.insort(self._entries[event],
+                          (-priority, self._sequence, name, func))
+            self._rebuild(event)
+
+    def unregister(self, name: str) -> None:
+        if name not in self._registered:
+            return
+
+        self._registered.discard(name)
+        for event, entries in self._entries.items():
+            kept = [entry for entry in entries if entry[2] != name]
+            if len(kept) != len(entries):
+                self._entries[event] = kept
+                self._rebuild(event)
+
+    def _rebuild(self, event: str) -> None:
+        self._dispatch[event] = tuple((entry[2], entry[3])
+                                      for entry in self._entries[event])
+        if self.profiler is not None:
+            stats = self.profiler.hookStats
+            self._profiled[event] = tuple((entry[2], entry[3], stats(entry[2], event))
+                                          for entry in self._entries[event])
+
+    def hooks(self, event: str) -> typing.Tuple[typing.Tuple[str, typing.Callable], ...]:
+        """The (plugin name, callable) pairs called for event, in call order."""
+        return self._dispatch[event]
+
+    def dispatch(self, event: str, *args) -> list:
+        """Call every hook registered for event, an exception raised by a hook
+        is reported and doesn't prevent the other hooks from running.
+
+        Returns the tasks of the hooks that returned an awaitable.
+        """
+        tasks = []
+        trace = tracing.tracer.enabled
+        profiler = self.profiler
+        if profiler is not None and not trace:
+            return self._dispatchProfiled(event, args)
+
+        for name, func in self._dispatch[event]:
+            try:
+                if trace:
+                    with tracing.span(f"{name}.{event}", "hook"):
+                        result = (func(*args) if profiler is None
+                                  else profiler.call(name, event, func, *args))
+                elif profiler is not None:
+                    result = profiler.call(name, event, func, *args)
+                else:
+                    result = func(*args)
+            except Exception:
+                pluginLogger(name).exception("plugin %s failed to handle %s", name, event)
+                continue
+
+            if result is not None and inspect.isawaitable(result):
+                tasks.append(self._schedule(name, event, result))
+
+        return tasks
+
+    def _dispatchProfiled(self, event: str, args: tuple) -> list:
+        tasks = []
+        profiler = self.profiler
+        perf = time.perf_counter
+        for name, func, stats in self._profiled[event]:
+            cpu = time.thread_time() if not stats.calls % CPU_SAMPLE else None
+            start = perf()
+            try:
+                result = func(*args)
+            except Exception:
+                # recorded before the traceback is formatted
+                wall = perf() - start
+                if stats.record(wall, time.thread_time() - cpu if cpu is not None else None):
+                    profiler.overBudget(name, event, wall, stats)
+                pluginLogger(name).exception("plugin %s failed to handle %s", name, event)
+                continue
+
+            wall = perf() - start
+            if stats.record(wall, time.thread_time() - cpu if cpu is not None else None):
+                profiler.overBudget(name, event, wall, stats)
+            if result is not None and inspect.isawaitable(result):
+                tasks.append(self._schedule(name, event, result))
+
+        return tasks
+
+    def _schedule(self, name: str, event: str, result):
+        # asyncio is only imported once a hook is async
+        from . import asyncloop
+        return asyncloop.schedule(result, self.budget, f"plugin {name} {event}")
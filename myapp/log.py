@@ -0,0 +1,243 @@
+"""Logging of myapp and of its plugins.
+
+Records are put in a queue by the thread logging them, a listener thread
+formats and writes them, so logging on the GUI thread never waits for the
+terminal or a pipe. A message logged again and again by the same logger
+from the same place is rate limited, the records dropped are summarized.
+
+Modules log to ``logging.getLogger(__name__)``. Plugin modules are named
+``myapp.plugins.<name>.<module>``, so in a plugin that logger is a child of
+the plugin logger, ``pluginLogger(name)``, and per-plugin levels apply.
+
+Configured from the ``logging`` section of myapp.yml::
+
+    logging:
+      level: info
+      stream: stdout              # or stderr, or none
+      file: myapp.log             # optional
+      format: "%(asctime)s %(levelname)s %(name)s: %(message)s"
+      levels:
+        myapp.config: debug
+        myapp.plugins.test: warning
+      rateLimit:                  # false to disable
+        burst: 5                  # records of the same message
+        interval: 10              # per interval seconds
+"""
+import sys
+import time
+import queue
+import atexit
+import typing
+import logging
+import threading
+import logging.handlers
+
+ROOT = "myapp"
+DEFAULT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+DEFAULT_BURST = 5
+DEFAULT_INTERVAL = 10.0
+# rate limit windows kept before the expired ones are dropped
+MAX_WINDOWS = 1024
+
+_handler = None
+_listener = None
+# handlers the listener wrote to, attached directly once it's stopped
+_direct: typing.List[logging.Handler] = []
+_registered = False
+
+
+def pluginLogger(name: str) -> logging.Logger:
+    """The logger of the plugin name, parent of the loggers of its modules."""
+    return logging.getLogger(f"{ROOT}.plugins.{name}")
+
+
+def _level(value) -> int:
+    if isinstance(value, int):
+        return value
+
+    level = logging.getLevelName(str(value).upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most burst records of the same message, logged by the same
+    logger from the same line at the same level, through per interval seconds.
+
+    The first record of the next interval carries the number of records
+    dropped in the previous one, in its ``suppressed`` attribute. Records
+    dropped in an interval no record follows are reported by a summary
+    record, see summaries().
+    """
+
+    def __init__(self, burst: int = DEFAULT_BURST, interval: float = DEFAULT_INTERVAL):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._lock = threading.Lock()
+        # (logger, message, file, line, level) -> [interval start, records let
+        # through, records dropped, last record dropped]
+        self._windows = {}
+        # summaries of the windows pruned with records dropped
+        self._summaries: typing.List[logging.LogRecord] = []
+
+    @property
+    def pending(self) -> bool:
+        """Whether summaries() has records to return without flushing."""
+        return bool(self._summaries)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        msg = record.msg if isinstance(record.msg, str) else type(record.msg).__name__
+        key = (record.name, msg, record.pathname, record.lineno, record.levelno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                if window is not None and window[2]:
+                    record.suppressed = window[2]
+                if window is None and len(self._windows) >= MAX_WINDOWS:
+                    self._prune(now)
+                self._windows[key] = [now, 1, 0, None]
+                return True
+
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+
+            window[2] += 1
+            window[3] = record
+            return False
+
+    def _prune(self, now: float) -> None:
+        windows = {}
+        for key, window in self._windows.items():
+            if now - window[0] < self.interval:
+                windows[key] = window
+            elif window[2]:
+                self._summaries.append(_summary(window[3], window[2]))
+        self._windows = windows
+
+    def summaries(self, flush: bool = False) -> typing.List[logging.LogRecord]:
+        """Take the summary records of the windows pruned with records dropped,
+        and with flush of every window with records dropped."""
+        with self._lock:
+            if flush:
+                for window in self._windows.values():
+                    if window[2]:
+                        self._summaries.append(_summary(window[3], window[2]))
+                        window[2] = 0
+                        window[3] = None
+            summaries, self._summaries = self._summaries, []
+
+        return summaries
+
+
+def _summary(record: logging.LogRecord, dropped: int) -> logging.LogRecord:
+    """A record reporting the records dropped in a window, the last of them record."""
+    summary = logging.makeLogRecord(record.__dict__)
+    summary.msg = "%d similar messages suppressed, the last one: %s"
+    summary.args = (dropped, record.getMessage())
+    summary.exc_info = summary.exc_text = summary.stack_info = None
+    return summary
+
+
+class Formatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" ({suppressed} similar messages suppressed)"
+        return text
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, records, rateLimit: RateLimitFilter = None):
+        super().__init__(records)
+        self.rateLimit = rateLimit
+        if rateLimit is not None:
+            self.addFilter(rateLimit)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # formatted by the listener thread, not by the thread logging
+        return record
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        handled = super().handle(record)
+        if self.rateLimit is not None and self.rateLimit.pending:
+            self.queueSummaries()
+        return handled
+
+    def queueSummaries(self, flush: bool = False) -> None:
+        """Queue the summaries of the records dropped by the rate limit, see
+        RateLimitFilter.summaries()."""
+        if self.rateLimit is not None:
+            for summary in self.rateLimit.summaries(flush):
+                self.enqueue(summary)
+
+
+def applyLevels(options: dict) -> None:
+    """Set the level of the myapp logger and of the loggers listed in levels."""
+    logging.getLogger(ROOT).setLevel(_level(options.get("level", "info")))
+    for name, level in (options.get("levels") or {}).items():
+        if name != ROOT and not name.startswith(ROOT + "."):
+            name = f"{ROOT}.{name}"
+        logging.getLogger(name).setLevel(_level(level))
+
+
+def setup(options: dict = None) -> None:
+    """Log the myapp loggers through the queue, replacing a previous setup."""
+    global _handler, _listener, _registered
+    options = options or {}
+    shutdown()
+
+    logger = logging.getLogger(ROOT)
+    for handler in _direct:
+        logger.removeHandler(handler)
+        handler.close()
+    _direct.clear()
+
+    applyLevels(options)
+    formatter = Formatter(options.get("format", DEFAULT_FORMAT))
+    handlers = []
+    stream = options.get("stream", "stdout")
+    if stream in ("stdout", "stderr"):
+        handlers.append(logging.StreamHandler(getattr(sys, stream)))
+    if options.get("file"):
+        handlers.append(logging.FileHandler(options["file"], encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    rateLimit = options.get("rateLimit", {})
+    if rateLimit is not False and rateLimit is not None:
+        rateLimit = RateLimitFilter(rateLimit.get("burst", DEFAULT_BURST),
+                                    rateLimit.get("interval", DEFAULT_INTERVAL))
+    else:
+        rateLimit = None
+    _handler = _QueueHandler(records, rateLimit)
+    logger.addHandler(_handler)
+    # myapp owns its output, records don't reach handlers of the root logger
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    _direct.extend(handlers)
+    if not _registered:
+        atexit.register(shutdown)
+        _registered = True
+
+
+def shutdown() -> None:
+    """Write the queued records, with a summary of the records still held
+    back by the rate limit, and stop the listener thread. Records logged
+    afterwards, e.g. from atexit handlers, are written right away."""
+    global _handler, _listener
+    if _listener is None:
+        return
+
+    logger = logging.getLogger(ROOT)
+    logger.removeHandler(_handler)
+    _handler.queueSummaries(flush=True)
+    _listener.stop()
+    for handler in _direct:
+        logger.addHandler(handler)
+    _handler = _listener = None
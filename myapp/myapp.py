@@ -1,6 +1,13 @@
 import sys
 
+from . import tracing
+
 
 def main():
-    import myapp.MyApplication as app
-    return app.run(sys.argv)
+    argv = tracing.configure(sys.argv)
+    with tracing.span("import Qt", "startup"):
+        import PyQt5.QtWidgets  # noqa: F401
+        import PyQt5.QtWebEngineWidgets  # noqa: F401
+    with tracing.span("import myapp", "startup"):
+        import myapp.MyApplication as app
+    return app.run(argv)
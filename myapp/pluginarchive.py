@@ -0,0 +1,334 @@
+import io
+import os
+import sys
+import mmap
+import types
+import marshal
+import typing
+import threading
+import configparser
+import importlib.abc
+import importlib.util
+import importlib.machinery
+
+ARCHIVE_PATTERN = "*.zip"
+
+
+class _MappedFile(io.RawIOBase):
+    """Seekable read only file object over a mmap, for zipfile."""
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._mapped)
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        data = self._mapped[self._pos:self._pos + len(buffer)]
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+class PluginArchive:
+    """A plugin packaged as a single zip file.
+
+    The archive is opened and memory mapped once, its central directory
+    is read by ``zipfile`` and members are read from the mapping, so
+    importing modules and reading resources doesn't open the file again.
+    """
+
+    def __init__(self, path: str):
+        # imported on first use, most installations have no archived plugin
+        import zipfile
+
+        self.path = path
+        st = os.stat(path)
+        self.mtime = st.st_mtime_ns
+        self.size = st.st_size
+        with open(path, "rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._zip = zipfile.ZipFile(_MappedFile(self._mapped))
+        self._names = set(self._zip.namelist())
+        self._lock = threading.Lock()
+
+    def isFresh(self, st: os.stat_result) -> bool:
+        return self.mtime == st.st_mtime_ns and self.size == st.st_size
+
+    def names(self) -> typing.Set[str]:
+        return self._names
+
+    def exists(self, member: str) -> bool:
+        return member in self._names
+
+    def read(self, member: str) -> bytes:
+        # members share the position of the mapping
+        with self._lock:
+            return self._zip.read(member)
+
+    def close(self) -> None:
+        self._zip.close()
+        self._mapped.close()
+
+
+_archives: typing.Dict[str, PluginArchive] = {}
+_archivesLock = threading.Lock()
+
+
+def openArchive(path: str) -> typing.Optional[PluginArchive]:
+    """The opened archive at path, reopened when the file changed, None if it's not a zip file."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    with _archivesLock:
+        archive = _archives.get(path)
+        if archive is not None and archive.isFresh(st):
+            return archive
+
+        import zipfile
+        try:
+            opened = PluginArchive(path)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            return None
+
+        # an outdated archive may still be referenced by modules, it's
+        # closed when it's garbage collected
+        _archives[path] = opened
+        return opened
+
+
+def closeArchive(path: str) -> None:
+    with _archivesLock:
+        archive = _archives.pop(path, None)
+    if archive is not None:
+        archive.close()
+
+
+def splitArchivePath(path: str) -> typing.Optional[typing.Tuple[str, str]]:
+    """(archive path, member name) if path points inside a plugin archive, else None."""
+    marker = ARCHIVE_PATTERN[1:]
+    index = path.find(marker + os.sep)
+    while index != -1:
+        archive = path[:index + len(marker)]
+        if archive in _archives or os.path.isfile(archive):
+            member = path[index + len(marker) + 1:]
+            return archive, member.replace(os.sep, "/")
+        index = path.find(marker + os.sep, index + 1)
+
+    if path.endswith(marker) and os.path.isfile(path):
+        return path, ""
+
+    return None
+
+
+def pathExists(path: str) -> bool:
+    """os.path.exists that also looks inside plugin archives."""
+    location = splitArchivePath(path)
+    if location is None:
+        return os.path.exists(path)
+
+    archive = openArchive(location[0])
+    return archive is not None and (not location[1] or archive.exists(location[1]))
+
+
+def readFile(path: str) -> typing.Optional[bytes]:
+    """Content of a file on disk or inside a plugin archive, None if it can't be read."""
+    location = splitArchivePath(path)
+    if location is None:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    archive = openArchive(location[0])
+    if archive is None or not archive.exists(location[1]):
+        return None
+
+    return archive.read(location[1])
+
+
+def readManifest(path: str) -> typing.Tuple[typing.Optional[str], typing.Optional[dict]]:
+    """(manifest name, [plugin] options) of the manifest at the root of the archive.
+
+    Only the central directory and the manifest are read, nothing is
+    extracted. The archive is kept open for the plugin to be imported from.
+    """
+    archive = openArchive(path)
+    if archive is not None:
+        for name in sorted(archive.names()):
+            if "/" not in name and name.endswith(".plugin"):
+                parser = configparser.ConfigParser()
+                try:
+                    parser.read_string(archive.read(name).decode("utf-8"), path)
+                except (ValueError, configparser.Error):
+                    break
+                if parser.has_section("plugin"):
+                    return name, dict(parser.items("plugin"))
+                return name, None
+
+        closeArchive(path)
+
+    return None, None
+
+
+class ArchiveLoader(importlib.abc.InspectLoader):
+    """Load a module from a plugin archive.
+
+    A module ``name`` is read from ``name.pyc`` if the archive contains
+    bytecode compiled for this interpreter (``compileall -b``), otherwise
+    ``name.py`` is compiled.
+    """
+
+    def __init__(self, archive: PluginArchive, member: str, isPackage: bool):
+        self.archive = archive
+        self.member = member
+        self._isPackage = isPackage
+
+    def get_filename(self, fullname: str = None) -> str:
+        return os.path.join(self.archive.path, *self.member.split("/"))
+
+    def is_package(self, fullname: str) -> bool:
+        return self._isPackage
+
+    def get_source(self, fullname: str) -> typing.Optional[str]:
+        if not self.archive.exists(self.member):
+            return None
+
+        return importlib.util.decode_source(self.archive.read(self.member))
+
+    def get_code(self, fullname: str):
+        compiled = self.member[:-3] + ".pyc"
+        if self.archive.exists(compiled):
+            code = _loadBytecode(self.archive.read(compiled))
+            if code is not None:
+                return code
+
+        if not self.archive.exists(self.member):
+            raise ImportError(f"no source or compatible bytecode for {fullname}",
+                              name=fullname, path=self.get_filename())
+
+        return compile(self.archive.read(self.member), self.get_filename(), "exec",
+                       dont_inherit=True)
+
+    def get_data(self, path: str) -> bytes:
+        location = splitArchivePath(path)
+        if location is None or location[0] != self.archive.path:
+            raise OSError(f"{path} is not in {self.archive.path}")
+
+        return self.archive.read(location[1])
+
+    def exec_module(self, module) -> None:
+        exec(self.get_code(module.__name__), module.__dict__)
+
+
+def _loadBytecode(data: bytes):
+    """Code object of a .pyc file, None if it wasn't compiled by this
+    interpreter version. The magic number is checked before anything is
+    unmarshalled, bytecode of another version is never run."""
+    if len(data) < 16 or data[:4] != importlib.util.MAGIC_NUMBER:
+        return None
+
+    try:
+        code = marshal.loads(memoryview(data)[16:])
+    except (ValueError, EOFError, TypeError):
+        return None
+
+    return code if isinstance(code, types.CodeType) else None
+
+
+class ArchiveFinder(importlib.abc.PathEntryFinder):
+    """Path entry finder for a directory inside a plugin archive.
+
+    It's put in ``sys.path_importer_cache`` for the search locations of
+    archived plugin packages, so imports inside a plugin, relative or not,
+    are served from the archive mapping.
+    """
+
+    def __init__(self, archive: PluginArchive, prefix: str = ""):
+        self.archive = archive
+        self.prefix = prefix.strip("/")
+
+    def _member(self, name: str) -> str:
+        return self.prefix + "/" + name if self.prefix else name
+
+    def find_spec(self, fullname: str, target=None):
+        base = self._member(fullname.rpartition(".")[2])
+        init = base + "/__init__.py"
+        if self.archive.exists(init) or self.archive.exists(init + "c"):
+            return archiveSpec(fullname, self.archive, init, True)
+
+        for member in (base + ".py", base + ".pyc"):
+            if self.archive.exists(member):
+                return archiveSpec(fullname, self.archive, base + ".py", False)
+
+        return None
+
+    def invalidate_caches(self) -> None:
+        pass
+
+
+def archiveSpec(fullname: str, archive: PluginArchive, member: str, isPackage: bool):
+    loader = ArchiveLoader(archive, member, isPackage)
+    spec = importlib.machinery.ModuleSpec(
+        fullname, loader, origin=loader.get_filename(), is_package=isPackage)
+    spec.has_location = True
+    if isPackage:
+        location = os.path.dirname(loader.get_filename())
+        spec.submodule_search_locations = [location]
+        registerSearchLocation(location)
+
+    return spec
+
+
+def registerSearchLocation(location: str) -> bool:
+    """Route imports from location through an ArchiveFinder if it's inside a plugin archive."""
+    split = splitArchivePath(location)
+    if split is None:
+        return False
+
+    archive = openArchive(split[0])
+    if archive is None:
+        return False
+
+    sys.path_importer_cache[location] = ArchiveFinder(archive, split[1])
+    return True
+
+
+def unregisterSearchLocation(location: str) -> None:
+    """Forget the ArchiveFinder registerSearchLocation put in sys.path_importer_cache."""
+    if isinstance(sys.path_importer_cache.get(location), ArchiveFinder):
+        del sys.path_importer_cache[location]
+
+
+def specFromPath(fullname: str, path: str, isPackage: bool = False):
+    """Module spec for a module file on disk or inside a plugin archive."""
+    location = splitArchivePath(path)
+    if location is None:
+        if isPackage:
+            return importlib.util.spec_from_file_location(
+                fullname, path, submodule_search_locations=[os.path.dirname(path)])
+        return importlib.util.spec_from_file_location(fullname, path)
+
+    archive = openArchive(location[0])
+    if archive is None:
+        return None
+
+    return archiveSpec(fullname, archive, location[1], isPackage)
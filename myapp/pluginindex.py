@@ -0,0 +1,319 @@
+import os
+import ast
+import json
+import fnmatch
+import typing
+import logging
+import configparser
+
+from .pluginarchive import ARCHIVE_PATTERN, readManifest
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+MANIFEST_PATTERN = "*.plugin"
+
+
+class PluginInfo:
+    """The [plugin] section of a ``.plugin`` manifest.
+
+    Only the accessors of ``configparser.ConfigParser`` used by the plugin
+    manager are provided, so manifests restored from the plugin index don't
+    pay for building a full parser.
+    """
+
+    def __init__(self, filepath, options: dict = None, resources: typing.List[str] = None):
+        self._filepath = filepath
+        self._resources = resources
+        if options is None:
+            parser = configparser.ConfigParser()
+            parser.read(self._filepath, encoding='utf-8')
+            if parser.has_section("plugin"):
+                options = dict(parser.items("plugin"))
+
+        self._options = options
+
+    @classmethod
+    def withoutSection(cls, filepath) -> "PluginInfo":
+        """A manifest known to have no [plugin] section, it isn't read again."""
+        info = cls(filepath, {})
+        info._options = None
+        return info
+
+    def has_section(self, section: str) -> bool:
+        return section == "plugin" and self._options is not None
+
+    def has_option(self, section: str, option: str) -> bool:
+        return self.has_section(section) and option.lower() in self._options
+
+    def get(self, section: str, option: str, fallback=None) -> str:
+        if self.has_option(section, option):
+            return self._options[option.lower()]
+
+        return fallback
+
+    def set(self, section: str, option: str, value: str) -> None:
+        if self._options is None:
+            self._options = {}
+
+        self._options[option.lower()] = value
+
+    def options(self) -> dict:
+        return dict(self._options or {})
+
+    @property
+    def filepath(self) -> str:
+        return self._filepath
+
+    def archive(self) -> typing.Optional[str]:
+        """Path of the zip file the plugin is packaged in, None for an unpacked plugin."""
+        return self.get("plugin", "Archive")
+
+    def isValid(self) -> bool:
+        """"""
+        return self.has_section("plugin") and self.has_option("plugin", "Module")
+
+    def name(self) -> str:
+        """Plugin name, or None when the manifest doesn't declare one."""
+        if self.has_section("plugin") and self.has_option("plugin", "Name"):
+            return self.get("plugin", "Name")
+
+        return None
+
+    def modulePath(self) -> str:
+        """Absolute path of the plugin main module."""
+        if self.has_option("plugin", "Path"):
+            return self.get("plugin", "Path")
+
+        module_path = os.path.join(
+            os.path.dirname(self._filepath), self.get("plugin", "Module"))
+        if not module_path.endswith(".py"):
+            module_path += ".py"
+
+        return module_path
+
+    def listOption(self, option: str) -> typing.List[str]:
+        """Comma separated manifest option as a list."""
+        value = self.get("plugin", option, "")
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    def hooks(self) -> typing.List[str]:
+        """Hooks the plugin declares to implement, e.g. ``Hooks=beforeLoad, loadFinished``."""
+        return self.listOption("Hooks")
+
+    def activationEvents(self) -> typing.List[str]:
+        """Events that should activate the plugin, ``ActivateOn`` falls back to ``Hooks``."""
+        if self.has_option("plugin", "ActivateOn"):
+            return self.listOption("ActivateOn")
+
+        return self.hooks()
+
+    def requires(self) -> typing.List[str]:
+        """Names of the plugins this plugin depends on, ``Requires=other, another``."""
+        return self.listOption("Requires")
+
+    def priority(self) -> int:
+        """Hooks of plugins with a higher ``Priority`` are called first, default is 0."""
+        try:
+            return int(self.get("plugin", "Priority", "0"))
+        except ValueError:
+            return 0
+
+    def threadedImport(self) -> bool:
+        """Whether the plugin module can be imported outside of the GUI thread,
+        ``ThreadedImport=true``. Only for plugins creating no QObject or timer
+        at import time, those would belong to the import thread."""
+        return self.get("plugin", "ThreadedImport", "false").lower() in ("true", "yes", "1")
+
+    def isolated(self) -> bool:
+        """Whether the plugin runs in a worker process, ``Isolated=true``."""
+        return self.get("plugin", "Isolated", "false").lower() in ("true", "yes", "1")
+
+    def resources(self) -> typing.List[str]:
+        """Absolute paths of the resources declared in the manifest."""
+        if self._resources is None:
+            self._resources = []
+            if self.has_option("plugin", "Resources"):
+                base_path = os.path.dirname(self.modulePath())
+                resources = ast.literal_eval(
+                    self.get("plugin", "Resources"))
+                self._resources = [path if os.path.isabs(path) else os.path.join(base_path, path)
+                                   for path in resources]
+
+        return self._resources
+
+
+class PluginIndex:
+    """Persistent index of the plugin manifests found in plugin directories.
+
+    Every directory is recorded with its mtime, every manifest with its mtime
+    and size. On update, directories whose mtime didn't change are not listed
+    again and manifests whose stat didn't change are not parsed again.
+    Plugin archives are recorded like manifests, keyed by the archive path.
+    """
+
+    def __init__(self, path: str = None):
+        self._path = path
+        self._dirs = {}
+        self._manifests = {}
+        self._byName = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if self._path is None or not os.path.exists(self._path):
+            return
+
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            logger.warning("couldn't read plugin index from %s", self._path)
+            return
+
+        if data.get("version") == INDEX_VERSION:
+            self._dirs = data.get("dirs", {})
+            self._manifests = data.get("manifests", {})
+
+    def save(self) -> None:
+        """Write the index to disk if it changed since the last save."""
+        if self._path is None or not self._dirty:
+            return
+
+        data = {"version": INDEX_VERSION,
+                "dirs": self._dirs,
+                "manifests": self._manifests}
+        tmp_path = self._path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._path)
+            self._dirty = False
+        except OSError:
+            logger.warning("couldn't write plugin index to %s", self._path)
+
+    def update(self, directories: typing.List[str]) -> typing.List[PluginInfo]:
+        """Refresh the index for the given directories and return the manifests found."""
+        seenDirs = set()
+        seenFiles = []
+        for directory in directories:
+            self._scanDir(directory, seenDirs, seenFiles)
+
+        for stale in [d for d in self._dirs if d not in seenDirs and _isUnder(d, directories)]:
+            del self._dirs[stale]
+            self._dirty = True
+
+        seen = set(seenFiles)
+        for stale in [f for f in self._manifests if f not in seen and _isUnder(f, directories)]:
+            del self._manifests[stale]
+            self._dirty = True
+
+        self._byName = {}
+        infos = []
+        for filepath in seenFiles:
+            if self._manifests[filepath].get("manifest", filepath) is None:
+                continue
+            info = self._info(filepath)
+            infos.append(info)
+            name = info.name()
+            if name is not None and name not in self._byName:
+                self._byName[name] = info
+
+        return infos
+
+    def find(self, name: str) -> typing.Optional[PluginInfo]:
+        """Return the manifest of the plugin called name from the last update."""
+        return self._byName.get(name)
+
+    def _scanDir(self, directory: str, seenDirs: set, seenFiles: list) -> None:
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return
+
+        seenDirs.add(directory)
+        entry = self._dirs.get(directory)
+        if entry is None or entry["mtime"] != mtime:
+            files = []
+            subdirs = []
+            try:
+                with os.scandir(directory) as it:
+                    for e in it:
+                        if e.is_dir():
+                            if not e.is_symlink():
+                                subdirs.append(e.name)
+                        elif fnmatch.fnmatch(e.name, MANIFEST_PATTERN) or \
+                                fnmatch.fnmatch(e.name, ARCHIVE_PATTERN):
+                            files.append(e.name)
+            except OSError:
+                return
+
+            entry = {"mtime": mtime, "files": files, "subdirs": subdirs}
+            self._dirs[directory] = entry
+            self._dirty = True
+
+        for name in entry["files"]:
+            filepath = os.path.join(directory, name)
+            if self._checkManifest(filepath):
+                seenFiles.append(filepath)
+
+        for name in entry["subdirs"]:
+            self._scanDir(os.path.join(directory, name), seenDirs, seenFiles)
+
+    def _checkManifest(self, filepath: str) -> bool:
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return False
+
+        record = self._manifests.get(filepath)
+        if record is not None and record["mtime"] == st.st_mtime_ns and record["size"] == st.st_size:
+            return True
+
+        record = {"mtime": st.st_mtime_ns, "size": st.st_size,
+                  "options": None, "resources": None}
+        if fnmatch.fnmatch(os.path.basename(filepath), ARCHIVE_PATTERN):
+            manifest, options = readManifest(filepath)
+            if manifest is None:
+                # not a plugin archive, keep it in the index so it isn't read again
+                record["manifest"] = None
+                self._manifests[filepath] = record
+                self._dirty = True
+                return True
+
+            record["manifest"] = os.path.join(filepath, manifest)
+            info = PluginInfo(record["manifest"], options)
+            if options is not None:
+                info.set("plugin", "Archive", filepath)
+        else:
+            info = PluginInfo(filepath)
+
+        if info.isValid():
+            info.set("plugin", "Path", info.modulePath())
+            try:
+                record["resources"] = info.resources()
+            except (ValueError, SyntaxError):
+                logger.warning("resources declared in %s are not valid", filepath)
+
+        if info.has_section("plugin"):
+            record["options"] = info.options()
+
+        self._manifests[filepath] = record
+        self._dirty = True
+        return True
+
+    def _info(self, filepath: str) -> PluginInfo:
+        record = self._manifests[filepath]
+        filepath = record.get("manifest", filepath)
+        if record["options"] is None:
+            return PluginInfo.withoutSection(filepath)
+
+        return PluginInfo(filepath, record["options"], record["resources"])
+
+
+def _isUnder(path: str, directories: typing.List[str]) -> bool:
+    for directory in directories:
+        if path == directory or path.startswith(directory.rstrip(os.sep) + os.sep):
+            return True
+
+    return False
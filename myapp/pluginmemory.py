@@ -0,0 +1,106 @@
+"""Memory allocated by each plugin, attributed with tracemalloc.
+
+An allocation belongs to a plugin when one of the frames of its traceback
+is in a file of the plugin directory or archive, so memory allocated by
+the standard library or myapp on behalf of a plugin is counted too. A
+plugin calling another one is counted for both of them.
+
+Tracing slows down every allocation, it's only started when
+``pluginManager.traceMemory`` is enabled or the interpreter runs with
+``PYTHONTRACEMALLOC``.
+"""
+import os
+import gc
+import typing
+import weakref
+import tracemalloc
+
+# frames kept for each allocation, the allocating plugin frame is usually
+# a few calls above the allocation
+DEFAULT_FRAMES = 16
+# key of the marker stored in the globals of unloaded modules
+MARKER = "__myapp_unloaded__"
+
+
+class _Marker:
+    """Lives as long as the globals of an unloaded module: functions keep
+    their globals alive, not their module."""
+    __slots__ = ("module", "__weakref__")
+
+    def __init__(self, module: str):
+        self.module = module
+
+
+class PluginMemory:
+    def __init__(self):
+        # plugin name -> filename patterns of its files
+        self._patterns: typing.Dict[str, typing.List[str]] = {}
+        # plugin name -> weak references to the markers of its unloaded modules
+        self._unloaded: typing.Dict[str, typing.List[weakref.ref]] = {}
+
+    def start(self, frames: int = DEFAULT_FRAMES) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+    def isTracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def watch(self, name: str, root: str) -> None:
+        """Attribute the allocations of the files below root, a plugin
+        directory or archive, to the plugin name."""
+        self._patterns[name] = [os.path.join(root, "*")]
+
+    def forget(self, name: str) -> None:
+        self._patterns.pop(name, None)
+
+    def usage(self, name: str = None) -> typing.Dict[str, int]:
+        """{plugin name: bytes currently allocated}, of every watched plugin or only name."""
+        if not tracemalloc.is_tracing():
+            return {}
+
+        names = [name] if name is not None else list(self._patterns)
+        snapshot = tracemalloc.take_snapshot()
+        usage = {}
+        for plugin in names:
+            filters = [tracemalloc.Filter(True, pattern, all_frames=True)
+                       for pattern in self._patterns.get(plugin, ())]
+            if filters:
+                traces = snapshot.filter_traces(filters)
+                usage[plugin] = sum(stat.size for stat in traces.statistics("filename"))
+
+        return usage
+
+    def top(self, name: str, limit: int = 10) -> typing.List[tracemalloc.Statistic]:
+        """The lines of the plugin allocating the most memory."""
+        if not tracemalloc.is_tracing() or name not in self._patterns:
+            return []
+
+        filters = [tracemalloc.Filter(True, pattern) for pattern in self._patterns[name]]
+        return tracemalloc.take_snapshot().filter_traces(filters).statistics("lineno")[:limit]
+
+    def unloaded(self, name: str, modules: typing.Iterable) -> None:
+        """Remember the modules of a plugin that was unloaded, leaked() reports
+        the ones still alive."""
+        refs = [ref for ref in self._unloaded.get(name, []) if ref() is not None]
+        for module in modules:
+            marker = _Marker(module.__name__)
+            module.__dict__[MARKER] = marker
+            refs.append(weakref.ref(marker))
+        self._unloaded[name] = refs
+
+    def leaked(self) -> typing.Dict[str, typing.List[str]]:
+        """{plugin name: names of its unloaded modules whose globals are still referenced}."""
+        gc.collect()
+        leaks = {}
+        for name, refs in list(self._unloaded.items()):
+            alive = [ref for ref in refs if ref() is not None]
+            if alive:
+                leaks[name] = [ref().module for ref in alive]
+                self._unloaded[name] = alive
+            else:
+                del self._unloaded[name]
+
+        return leaks
@@ -0,0 +1,430 @@
+import time
+import signal
+import typing
+import asyncio
+import inspect
+import logging
+import itertools
+import threading
+import traceback
+import multiprocessing
+import concurrent.futures
+
+from .pluginindex import PluginInfo
+
+logger = logging.getLogger(__name__)
+
+# seconds to wait for a worker to import a plugin
+LOAD_TIMEOUT = 30
+# a worker crashing more than this many times in RESTART_WINDOW seconds isn't restarted
+MAX_RESTARTS = 5
+RESTART_WINDOW = 60
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+def describeArgument(arg):
+    """Picklable stand-in for a hook argument sent to a worker process.
+
+    Pages are described by their url and title, other Qt objects, like the
+    web channel, can't cross the process boundary and are sent as None.
+    """
+    if arg is None or isinstance(arg, (bool, int, float, str, list, tuple, dict)):
+        return arg
+
+    if callable(getattr(arg, "url", None)) and callable(getattr(arg, "title", None)):
+        return {"url": arg.url().toString(), "title": arg.title()}
+
+    return None
+
+
+# worker process side
+
+
+def _workerLoad(modules: dict, filepath: str, options: dict, resources: list) -> dict:
+    from .pluginscheduler import preparePlugin, execPlugin
+    from .hooks import resolveHooks
+
+    info = PluginInfo(filepath, options, resources)
+    module = execPlugin(info, *preparePlugin(info))
+    modules[info.name()] = module
+    return {
+        "hooks": list(resolveHooks(module).keys()),
+        "activate": callable(getattr(module, "activate", None)),
+        "deactivate": callable(getattr(module, "deactivate", None)),
+    }
+
+
+def _workerCall(modules: dict, loop, target: tuple, args: tuple):
+    from .hooks import resolveHooks
+    from . import bridge
+
+    kind, name, attr = target
+    if kind == "hook":
+        func = resolveHooks(modules[name])[attr]
+    elif kind == "method":
+        func = bridge.registry.method(attr).func
+    else:
+        func = getattr(modules[name], attr)
+
+    result = func(*args)
+    if inspect.isawaitable(result):
+        result = loop.run_until_complete(result)
+
+    return result
+
+
+def workerMain(conn) -> None:
+    """Entry point of a plugin worker process, serves requests until the pipe is closed."""
+    # ctrl-c is handled by the application, which stops its workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from . import bridge
+
+    modules = {}
+    loop = asyncio.new_event_loop()
+    while True:
+        try:
+            callId, op, args = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        try:
+            if op == "load":
+                value = _workerLoad(modules, *args)
+            elif op == "call":
+                value = _workerCall(modules, loop, *args)
+            elif op == "methods":
+                value = bridge.registry.names(owner=args[0])
+            elif op == "unload":
+                from .pluginscheduler import unloadPluginModules
+                modules.pop(args[0], None)
+                unloadPluginModules(args[0])
+                bridge.registry.removeOwner(args[0])
+                value = None
+            elif op == "stop":
+                conn.send((callId, True, None))
+                break
+            else:
+                raise ValueError(f"unknown request {op}")
+            reply = (callId, True, value)
+        except BaseException as e:
+            logger.exception("plugin worker request %s failed", op)
+            reply = (callId, False, "".join(traceback.format_exception_only(type(e), e)).strip())
+
+        try:
+            conn.send(reply)
+        except (TypeError, AttributeError, ValueError) as e:
+            # the result can't be pickled
+            conn.send((callId, False, f"result can't be sent to the application: {e}"))
+
+    loop.close()
+
+
+# application side
+
+
+class WorkerProcess:
+    """A worker process hosting isolated plugins.
+
+    Requests are pickled over a multiprocessing pipe, a reader thread
+    resolves the future of each request when its reply arrives. If the
+    process dies, pending requests fail with WorkerCrashed and onExit is
+    called from the event loop.
+    """
+
+    def __init__(self, index: int, onExit: typing.Callable[["WorkerProcess"], None] = None):
+        context = multiprocessing.get_context("spawn")
+        self.index = index
+        self._conn, child = context.Pipe()
+        self._process = context.Process(target=workerMain, args=(child,),
+                                        name=f"myapp-plugin-worker-{index}", daemon=True)
+        self._process.start()
+        child.close()
+        self._onExit = onExit
+        self._ids = itertools.count()
+        self._futures: typing.Dict[int, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+        # plugins loaded in this worker, name -> (manifest, active)
+        self.plugins: typing.Dict[str, list] = {}
+        self._reader = threading.Thread(
+            target=self._read, name=f"myapp-plugin-worker-{index}-reader", daemon=True)
+        self._reader.start()
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    def isAlive(self) -> bool:
+        return self._process.is_alive()
+
+    def request(self, op: str, *args) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        with self._lock:
+            callId = next(self._ids)
+            self._futures[callId] = future
+            try:
+                self._conn.send((callId, op, args))
+            except (OSError, ValueError) as e:
+                del self._futures[callId]
+                future.set_exception(WorkerCrashed(f"plugin worker {self.index} is not running: {e}"))
+
+        return future
+
+    def _read(self) -> None:
+        while True:
+            try:
+                callId, ok, value = self._conn.recv()
+            except (EOFError, OSError):
+                break
+
+            with self._lock:
+                future = self._futures.pop(callId, None)
+            if future is None:
+                continue
+            try:
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(RuntimeError(value))
+            except concurrent.futures.InvalidStateError:
+                # cancelled by the caller, e.g. a hook over its budget
+                pass
+
+        self._process.join(1)
+        with self._lock:
+            futures, self._futures = self._futures, {}
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(WorkerCrashed(
+                    f"plugin worker {self.index} exited with code {self._process.exitcode}"))
+
+        if not self._stopping and self._onExit is not None:
+            from .utils import postToEventLoop
+            postToEventLoop(self._onExit, self)
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stopping = True
+        if self._process.is_alive():
+            try:
+                self.request("stop").result(timeout)
+            except (concurrent.futures.TimeoutError, RuntimeError):
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout)
+
+        self._conn.close()
+
+
+class PluginProxy:
+    """Stands for the module of a plugin running in a worker process.
+
+    It has the hooks, ``activate`` and ``deactivate`` functions the plugin
+    implements, calling them returns an awaitable resolved with the result
+    from the worker, so the plugin manager schedules them like async hooks.
+    """
+
+    def __init__(self, pool: "WorkerPool", name: str, description: dict):
+        self.__name__ = f"myapp.plugins.{name}"
+        self._pool = pool
+        self._name = name
+        for event in description["hooks"]:
+            setattr(self, event, self._hook(event))
+        if description["activate"]:
+            self.activate = lambda: pool.activate(name)
+        if description["deactivate"]:
+            self.deactivate = lambda: pool.deactivate(name)
+
+    def _hook(self, event: str):
+        def hook(*args):
+            return self._pool.call(self._name, ("hook", self._name, event),
+                                   tuple(describeArgument(arg) for arg in args))
+        return hook
+
+    def __repr__(self):
+        return f"<PluginProxy {self._name}>"
+
+
+class WorkerPool:
+    """Worker processes hosting the plugins declaring ``Isolated=true``.
+
+    Up to size workers are started on demand, a plugin goes to the worker
+    hosting the fewest plugins. A worker that crashes is restarted and its
+    plugins are loaded and activated again, unless it crashes more than
+    MAX_RESTARTS times in RESTART_WINDOW seconds. Its plugins are then
+    marked failed, see failed(), until they're loaded again.
+    """
+
+    def __init__(self, size: int = 2, methods=None):
+        self.size = max(1, size)
+        self._workers: typing.List[WorkerProcess] = []
+        self._byPlugin: typing.Dict[str, WorkerProcess] = {}
+        self._restarts: typing.Dict[int, typing.List[float]] = {}
+        # plugins stopped because their worker crashed too often, name -> reason
+        self._failed: typing.Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._methods = methods
+        self._stopping = False
+
+    def _registry(self):
+        if self._methods is None:
+            from . import bridge
+            self._methods = bridge.registry
+        return self._methods
+
+    def _assign(self) -> WorkerProcess:
+        with self._lock:
+            if len(self._workers) < self.size:
+                indexes = {worker.index for worker in self._workers}
+                index = min(i for i in range(self.size + 1) if i not in indexes)
+                worker = WorkerProcess(index, self._workerExited)
+                self._workers.append(worker)
+                return worker
+
+            return min(self._workers, key=lambda worker: len(worker.plugins))
+
+    def load(self, info: PluginInfo) -> PluginProxy:
+        """Import the plugin in a worker, blocks until it's imported, can be called from any thread."""
+        name = info.name()
+        worker = self._byPlugin.get(name) or self._assign()
+        manifest = (info.filepath, info.options(), info.resources())
+        try:
+            description = worker.request("load", *manifest).result(LOAD_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            raise ImportError(f"plugin worker {worker.index} didn't load {name} "
+                              f"in {LOAD_TIMEOUT} seconds")
+        except RuntimeError as e:
+            raise ImportError(str(e))
+
+        with self._lock:
+            worker.plugins[name] = [manifest, False]
+            self._byPlugin[name] = worker
+            self._failed.pop(name, None)
+
+        return PluginProxy(self, name, description)
+
+    def unload(self, name: str) -> None:
+        worker = self._byPlugin.pop(name, None)
+        if worker is not None:
+            worker.plugins.pop(name, None)
+            worker.request("unload", name)
+            self._registry().removeOwner(name)
+
+    def call(self, plugin: str, target: tuple, args: tuple = ()) -> asyncio.Future:
+        """Call a function of a plugin in its worker, from the GUI thread."""
+        from . import asyncloop
+
+        worker = self._byPlugin.get(plugin)
+        if worker is None:
+            future = concurrent.futures.Future()
+            reason = self._failed.get(plugin, "it's not loaded in a worker")
+            future.set_exception(RuntimeError(f"plugin {plugin} can't be called, {reason}"))
+        else:
+            future = worker.request("call", target, args)
+
+        return asyncio.wrap_future(future, loop=asyncloop.driver().loop)
+
+    def activate(self, name: str) -> typing.Awaitable:
+        # requests are sent right away, so they reach the worker in call order
+        return self._activated(name, self.call(name, ("function", name, "activate")))
+
+    async def _activated(self, name: str, future: asyncio.Future):
+        result = await future
+        worker = self._byPlugin.get(name)
+        if worker is not None and name in worker.plugins:
+            worker.plugins[name][1] = True
+            await self._exposeMethods(worker, name)
+
+        return result
+
+    def deactivate(self, name: str) -> asyncio.Future:
+        worker = self._byPlugin.get(name)
+        if worker is not None and name in worker.plugins:
+            worker.plugins[name][1] = False
+
+        self._registry().removeOwner(name)
+        return self.call(name, ("function", name, "deactivate"))
+
+    async def _exposeMethods(self, worker: WorkerProcess, name: str) -> None:
+        """Expose the bridge methods the plugin registered in its worker through proxies."""
+        from . import asyncloop
+
+        names = await asyncio.wrap_future(worker.request("methods", name),
+                                          loop=asyncloop.driver().loop)
+        registry = self._registry()
+        for method in names:
+            registry.expose(method, self._methodProxy(name, method), owner=name)
+
+    def _methodProxy(self, plugin: str, method: str):
+        def proxy(*args):
+            return self.call(plugin, ("method", plugin, method), args)
+        return proxy
+
+    def _workerExited(self, worker: WorkerProcess) -> None:
+        if self._stopping or worker not in self._workers:
+            return
+
+        now = time.monotonic()
+        restarts = [t for t in self._restarts.get(worker.index, []) if now - t < RESTART_WINDOW]
+        restarts.append(now)
+        self._restarts[worker.index] = restarts
+        plugins = dict(worker.plugins)
+        for name in plugins:
+            self._byPlugin.pop(name, None)
+            self._registry().removeOwner(name)
+
+        if len(restarts) > MAX_RESTARTS:
+            logger.error("plugin worker %d crashed %d times in %d seconds, plugins %s are stopped",
+                         worker.index, len(restarts), RESTART_WINDOW, ", ".join(plugins))
+            reason = f"its worker crashed {len(restarts)} times in {RESTART_WINDOW} seconds"
+            with self._lock:
+                # plugins loaded later get a new worker
+                self._workers.remove(worker)
+                self._restarts.pop(worker.index, None)
+                self._failed.update(dict.fromkeys(plugins, reason))
+            return
+
+        logger.warning("plugin worker %d exited with code %s, restarting it",
+                       worker.index, worker._process.exitcode)
+        replacement = WorkerProcess(worker.index, self._workerExited)
+        with self._lock:
+            self._workers[self._workers.index(worker)] = replacement
+
+        from . import asyncloop
+        asyncloop.schedule(self._restore(replacement, plugins),
+                           name=f"restore plugin worker {worker.index}")
+
+    async def _restore(self, worker: WorkerProcess, plugins: dict) -> None:
+        from . import asyncloop
+
+        loop = asyncloop.driver().loop
+        for name, (manifest, active) in plugins.items():
+            try:
+                await asyncio.wrap_future(worker.request("load", *manifest), loop=loop)
+            except RuntimeError as e:
+                logger.error("plugin %s can't be loaded after its worker restarted: %s", name, e)
+                continue
+
+            worker.plugins[name] = [manifest, False]
+            self._byPlugin[name] = worker
+            if active:
+                await self.activate(name)
+
+    def workers(self) -> typing.List[WorkerProcess]:
+        return list(self._workers)
+
+    def failed(self) -> typing.Dict[str, str]:
+        """{plugin name: reason} of the plugins stopped because their worker kept crashing."""
+        return dict(self._failed)
+
+    def shutdown(self) -> None:
+        self._stopping = True
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+        self._byPlugin = {}
+        self._failed = {}
@@ -0,0 +1,318 @@
+import os
+import sys
+import time
+import typing
+import importlib
+import importlib.util
+import concurrent.futures
+
+from .pluginindex import PluginInfo
+from .pluginarchive import (pathExists, registerSearchLocation, unregisterSearchLocation,
+                            specFromPath)
+from . import tracing
+
+
+def importPluginPackage(name: str, directory: str):
+    """Import the plugin directory as the package myapp.plugins.<name>,
+    so plugin modules can use relative imports.
+
+    directory may be a plugin archive, its modules are then imported from
+    the archive.
+    """
+    package = f"myapp.plugins.{name}"
+    init_path = os.path.join(directory, "__init__.py")
+    if pathExists(init_path):
+        spec = specFromPath(package, init_path, isPackage=True)
+    else:
+        spec = importlib.machinery.ModuleSpec(package, None, is_package=True)
+        spec.submodule_search_locations = [directory]
+        registerSearchLocation(directory)
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[package] = module
+    setattr(importlib.import_module("myapp.plugins"), name, module)
+    if spec.loader is not None:
+        spec.loader.exec_module(module)
+
+    return module
+
+
+def preparePlugin(info: PluginInfo):
+    """Read and compile the plugin main module, using the bytecode cache when it's fresh.
+
+    Returns the module spec and code object, code is None when the main
+    module is the package ``__init__.py``.
+    """
+    module_path = info.modulePath()
+    module_name = os.path.splitext(os.path.basename(module_path))[0]
+    if module_name == "__init__":
+        return None, None
+
+    spec = specFromPath(
+        f"myapp.plugins.{info.name()}.{module_name}", module_path)
+    if spec is None:
+        raise ImportError(f"can't open {info.archive()}")
+
+    return spec, spec.loader.get_code(spec.name)
+
+
+def execPlugin(info: PluginInfo, spec, code):
+    """Run the import-time code of a prepared plugin and return its main module."""
+    package = importPluginPackage(
+        info.name(), os.path.dirname(info.modulePath()))
+    if spec is None:
+        return package
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    try:
+        exec(code, module.__dict__)
+    except BaseException:
+        sys.modules.pop(spec.name, None)
+        raise
+
+    setattr(package, spec.name.rpartition(".")[2], module)
+    return module
+
+
+def unloadPluginModules(name: str) -> list:
+    """Forget the modules of the package myapp.plugins.<name>, so the next
+    import of the plugin runs its code again. Returns the forgotten modules."""
+    package = f"myapp.plugins.{name}"
+    names = [module for module in list(sys.modules)
+             if module == package or module.startswith(package + ".")]
+    modules = [sys.modules.pop(module) for module in names if module in sys.modules]
+    for module in modules:
+        # finders of the package directories inside a plugin archive
+        for location in getattr(module, "__path__", None) or ():
+            unregisterSearchLocation(location)
+
+    plugins = sys.modules.get("myapp.plugins")
+    if plugins is not None and getattr(plugins, name, None) is not None:
+        delattr(plugins, name)
+
+    # directory listings cached by the path finders may predate the change
+    importlib.invalidate_caches()
+    return modules
+
+
+class PluginLoadTiming:
+    """Load timings of a plugin, durations and offsets are in milliseconds."""
+
+    def __init__(self, name: str, requires: typing.List[str]):
+        self.name = name
+        self.requires = requires
+        self.prepare = 0.0
+        self.execute = 0.0
+        self.activate = 0.0
+        # offsets from the start of the scheduler run
+        self.started = None
+        self.finished = None
+
+    @property
+    def total(self) -> float:
+        return self.prepare + self.execute + self.activate
+
+    def __repr__(self):
+        return ("PluginLoadTiming({}, prepare={:.2f}, execute={:.2f}, activate={:.2f})"
+                .format(self.name, self.prepare, self.execute, self.activate))
+
+
+def criticalPath(timings: typing.Dict[str, PluginLoadTiming]) -> typing.List[str]:
+    """The chain of dependent plugins with the longest total load time."""
+    cost = {}
+    previous = {}
+
+    def visit(name):
+        if name not in cost:
+            cost[name] = 0.0
+            best = None
+            for req in timings[name].requires:
+                if req in timings and (best is None or visit(req) > cost[best]):
+                    best = req
+            previous[name] = best
+            cost[name] = timings[name].total + (cost[best] if best else 0.0)
+        return cost[name]
+
+    for name in timings:
+        visit(name)
+
+    if not cost:
+        return []
+
+    path = []
+    name = max(cost, key=cost.get)
+    while name is not None:
+        path.append(name)
+        name = previous[name]
+
+    return list(reversed(path))
+
+
+class PluginScheduler:
+    """Load plugins in dependency order.
+
+    Reading and compiling plugins happens on a thread pool, a plugin is only
+    executed after the plugins it ``Requires`` were executed. Activation and
+    the import-time code of plugins run on the calling thread, in topological
+    order, so objects created at import time get its thread affinity. Plugins
+    declaring ``ThreadedImport=true`` run their import-time code on the
+    thread pool instead. Plugins declaring ``Isolated=true`` are
+    imported by calling isolate(info) from the thread pool instead.
+    """
+
+    def __init__(self, infos: typing.List[PluginInfo], available: typing.Iterable[str] = (),
+                 workers: int = None, isolate: typing.Callable[[PluginInfo], typing.Any] = None):
+        self._infos = {}
+        for info in infos:
+            self._infos.setdefault(info.name(), info)
+
+        self._available = set(available)
+        self._workers = workers
+        self._isolate = isolate
+        self.timings: typing.Dict[str, PluginLoadTiming] = {}
+        self.errors: typing.Dict[str, str] = {}
+
+    def order(self) -> typing.List[str]:
+        """Topological order of the plugins.
+
+        Plugins with a missing requirement or that are part of, or depend on,
+        a dependency cycle are left out and reported in ``errors``.
+        """
+        requires = {name: info.requires() for name, info in self._infos.items()}
+
+        changed = True
+        while changed:
+            changed = False
+            for name, reqs in requires.items():
+                if name in self.errors:
+                    continue
+                for req in reqs:
+                    if req in self.errors:
+                        self.errors[name] = f"requires {req} which can't be loaded"
+                    elif req not in self._infos and req not in self._available:
+                        self.errors[name] = f"requires {req} which is not installed"
+                    else:
+                        continue
+                    changed = True
+                    break
+
+        indegree = {}
+        dependents = {name: [] for name in requires}
+        for name, reqs in requires.items():
+            if name in self.errors:
+                continue
+            local = [req for req in reqs if req in self._infos]
+            indegree[name] = len(local)
+            for req in local:
+                dependents[req].append(name)
+
+        order = []
+        ready = [name for name, degree in indegree.items() if degree == 0]
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in dependents[name]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+
+        for name in indegree:
+            if name not in order:
+                cycle = self._findCycle(name, requires)
+                if cycle:
+                    self.errors[name] = "dependency cycle " + " -> ".join(cycle)
+                else:
+                    self.errors[name] = "depends on a dependency cycle"
+
+        return order
+
+    def _findCycle(self, start: str, requires: dict) -> typing.List[str]:
+        stack = [(start, [start])]
+        visited = set()
+        while stack:
+            name, path = stack.pop()
+            for req in requires.get(name, []):
+                if req == start:
+                    return path + [start]
+                if req in requires and req not in visited:
+                    visited.add(req)
+                    stack.append((req, path + [req]))
+
+        return []
+
+    def run(self, activate: typing.Callable[[str, typing.Any], None]) -> typing.Dict[str, typing.Any]:
+        """Load every plugin and call activate(name, module) on the calling thread.
+
+        Returns the modules of the plugins that were loaded.
+        """
+        start = time.perf_counter()
+
+        def elapsed(since=start):
+            return (time.perf_counter() - since) * 1000
+
+        def prepare(name):
+            t = time.perf_counter()
+            with tracing.span(f"{name}.prepare", "plugin"):
+                result = preparePlugin(self._infos[name])
+            self.timings[name].prepare = elapsed(t)
+            return result
+
+        def execute(name, prepared):
+            for req in self._infos[name].requires():
+                if req in results and results[req].exception() is not None:
+                    raise ImportError(f"requires {req} which failed to load")
+
+            t = time.perf_counter()
+            self.timings[name].started = elapsed()
+            with tracing.span(f"{name}.import", "plugin", isolated=prepared is None):
+                if prepared is None:
+                    module = self._isolate(self._infos[name])
+                else:
+                    module = execPlugin(self._infos[name], *prepared)
+            self.timings[name].execute = elapsed(t)
+            return module
+
+        order = self.order()
+        for name in order:
+            self.timings[name] = PluginLoadTiming(
+                name, self._infos[name].requires())
+
+        modules = {}
+        results = {}
+        preparing = {}
+        with concurrent.futures.ThreadPoolExecutor(self._workers) as pool:
+            # tasks are queued in topological order, so a worker waiting on
+            # a requirement waits on a task that is already running
+            for name in order:
+                if self._isolate is not None and self._infos[name].isolated():
+                    results[name] = pool.submit(execute, name, None)
+                elif self._infos[name].threadedImport():
+                    results[name] = pool.submit(
+                        lambda name=name: execute(name, prepare(name)))
+                else:
+                    results[name] = concurrent.futures.Future()
+                    preparing[name] = pool.submit(prepare, name)
+
+            for name in order:
+                future = results[name]
+                if name in preparing:
+                    try:
+                        future.set_result(
+                            execute(name, preparing[name].result()))
+                    except Exception as e:
+                        future.set_exception(e)
+
+                try:
+                    modules[name] = future.result()
+                except Exception as e:
+                    self.errors[name] = str(e)
+                    del self.timings[name]
+                    continue
+
+                t = time.perf_counter()
+                activate(name, modules[name])
+                self.timings[name].activate = elapsed(t)
+                self.timings[name].finished = elapsed()
+
+        return modules
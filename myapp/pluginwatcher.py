@@ -0,0 +1,140 @@
+import os
+import typing
+
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher
+
+from .utils import Signal
+
+# written by the interpreter while a plugin is imported, never a change of the plugin
+IGNORED_DIRECTORIES = ("__pycache__",)
+
+
+def snapshot(root: str) -> typing.Dict[str, typing.Tuple[int, int]]:
+    """{path: (mtime_ns, size)} of root and, if it's a directory, of the files below it."""
+    files = {}
+    if not os.path.isdir(root):
+        try:
+            st = os.stat(root)
+            files[root] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        return files
+
+    for directory, subdirs, names in os.walk(root):
+        subdirs[:] = [d for d in subdirs if d not in IGNORED_DIRECTORIES]
+        files[directory] = (0, 0)
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files[path] = (st.st_mtime_ns, st.st_size)
+
+    return files
+
+
+class PluginWatcher(QObject):
+    """Report the plugins whose files changed on disk.
+
+    A plugin is watched from its root, its directory or its archive. Change
+    notifications are collected for delay milliseconds, since editors often
+    save a file in several steps, and a plugin is only reported if the
+    modification time or size of one of its files changed, or a file was
+    added or removed. Plugin directories are watched too, ``pluginsAdded``
+    is emitted when an entry appears in one of them.
+    """
+    pluginChanged = Signal()
+    pluginsAdded = Signal()
+
+    def __init__(self, delay: int = 200, parent=None):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._changed)
+        self._watcher.directoryChanged.connect(self._changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self._flush)
+        # plugin root -> names of the plugins in it, manifests of several
+        # plugins may share a directory
+        self._roots: typing.Dict[str, typing.Set[str]] = {}
+        self._snapshots: typing.Dict[str, dict] = {}
+        self._directories: typing.Dict[str, set] = {}
+        self._changes = set()
+
+    def watchDirectory(self, directory: str) -> None:
+        """Report new entries of a directory plugins are installed in."""
+        if directory not in self._directories:
+            self._directories[directory] = set(self._entries(directory))
+            self._watcher.addPath(directory)
+
+    def watchPlugin(self, name: str, root: str) -> None:
+        for previous, names in list(self._roots.items()):
+            if name in names and previous != root:
+                self.unwatchPlugin(name)
+
+        self._roots.setdefault(root, set()).add(name)
+        self._snapshots[name] = snapshot(root)
+        self._watch(self._snapshots[name])
+
+    def unwatchPlugin(self, name: str) -> None:
+        for root, names in list(self._roots.items()):
+            names.discard(name)
+            if not names:
+                del self._roots[root]
+
+        files = set(self._snapshots.pop(name, {}))
+        # still watched for the other plugins of the same root
+        for other in self._snapshots.values():
+            files -= other.keys()
+        if files:
+            self._watcher.removePaths(list(files))
+
+    def watched(self) -> typing.Dict[str, typing.Set[str]]:
+        """{root: plugin names} of the watched plugins."""
+        return {root: set(names) for root, names in self._roots.items()}
+
+    def _watch(self, files: dict) -> None:
+        # editors replacing a file on save make the watcher drop it, paths
+        # are added again every time the plugin is checked
+        missing = set(files.keys()) - set(self._watcher.files()) - set(self._watcher.directories())
+        if missing:
+            self._watcher.addPaths(list(missing))
+
+    def _entries(self, directory: str) -> typing.List[str]:
+        try:
+            return os.listdir(directory)
+        except OSError:
+            return []
+
+    def _changed(self, path: str) -> None:
+        self._changes.add(path)
+        self._timer.start()
+
+    def _flush(self) -> None:
+        changes, self._changes = self._changes, set()
+
+        added = False
+        for directory in self._directories.keys() & changes:
+            entries = set(self._entries(directory))
+            added = added or bool(entries - self._directories[directory])
+            self._directories[directory] = entries
+
+        changed = []
+        for root, names in list(self._roots.items()):
+            prefix = root + os.sep
+            if not any(path == root or path.startswith(prefix) for path in changes):
+                continue
+
+            files = snapshot(root)
+            for name in sorted(names):
+                if files != self._snapshots.get(name):
+                    self._snapshots[name] = files
+                    changed.append(name)
+            self._watch(files)
+
+        for name in changed:
+            self.pluginChanged.emit(name)
+        if added:
+            self.pluginsAdded.emit()
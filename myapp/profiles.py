@@ -0,0 +1,112 @@
+import os
+import typing
+import logging
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+
+from .utils import Signal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = "default"
+
+CACHE_TYPES = {
+    "memory": QWebEngineProfile.MemoryHttpCache,
+    "disk": QWebEngineProfile.DiskHttpCache,
+    "none": QWebEngineProfile.NoCache,
+}
+
+COOKIE_POLICIES = {
+    "session": QWebEngineProfile.NoPersistentCookies,
+    "persistent": QWebEngineProfile.AllowPersistentCookies,
+    "force": QWebEngineProfile.ForcePersistentCookies,
+}
+
+
+def configureProfile(profile: QWebEngineProfile, options: dict, basePath: str = None) -> None:
+    """Apply the options of a profile entry of myapp.yml to profile.
+
+    ``storagePath`` and ``cachePath`` are relative to basePath, ``cacheType``
+    is one of memory, disk or none, ``cacheSize`` is in bytes, 0 lets
+    Chromium pick, and ``cookies`` is one of session, persistent or force.
+    """
+    def path(value):
+        if basePath is not None and not os.path.isabs(value):
+            return os.path.join(basePath, value)
+        return value
+
+    if options.get("storagePath"):
+        profile.setPersistentStoragePath(path(options["storagePath"]))
+    if options.get("cachePath"):
+        profile.setCachePath(path(options["cachePath"]))
+
+    cacheType = options.get("cacheType")
+    if cacheType is not None:
+        if cacheType not in CACHE_TYPES:
+            logger.warning("unknown cacheType %s for profile %s", cacheType, profile.storageName())
+        else:
+            profile.setHttpCacheType(CACHE_TYPES[cacheType])
+
+    if options.get("cacheSize") is not None:
+        profile.setHttpCacheMaximumSize(int(options["cacheSize"]))
+
+    cookies = options.get("cookies")
+    if cookies is not None:
+        if cookies not in COOKIE_POLICIES:
+            logger.warning("unknown cookies policy %s for profile %s", cookies, profile.storageName())
+        else:
+            profile.setPersistentCookiesPolicy(COOKIE_POLICIES[cookies])
+
+    if options.get("userAgent"):
+        profile.setHttpUserAgent(options["userAgent"])
+
+
+class ProfileManager(QObject):
+    """Named web engine profiles configured in the ``profiles`` section of myapp.yml.
+
+    A profile is created the first time it's requested. ``default`` is Qt's
+    default profile, other profiles are persistent and stored under their
+    name unless they set ``offTheRecord: true``.
+    """
+    profileCreated = Signal()
+
+    def __init__(self, options: typing.Dict[str, dict] = None, basePath: str = None, parent=None):
+        super().__init__(parent)
+        self._options = dict(options or {})
+        self._basePath = basePath
+        self._profiles: typing.Dict[str, QWebEngineProfile] = {}
+
+    def names(self) -> typing.List[str]:
+        return list(dict.fromkeys([DEFAULT_PROFILE] + list(self._options.keys())))
+
+    def has(self, name: str) -> bool:
+        return name == DEFAULT_PROFILE or name in self._options
+
+    def profile(self, name: str = None) -> QWebEngineProfile:
+        """The profile called name, the default profile if name is None or unknown."""
+        if name is None:
+            name = DEFAULT_PROFILE
+        elif not self.has(name):
+            logger.warning("profile %s is not configured, using the default profile", name)
+            name = DEFAULT_PROFILE
+
+        profile = self._profiles.get(name)
+        if profile is None:
+            options = self._options.get(name) or {}
+            if name == DEFAULT_PROFILE:
+                profile = QWebEngineProfile.defaultProfile()
+            elif options.get("offTheRecord", False):
+                profile = QWebEngineProfile(self)
+            else:
+                profile = QWebEngineProfile(name, self)
+
+            configureProfile(profile, options, self._basePath)
+            self._profiles[name] = profile
+            self.profileCreated.emit(name, profile)
+
+        return profile
+
+    def profiles(self) -> typing.Dict[str, QWebEngineProfile]:
+        """The profiles created so far, by name."""
+        return dict(self._profiles)
@@ -0,0 +1,154 @@
+import os
+import mmap
+import typing
+import mimetypes
+import collections
+
+from .pluginarchive import splitArchivePath, readFile
+
+# types mimetypes doesn't know on every platform
+MIME_TYPES = {
+    ".html": "text/html",
+    ".htm": "text/html",
+    ".js": "application/javascript",
+    ".mjs": "application/javascript",
+    ".css": "text/css",
+    ".json": "application/json",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".ico": "image/x-icon",
+    ".wasm": "application/wasm",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".txt": "text/plain",
+}
+
+
+def guessMimeType(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in MIME_TYPES:
+        return MIME_TYPES[ext]
+
+    mime, _ = mimetypes.guess_type(path)
+    return mime or "application/octet-stream"
+
+
+class Resource:
+    """A file served by the resource cache.
+
+    ``data`` holds the content of small files, large files are memory mapped
+    and exposed through ``mapped`` instead.
+    """
+
+    def __init__(self, path: str, st: os.stat_result, mime: str,
+                 data: bytes = None, mapped: mmap.mmap = None):
+        self.path = path
+        self.mtime = st.st_mtime_ns
+        self.size = st.st_size
+        self.mime = mime
+        self.data = data
+        self.mapped = mapped
+
+    def isFresh(self, st: os.stat_result) -> bool:
+        return self.mtime == st.st_mtime_ns and self.size == st.st_size
+
+
+class ResourceCache:
+    """LRU cache of file contents with a byte budget.
+
+    Entries are validated against the file mtime and size on every lookup.
+    Files bigger than ``mmapThreshold`` are not kept in the budget, they are
+    memory mapped so serving them doesn't copy them into Python memory. The
+    last ``maxMapped`` mappings are kept, a mapping is released when it's
+    evicted or its file changed.
+    Files inside a plugin archive are validated against the archive stat and
+    read from its mapping.
+    """
+
+    def __init__(self, maxBytes: int = 32 * 1024 * 1024, mmapThreshold: int = 1024 * 1024,
+                 maxMapped: int = 16):
+        self.maxBytes = maxBytes
+        self.mmapThreshold = mmapThreshold
+        self.maxMapped = maxMapped
+        self._entries = collections.OrderedDict()
+        # path -> Resource of the memory mapped files, least recently used first
+        self._mapped = collections.OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def currentBytes(self) -> int:
+        return self._bytes
+
+    def get(self, path: str) -> typing.Optional[Resource]:
+        """The resource for path, None if it's not a readable file."""
+        location = splitArchivePath(path)
+        try:
+            st = os.stat(location[0] if location is not None else path)
+        except OSError:
+            self._drop(path)
+            return None
+
+        entries = self._mapped if path in self._mapped else self._entries
+        entry = entries.get(path)
+        if entry is not None and entry.isFresh(st):
+            entries.move_to_end(path)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        self._drop(path)
+        mime = guessMimeType(path)
+        if location is not None:
+            data = readFile(path)
+            if data is None:
+                return None
+            return self._add(Resource(path, st, mime, data=data))
+
+        try:
+            with open(path, "rb") as f:
+                if st.st_size >= self.mmapThreshold:
+                    return self._addMapped(Resource(
+                        path, st, mime, mapped=mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)))
+                data = f.read()
+        except (OSError, ValueError):
+            return None
+
+        return self._add(Resource(path, st, mime, data=data))
+
+    def _add(self, resource: Resource) -> Resource:
+        if len(resource.data) <= self.maxBytes:
+            self._entries[resource.path] = resource
+            self._bytes += len(resource.data)
+            self._evict()
+
+        return resource
+
+    def _addMapped(self, resource: Resource) -> Resource:
+        self._mapped[resource.path] = resource
+        while len(self._mapped) > self.maxMapped:
+            self._mapped.popitem(last=False)
+
+        return resource
+
+    def _drop(self, path: str) -> None:
+        # a dropped mapping is unmapped once the replies reading it are done
+        self._mapped.pop(path, None)
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= len(entry.data)
+
+    def _evict(self) -> None:
+        while self._bytes > self.maxBytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= len(entry.data)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._mapped.clear()
+        self._bytes = 0
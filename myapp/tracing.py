@@ -0,0 +1,222 @@
+"""Nested spans exported as Chrome trace event JSON.
+
+Tracing is off unless the application is started with ``--trace[=path]`` or
+the ``MYAPP_TRACE`` environment variable set to the output path. Disabled,
+``span()`` returns a shared no-op context manager. Enabled, the trace is
+written when the process exits and can be opened in chrome://tracing or
+https://ui.perfetto.dev.
+
+Plugins use the same API::
+
+    from myapp import tracing
+
+    with tracing.span("myplugin.index", "plugin", documents=len(docs)):
+        ...
+
+This module doesn't import Qt, so it can time the Qt imports.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import typing
+import logging
+import functools
+import threading
+
+ENV_VARIABLE = "MYAPP_TRACE"
+CLI_FLAG = "--trace"
+DEFAULT_PATH = "myapp-trace.json"
+
+logger = logging.getLogger(__name__)
+
+_origin = time.perf_counter()
+
+
+def _now() -> float:
+    """Microseconds since this module was imported."""
+    return (time.perf_counter() - _origin) * 1000000
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, exc, tb):
+        return False
+
+    def set(self, **args) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A complete event, recorded when the with block exits."""
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer, name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = _now()
+        return self
+
+    def __exit__(self, excType, exc, tb):
+        if excType is not None:
+            self.args["error"] = excType.__name__
+        self.tracer._record("X", self.name, self.category, self.start, self.args,
+                            dur=_now() - self.start)
+        return False
+
+    def set(self, **args) -> None:
+        """Add arguments shown with the span."""
+        self.args.update(args)
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self._events = []
+        self._threads = {}
+        self._pid = os.getpid()
+        self._registered = False
+
+    def enable(self, path: str = DEFAULT_PATH) -> None:
+        """Start recording, the trace is written to path when the process exits."""
+        self.enabled = True
+        self.path = path
+        if not self._registered:
+            atexit.register(self.write)
+            self._registered = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def _record(self, phase: str, name: str, category: str, ts: float, args: dict, **fields) -> None:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        event = {"ph": phase, "name": name, "cat": category, "ts": ts,
+                 "pid": self._pid, "tid": tid}
+        if args:
+            event["args"] = args
+        event.update(fields)
+        # list.append is atomic, spans may end on any thread
+        self._events.append(event)
+
+    def span(self, name: str, category: str = "myapp", **args):
+        """Context manager timing its block as name."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, category, args)
+
+    def instant(self, name: str, category: str = "myapp", **args) -> None:
+        if self.enabled:
+            self._record("i", name, category, _now(), args, s="t")
+
+    def begin(self, name: str, id, category: str = "myapp", **args) -> None:
+        """Start a span ended by end() later, possibly in another event loop iteration."""
+        if self.enabled:
+            self._record("b", name, category, _now(), args, id=str(id))
+
+    def end(self, name: str, id, category: str = "myapp", **args) -> None:
+        if self.enabled:
+            self._record("e", name, category, _now(), args, id=str(id))
+
+    def events(self) -> typing.List[dict]:
+        """The recorded events, with thread name metadata."""
+        metadata = [{"ph": "M", "name": "thread_name", "pid": self._pid, "tid": tid,
+                     "args": {"name": name}} for tid, name in list(self._threads.items())]
+        return metadata + list(self._events)
+
+    def write(self, path: str = None) -> None:
+        path = path or self.path
+        if path is None or not self._events:
+            return
+
+        try:
+            with open(path, "w") as f:
+                json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
+        except OSError as e:
+            logger.error("unable to write trace to %s: %s", path, e)
+            return
+
+        logger.info("trace written to %s", path)
+
+    def clear(self) -> None:
+        self._events = []
+
+
+tracer = Tracer()
+
+
+def span(name: str, category: str = "myapp", **args):
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return Span(tracer, name, category, args)
+
+
+def instant(name: str, category: str = "myapp", **args) -> None:
+    tracer.instant(name, category, **args)
+
+
+def begin(name: str, id, category: str = "myapp", **args) -> None:
+    tracer.begin(name, id, category, **args)
+
+
+def end(name: str, id, category: str = "myapp", **args) -> None:
+    tracer.end(name, id, category, **args)
+
+
+def enabled() -> bool:
+    return tracer.enabled
+
+
+def traced(name: str = None, category: str = "myapp") -> typing.Callable:
+    """Decorator timing every call of the function, named after it by default."""
+    def decorator(func):
+        spanName = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(tracer, spanName, category, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def configure(argv: typing.List[str]) -> typing.List[str]:
+    """Enable tracing from the command line or the environment.
+
+    Returns argv without the tracing flag.
+    """
+    path = os.environ.get(ENV_VARIABLE) or None
+    remaining = []
+    for arg in argv:
+        if arg == CLI_FLAG:
+            path = path or DEFAULT_PATH
+        elif arg.startswith(CLI_FLAG + "="):
+            path = arg[len(CLI_FLAG) + 1:] or DEFAULT_PATH
+        else:
+            remaining.append(arg)
+
+    if path is not None:
+        tracer.enable(DEFAULT_PATH if path == "1" else path)
+        tracer.instant("process start", "startup", argv=" ".join(argv),
+                       python=sys.version.split()[0])
+
+    return remaining
@@ -1,28 +1,246 @@
 import os
 import re
+import time
+import bisect
+import typing
 import fnmatch
+import inspect
+import logging
+import threading
+import weakref
+import functools
 from typing import TypeVar, Callable
 
 T = TypeVar('T')
 
+logger = logging.getLogger(__name__)
+
+
+# upper bounds of the emit latency histogram buckets, in microseconds
+LATENCY_BUCKETS = tuple(2 ** i for i in range(21))
+
+_instrumented = weakref.WeakValueDictionary()
+# every signal instance, to find the subscribers of an unloaded plugin
+_signals = weakref.WeakSet()
+_poster = None
+_posterLock = threading.Lock()
+
+
+def postToEventLoop(func: Callable, *args, **kwargs) -> None:
+    """Call func(*args, **kwargs) from the Qt event loop of the main thread.
+
+    Can be called from any thread.
+    """
+    global _poster
+    if _poster is None:
+        from PyQt5.QtCore import QObject, QCoreApplication, Qt, pyqtSignal, pyqtSlot
+
+        class Poster(QObject):
+            posted = pyqtSignal(object)
+
+            def __init__(self):
+                super().__init__()
+                self.posted.connect(self._run, Qt.QueuedConnection)
+
+            @pyqtSlot(object)
+            def _run(self, call):
+                call()
+
+        with _posterLock:
+            if _poster is None:
+                poster = Poster()
+                app = QCoreApplication.instance()
+                if app is not None:
+                    poster.moveToThread(app.thread())
+                # only published once it lives in the main thread, so no
+                # call is posted to the event loop of another thread
+                _poster = poster
+
+    _poster.posted.emit(functools.partial(func, *args, **kwargs))
+
+
+class SignalStats:
+    """Emit counters and latency histogram of a signal."""
+
+    def __init__(self):
+        self.emits = 0
+        self.calls = 0
+        self.totalTime = 0.0
+        self.maxTime = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, elapsed: float, calls: int) -> None:
+        self.emits += 1
+        self.calls += calls
+        self.totalTime += elapsed
+        if elapsed > self.maxTime:
+            self.maxTime = elapsed
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, elapsed * 1e6)] += 1
+
+    def percentile(self, p: float) -> float:
+        """Upper bound, in seconds, of the bucket holding the p-th percentile emit latency."""
+        if self.emits == 0:
+            return 0.0
+
+        rank = self.emits * p / 100
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank and count:
+                if i == len(LATENCY_BUCKETS):
+                    return self.maxTime
+                return LATENCY_BUCKETS[i] / 1e6
+
+        return self.maxTime
+
+    def asDict(self) -> dict:
+        return {
+            "emits": self.emits,
+            "calls": self.calls,
+            "totalTime": self.totalTime,
+            "maxTime": self.maxTime,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "histogram": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["inf"], self.histogram)),
+        }
+
 
 class Signal:
-    def __init__(self, *args):
-        self.__subscribers = []
+    """Callback list with the connect/disconnect/emit API of Qt signals.
+
+    Bound methods are referenced weakly, so connecting a method doesn't keep
+    its object alive. Subscribers are kept in an immutable tuple replaced on
+    connect/disconnect, so emit iterates a snapshot and handlers may connect
+    or disconnect while it runs. A ``queued`` signal emits from the Qt event
+    loop instead of the current call stack.
+
+    Declared on a class, each instance gets its own signal the first time
+    it's accessed, as with pyqtSignal. The class attribute only holds the
+    settings and the statistics shared by all instances: emitting on an
+    instance doesn't reach the subscribers of another instance, nor those
+    connected through the class, e.g. ``MyApplication.windowAdded.connect``,
+    which all instances used to share.
+    """
+
+    def __init__(self, *args, queued: bool = False, name: str = None):
+        self._subscribers = ()
+        self._queued = queued
+        self._name = name
+        self._attr = None
+        self._template = None
+        self._stats = None
+        _signals.add(self)
+
+    def __set_name__(self, owner, attr):
+        self._attr = attr
+        if self._name is None:
+            self._name = f"{owner.__name__}.{attr}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None or self._attr is None:
+            return self
+
+        signal = Signal(queued=self._queued, name=self._name)
+        signal._template = self
+        obj.__dict__[self._attr] = signal
+        return signal
+
+    @property
+    def name(self) -> str:
+        return self._name
 
     def emit(self, *args, **kwargs):
-        for subs in self.__subscribers:
+        if self._queued:
+            postToEventLoop(self._emit, args, kwargs)
+        else:
+            self._emit(args, kwargs)
+
+    def emitQueued(self, *args, **kwargs):
+        """Emit from the Qt event loop, after the current call stack returns."""
+        postToEventLoop(self._emit, args, kwargs)
+
+    def _emit(self, args, kwargs):
+        stats = (self._template or self)._stats
+        start = time.perf_counter() if stats is not None else 0.0
+        calls = 0
+        for subs in self._subscribers:
+            if type(subs) is weakref.WeakMethod:
+                subs = subs()
+                if subs is None:
+                    continue
             subs(*args, **kwargs)
+            calls += 1
+
+        if stats is not None:
+            stats.record(time.perf_counter() - start, calls)
 
     def connect(self, func: Callable[[T], None]):
-        self.__subscribers.append(func)
+        if inspect.ismethod(func):
+            subs = weakref.WeakMethod(func, self._prune)
+        else:
+            subs = func
+        self._subscribers = self._subscribers + (subs,)
 
     def disconnect(self, func: Callable[[T], None]):
-        try:
-            self.__subscribers.remove(func)
-        except ValueError:
-            print('Warning: function %s not removed '
-                  'from signal %s' % (func, self))
+        for i, subs in enumerate(self._subscribers):
+            if type(subs) is weakref.WeakMethod:
+                subs = subs()
+            if subs is not None and subs == func:
+                self._subscribers = self._subscribers[:i] + self._subscribers[i + 1:]
+                return
+
+        logger.warning("function %s not removed from signal %s", func, self.name or self)
+
+    def disconnectModule(self, package: str) -> int:
+        """Disconnect the subscribers defined in package or one of its
+        modules, returns how many were removed."""
+        kept = tuple(subs for subs in self._subscribers
+                     if not definedIn(subs() if type(subs) is weakref.WeakMethod else subs,
+                                       package))
+        removed = len(self._subscribers) - len(kept)
+        self._subscribers = kept
+        return removed
+
+    def _prune(self, ref):
+        self._subscribers = tuple(subs for subs in self._subscribers if subs is not ref)
+
+    def receivers(self) -> int:
+        """Number of connected subscribers which are still alive."""
+        return sum(1 for subs in self._subscribers
+                   if type(subs) is not weakref.WeakMethod or subs() is not None)
+
+    def instrument(self, enabled: bool = True) -> None:
+        """Enable or disable emit counters and latency histogram for this signal."""
+        owner = self._template or self
+        if enabled and owner._stats is None:
+            owner._stats = SignalStats()
+            _instrumented[id(owner)] = owner
+        elif not enabled:
+            owner._stats = None
+            _instrumented.pop(id(owner), None)
+
+    def stats(self) -> typing.Optional[SignalStats]:
+        return (self._template or self)._stats
+
+
+def signalStats() -> typing.Dict[str, dict]:
+    """Statistics of every instrumented signal, by signal name."""
+    return {signal.name or repr(signal): signal.stats().asDict()
+            for signal in list(_instrumented.values()) if signal.stats() is not None}
+
+
+def definedIn(func, package: str) -> bool:
+    """Whether func, a function, class or partial, is defined in package or one of its modules."""
+    while isinstance(func, functools.partial):
+        func = func.func
+    module = getattr(func, "__module__", None) or ""
+    return module == package or module.startswith(package + ".")
+
+
+def disconnectModule(package: str) -> int:
+    """Disconnect the subscribers defined in package from every signal,
+    returns how many were removed."""
+    return sum(signal.disconnectModule(package) for signal in list(_signals))
 
 
 def findFiles(pattern, path, regex=False):
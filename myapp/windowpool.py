@@ -0,0 +1,89 @@
+import typing
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+
+from .BrowserWindow import BrowserWindow
+
+
+class WindowPool(QObject):
+    """Browser windows built and prepared ahead of time.
+
+    Up to size hidden windows, with their web channel, bridge scripts and
+    plugin resources installed and a renderer started on a blank page, are
+    kept ready. They are built one at a time once the application has been
+    idle for warmDelay milliseconds. Closed windows are reset and put back in
+    the pool when recycle is enabled and the pool isn't full.
+
+    Pooled windows use profile, windows of other profiles are always built
+    on demand.
+    """
+
+    def __init__(self, application, size: int = 1, recycle: bool = True, warmDelay: int = 500,
+                 profile: QWebEngineProfile = None):
+        super().__init__(application)
+        self._app = application
+        self.profile = profile if profile is not None else QWebEngineProfile.defaultProfile()
+        self.size = max(0, size)
+        self.recycle = recycle
+        self._idle: typing.List[BrowserWindow] = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(warmDelay)
+        self._timer.timeout.connect(self._warm)
+        self.hits = 0
+        self.misses = 0
+
+    def available(self) -> int:
+        return len(self._idle)
+
+    def windows(self) -> typing.List[BrowserWindow]:
+        """The windows waiting in the pool."""
+        return list(self._idle)
+
+    def start(self) -> None:
+        """Start warming windows in idle time."""
+        if len(self._idle) < self.size:
+            self._timer.start()
+
+    def acquire(self, profile: QWebEngineProfile = None) -> BrowserWindow:
+        """A window for application, prepared ahead if one is available."""
+        if profile is not None and profile is not self.profile:
+            return BrowserWindow(self._app, profile)
+
+        if self._idle:
+            self.hits += 1
+            window = self._idle.pop(0)
+            window.attach(self._app)
+        else:
+            self.misses += 1
+            window = BrowserWindow(self._app, self.profile)
+
+        self.start()
+        return window
+
+    def release(self, window: BrowserWindow) -> bool:
+        """Take back a closed window, returns False if it should be deleted instead."""
+        if not self.recycle or len(self._idle) >= self.size or window.profile() is not self.profile:
+            return False
+
+        window.recycle()
+        self._idle.append(window)
+        return True
+
+    def _warm(self) -> None:
+        if len(self._idle) >= self.size:
+            return
+
+        window = BrowserWindow(profile=self.profile)
+        window.setAttribute(Qt.WA_DeleteOnClose, True)
+        window.prepare()
+        self._idle.append(window)
+        self.start()
+
+    def clear(self) -> None:
+        """Delete the windows of the pool."""
+        self._timer.stop()
+        for window in self._idle:
+            window.deleteLater()
+        self._idle = []
@@ -1,3 +1,7 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
 
 def printMessage():
-    print("Hello from extras.py")
+    logger.info("Hello from extras.py")
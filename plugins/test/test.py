@@ -1,19 +1,24 @@
+import logging
+
 from .extras import printMessage
 
+# myapp.plugins.test.test, its level is set by logging.levels.plugins.test
+logger = logging.getLogger(__name__)
+
 
 def printHello():
-    print("Hello from test.py")
+    logger.info("Hello from test.py")
 
 
 def beforeLoad(channel, page):
-    print("beforeLoad event fired")
+    logger.debug("beforeLoad event fired")
 
 
 def activate():
-    print("plugin test activated")
+    logger.info("plugin test activated")
     printHello()
     printMessage()
 
 
 def deactivate():
-    print("plugin deactivated")
+    logger.info("plugin deactivated")
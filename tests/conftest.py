@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _hasWebEngine() -> bool:
+    try:
+        import PyQt5.QtWebEngineWidgets  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@pytest.fixture(scope="session")
+def qapp(tmp_path_factory):
+    """The Qt application of the test session.
+
+    Only one can exist, so it's a MyApplication, started in an empty
+    directory without pooled windows, when QtWebEngine can be imported and
+    a QCoreApplication otherwise.
+    """
+    QtCore = pytest.importorskip("PyQt5.QtCore", exc_type=ImportError)
+    app = QtCore.QCoreApplication.instance()
+    if app is not None:
+        return app
+
+    if not _hasWebEngine():
+        return QtCore.QCoreApplication([])
+
+    from PyQt5.QtWidgets import QApplication
+    from myapp.MyApplication import MyApplication
+
+    directory = tmp_path_factory.mktemp("application")
+    (directory / "myapp.yml").write_text("windowPool:\n  size: 0\n")
+    cwd = os.getcwd()
+    os.chdir(str(directory))
+    try:
+        QApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts, True)
+        return MyApplication(["myapp"])
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def application(qapp):
+    """The MyApplication of the test session, tests using it are skipped
+    without QtWebEngine."""
+    if not _hasWebEngine():
+        pytest.skip("QtWebEngine can't be imported")
+    return qapp
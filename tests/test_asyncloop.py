@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore", exc_type=ImportError)
+
+from myapp.asyncloop import AsyncioDriver, _canInspect
+from myapp.hooks import HookTable
+
+
+async def work():
+    for _ in range(3):
+        await asyncio.sleep(0.005)
+    return 1
+
+
+@pytest.mark.parametrize("inspectable", [True, False])
+def test_driver_runs_tasks(qapp, inspectable):
+    driver = AsyncioDriver(qapp, asyncio.new_event_loop())
+    # a loop which isn't a BaseEventLoop is polled
+    driver._inspectable = inspectable
+    try:
+        task = driver.schedule(work())
+        assert driver.wait([task], 1.0)
+        assert task.result() == 1
+    finally:
+        driver.close()
+
+
+def test_hook_budget_is_in_milliseconds():
+    assert HookTable(budget=250).budget == 0.25
+    assert HookTable().budget is None
+
+
+class IncompleteLoop(asyncio.BaseEventLoop):
+    """A BaseEventLoop without the attributes of the CPython implementation."""
+
+    def __init__(self):
+        pass
+
+    def is_closed(self):
+        return True
+
+
+def test_loop_internals_are_only_read_when_present():
+    loop = asyncio.new_event_loop()
+    try:
+        assert _canInspect(loop)
+    finally:
+        loop.close()
+
+    assert not _canInspect(IncompleteLoop())
+    assert not _canInspect(asyncio.AbstractEventLoop())
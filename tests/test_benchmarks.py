@@ -0,0 +1,91 @@
+import pytest
+
+from benchmarks import suite
+from benchmarks.suite import compare, main, save
+
+
+def results(**benchmarks):
+    return {"meta": {}, "benchmarks": benchmarks, "skipped": {}}
+
+
+def rows(baseline, current, **kwargs):
+    return {(row["benchmark"], row["metric"]): row for row in compare(baseline, current, **kwargs)}
+
+
+def test_slowdown_above_threshold_is_a_regression():
+    compared = rows(
+        results(bench_a={"load (ms)": 10.0, "save (ms)": 10.0, "parse (ms)": 10.0}),
+        results(bench_a={"load (ms)": 13.0, "save (ms)": 12.5, "parse (ms)": 8.0}))
+
+    assert compared["bench_a", "load (ms)"]["change"] == pytest.approx(0.3)
+    assert compared["bench_a", "load (ms)"]["regression"]
+    # exactly at the threshold
+    assert compared["bench_a", "save (ms)"]["change"] == pytest.approx(0.25)
+    assert not compared["bench_a", "save (ms)"]["regression"]
+    # faster
+    assert compared["bench_a", "parse (ms)"]["change"] == pytest.approx(-0.2)
+    assert not compared["bench_a", "parse (ms)"]["regression"]
+
+
+def test_threshold_argument():
+    baseline = results(bench_a={"load (ms)": 10.0})
+    current = results(bench_a={"load (ms)": 11.0})
+    assert not rows(baseline, current)["bench_a", "load (ms)"]["regression"]
+    assert rows(baseline, current, threshold=0.05)["bench_a", "load (ms)"]["regression"]
+
+
+def test_small_absolute_differences_are_noise():
+    compared = rows(results(bench_a={"tiny (ms)": 0.01, "small (ms)": 0.1}),
+                    results(bench_a={"tiny (ms)": 0.05, "small (ms)": 0.2}))
+    # +400% but 0.04 ms
+    assert not compared["bench_a", "tiny (ms)"]["regression"]
+    assert compared["bench_a", "small (ms)"]["regression"]
+
+
+def test_higher_is_better_metrics():
+    compared = rows(
+        results(bench_a={"cache hits": 100, "calls per second": 1000, "speedup": 4.0}),
+        results(bench_a={"cache hits": 70, "calls per second": 1500, "speedup": 2.0}))
+    assert compared["bench_a", "cache hits"]["change"] == pytest.approx(0.3)
+    assert compared["bench_a", "cache hits"]["regression"]
+    assert compared["bench_a", "calls per second"]["change"] == pytest.approx(-0.5)
+    assert not compared["bench_a", "calls per second"]["regression"]
+    assert compared["bench_a", "speedup"]["regression"]
+
+
+def test_only_metrics_of_both_runs_are_compared():
+    compared = rows(
+        results(bench_a={"load (ms)": 10.0, "removed (ms)": 1.0, "label": "x"},
+                bench_old={"load (ms)": 1.0}),
+        results(bench_a={"load (ms)": 10.0, "added (ms)": 5.0, "label": "y"},
+                bench_new={"load (ms)": 1.0}))
+    assert list(compared) == [("bench_a", "load (ms)")]
+    assert compared["bench_a", "load (ms)"]["change"] == 0.0
+
+
+def test_zero_baseline():
+    compared = rows(results(bench_a={"errors": 0}), results(bench_a={"errors": 3}))
+    assert compared["bench_a", "errors"]["change"] == 0.0
+    assert not compared["bench_a", "errors"]["regression"]
+
+
+def test_compare_exit_status(tmp_path, capsys):
+    baseline = str(tmp_path / "baseline.json")
+    current = str(tmp_path / "results.json")
+    save(results(bench_config_load={"load (ms)": 10.0}), baseline)
+
+    save(results(bench_config_load={"load (ms)": 10.5}), current)
+    assert main(["compare", "--baseline", baseline, "--results", current]) == 0
+    save(results(bench_config_load={"load (ms)": 20.0}), current)
+    assert main(["compare", "--baseline", baseline, "--results", current]) == 1
+    assert "1 metrics compared, 1 regressions" in capsys.readouterr().out
+
+
+def test_compare_without_baseline(tmp_path, capsys, monkeypatch):
+    def runSuite(*args, **kwargs):
+        raise AssertionError("the suite shouldn't run without a baseline")
+
+    monkeypatch.setattr(suite, "runSuite", runSuite)
+    missing = str(tmp_path / "baseline.json")
+    assert main(["compare", "--baseline", missing]) == 2
+    assert f"no baseline at {missing}" in capsys.readouterr().err
@@ -0,0 +1,104 @@
+import json
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore", exc_type=ImportError)
+
+from myapp.bridge import Bridge, BridgeRegistry, blocking
+
+
+@pytest.fixture
+def bridge(qapp):
+    """(bridge, send) where send(*calls) returns the resolved messages."""
+    registry = BridgeRegistry(workers=2)
+    registry.expose("add", lambda a, b: a + b)
+    registry.expose("echo", lambda value: value)
+    bridge = Bridge(registry)
+    messages = []
+    bridge.resolved.connect(lambda message: messages.append(json.loads(message)))
+
+    def send(*calls, replies=None):
+        messages.clear()
+        bridge.call(json.dumps([list(call) for call in calls]))
+        expected = len(calls) if replies is None else replies
+        deadline = time.monotonic() + 5
+        while sum(len(m) for m in messages) < expected and time.monotonic() < deadline:
+            qapp.processEvents()
+            time.sleep(0.001)
+        qapp.processEvents()
+        return list(messages)
+
+    yield bridge, registry, send
+    registry.shutdown()
+    bridge.deleteLater()
+
+
+def test_batch_is_resolved_in_order(bridge):
+    bridge, registry, send = bridge
+    messages = send([1, "add", [1, 2]], [2, "echo", ["x"]], [3, "add", [3, 4]])
+    # replies of the same batch are sent as one message
+    assert messages == [[[1, True, 3], [2, True, "x"], [3, True, 7]]]
+    assert registry.stats()["add"]["calls"] == 2
+
+
+def test_errors_are_replied(bridge):
+    bridge, registry, send = bridge
+
+    def fail(message):
+        raise ValueError(message)
+
+    registry.expose("fail", fail)
+    messages = send([1, "fail", ["bad value"]], [2, "echo", [5]], [3, "fail", []])
+    assert messages[0][:2] == [[1, False, "bad value"], [2, True, 5]]
+    assert messages[0][2][:2] == [3, False]
+    assert "missing 1 required positional argument" in messages[0][2][2]
+    assert registry.stats()["fail"]["errors"] == 2
+
+
+def test_unknown_method(bridge):
+    bridge, registry, send = bridge
+    messages = send([7, "missing", []], [8, "echo", [1]])
+    assert messages == [[[7, False, "no bridge method missing"], [8, True, 1]]]
+    assert "missing" not in registry.stats()
+
+
+def test_blocking_method_runs_on_the_thread_pool(bridge):
+    bridge, registry, send = bridge
+    threads = []
+
+    @blocking
+    def slow(value):
+        threads.append(threading.current_thread())
+        time.sleep(0.05)
+        return value * 2
+
+    registry.expose("slow", slow)
+    messages = send([1, "slow", [21]], [2, "echo", ["fast"]])
+    # the reply of the blocking call comes later, on its own
+    assert messages == [[[2, True, "fast"]], [[1, True, 42]]]
+    assert threads[0].name.startswith("bridge")
+
+
+def test_result_that_is_not_json(bridge):
+    bridge, registry, send = bridge
+    registry.expose("object", lambda: object())
+    messages = send([1, "object", []], [2, "echo", [1]])
+    assert messages == [[[1, False, "result is not JSON serializable"], [2, True, 1]]]
+
+
+def test_invalid_batch_is_ignored(bridge, caplog):
+    bridge, registry, send = bridge
+    bridge.call("not json")
+    bridge.call(json.dumps([[1, "echo"]]))
+    assert "invalid batch" in caplog.text
+    assert send(replies=0) == []
+
+
+def test_removed_owner(bridge):
+    bridge, registry, send = bridge
+    registry.expose("plugin.method", lambda: 1, owner="plugin")
+    assert registry.names("plugin") == ["plugin.method"]
+    registry.removeOwner("plugin")
+    assert send([1, "plugin.method", []]) == [[[1, False, "no bridge method plugin.method"]]]
@@ -0,0 +1,278 @@
+import os
+import time
+
+import yaml
+import pytest
+
+from myapp import config as configmodule
+from myapp.config import (Configuration, FilterTrie, change_filter, registerChangeFilters,
+                          loadYaml, PLUGINS_LAYER, USER_LAYER, RUNTIME_LAYER)
+
+
+@pytest.fixture
+def configuration(tmp_path):
+    path = tmp_path / "myapp.yml"
+    path.write_text("plugins:\n  test:\n    enabled: true\n    options:\n      width: 10\n")
+    return Configuration(str(path))
+
+
+def test_value_in_a_higher_layer_hides_keys_below_it(configuration):
+    configuration.set("q", {"r": 1})
+    assert configuration.get("q.r") == 1
+
+    configuration.set("q", 5, layer=RUNTIME_LAYER)
+    assert configuration.get("q") == 5
+    assert configuration.get("q.r") is None
+
+    configuration.unset("q")
+    assert configuration.get("q.r") == 1
+
+
+def test_layers_are_merged(configuration):
+    configuration.set("plugins.test.options.height", 20, layer=PLUGINS_LAYER)
+    configuration.set("plugins.test.options.width", 30, layer=RUNTIME_LAYER)
+    assert configuration.get("plugins.test.options") == {"width": 30, "height": 20}
+
+
+def test_unset_removes_empty_parents(configuration, tmp_path):
+    configuration.set("a.b.c", 1)
+    configuration.set("a.d", 2)
+    configuration.unset("a.b.c", layer=USER_LAYER)
+    assert configuration.layer(USER_LAYER)["a"] == {"d": 2}
+
+    configuration.unset("a.d", layer=USER_LAYER)
+    assert "a" not in configuration.layer(USER_LAYER)
+    configuration.save()
+    with open(configuration.loadFrom) as f:
+        assert "a" not in yaml.safe_load(f)
+
+
+def test_unset_is_rolled_back(configuration):
+    configuration.set("a.b.c", 1)
+    with pytest.raises(RuntimeError):
+        with configuration.transaction():
+            configuration.unset("a.b.c", layer=USER_LAYER)
+            raise RuntimeError()
+    assert configuration.get("a.b.c") == 1
+
+
+def test_plugin_defaults(configuration):
+    changes = []
+    configuration.batchChanged.connect(changes.append)
+    configuration.setDefaults("test", {"options": {"width": 80, "height": 24}, "theme": "dark"})
+    configuration.setDefaults("other", {"enabled": False})
+
+    assert changes[0] == {"plugins.test.options.width": 80, "plugins.test.options.height": 24,
+                          "plugins.test.theme": "dark"}
+    # the user's file wins over the defaults of the plugin
+    assert configuration.get("plugins.test.options.width") == 10
+    assert configuration.get("plugins.test.options.height") == 24
+    assert configuration.get("plugins.other.enabled") is False
+    assert configuration.layer(USER_LAYER)["plugins"] == {
+        "test": {"enabled": True, "options": {"width": 10}}}
+
+
+def test_filter_trie_routes_by_prefix():
+    trie = FilterTrie()
+    trie.add("a", "on a")
+    trie.add("a.b", "on a.b")
+    trie.add("a.b.c", "on a.b.c")
+    trie.add("a.bc", "on a.bc")
+    trie.add("x", "on x")
+
+    assert trie.match("a.b.c") == ["on a", "on a.b", "on a.b.c"]
+    assert trie.match("a.b.d") == ["on a", "on a.b"]
+    assert trie.match("a.bc.d") == ["on a", "on a.bc"]
+    assert trie.match("b") == []
+
+    trie.remove("a.b", "on a.b")
+    trie.remove("not.added", "on a")
+    assert trie.match("a.b.c") == ["on a", "on a.b.c"]
+
+
+class Watcher:
+    def __init__(self, register=True):
+        self.changes = []
+        if register:
+            registerChangeFilters(self)
+
+    @change_filter("watched")
+    def _watchedChanged(self, key, value):
+        self.changes.append((key, value))
+
+
+class SubWatcher(Watcher):
+    pass
+
+
+def test_change_filter_methods_of_registered_instances(configuration):
+    watcher, subWatcher = Watcher(), SubWatcher()
+    unregistered = Watcher(register=False)
+    configuration.set("watched.option", 1)
+    configuration.set("watchedother", 2)
+
+    assert watcher.changes == [("watched.option", 1)]
+    assert subWatcher.changes == [("watched.option", 1)]
+    assert unregistered.changes == []
+
+
+def test_change_filter_functions(configuration):
+    changes = []
+
+    @change_filter("filtered", function=True)
+    def filtered(key, value):
+        changes.append((key, value))
+
+    configuration.set("filtered.a", 1)
+    configuration.set("other", 2)
+    assert changes == [("filtered.a", 1)]
+
+
+def test_nested_transaction_is_rolled_back(configuration):
+    configuration.set("a", 1)
+    changes = []
+    configuration.changed.connect(lambda key, value: changes.append(key))
+
+    with pytest.raises(RuntimeError):
+        with configuration.transaction():
+            configuration.set("a", 2)
+            with configuration.transaction():
+                configuration.set("b.c", 3)
+                configuration.unset("a", layer=USER_LAYER)
+                assert configuration.get("b.c") == 3 and configuration.get("a") is None
+                raise RuntimeError()
+
+    assert changes == []
+    assert configuration.get("a") == 1
+    assert configuration.get("b.c") is None
+    assert "b" not in configuration.layer(USER_LAYER)
+
+
+def test_nested_transaction_joins_the_outermost(configuration):
+    batches = []
+    configuration.batchChanged.connect(batches.append)
+    with configuration.transaction():
+        configuration.set("a", 1)
+        with configuration.transaction():
+            configuration.set("b", 2)
+        assert batches == []
+        configuration.set("a", 3)
+
+    assert batches == [{"a": 3, "b": 2}]
+
+
+@pytest.fixture
+def saves(configuration):
+    """Number of autosaves, counted when they're written."""
+    count = []
+    save = configuration._saveSnapshot
+
+    def counting():
+        save()
+        count.append(time.monotonic())
+
+    configuration._saveSnapshot = counting
+    yield count
+    configuration.setAutosave(False)
+
+
+def savedValue(configuration, key):
+    with open(configuration.loadFrom) as f:
+        return yaml.safe_load(f).get(key)
+
+
+def test_autosave_is_debounced(configuration, saves):
+    configuration.setAutosave(True, delay=0.1)
+    start = time.monotonic()
+    for i in range(5):
+        configuration.set("counter", i)
+        time.sleep(0.01)
+
+    deadline = time.monotonic() + 5
+    while not saves and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    assert len(saves) == 1
+    assert saves[0] - start >= 0.1
+    assert savedValue(configuration, "counter") == 4
+
+
+def test_pending_autosave_is_flushed(configuration, saves):
+    configuration.setAutosave(True, delay=60)
+    configuration.set("counter", 1)
+    assert saves == []
+
+    configuration.flush()
+    assert len(saves) == 1 and savedValue(configuration, "counter") == 1
+
+    # stopping the autosave, as on exit, writes what is pending
+    configuration.set("counter", 2)
+    configuration.setAutosave(False)
+    assert len(saves) == 2 and savedValue(configuration, "counter") == 2
+
+    configuration.flush()
+    assert len(saves) == 2
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Paths of the yaml files parsed, the in-memory cache starts empty."""
+    parsed = []
+    parse = configmodule.parseYaml
+
+    def counting(stream):
+        parsed.append(getattr(stream, "name", None))
+        return parse(stream)
+
+    monkeypatch.setattr(configmodule, "parseYaml", counting)
+    monkeypatch.setattr(configmodule, "_parsedFiles", {})
+    return parsed
+
+
+def writeYaml(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_cached_tree_is_loaded_without_parsing(tmp_path, parses):
+    path = writeYaml(tmp_path / "a.yml", "a: {b: 1}\n")
+    assert loadYaml(path) == {"a": {"b": 1}}
+    assert os.path.exists(configmodule._cachePath(path))
+
+    configmodule._parsedFiles.clear()
+    assert loadYaml(path) == {"a": {"b": 1}}
+    assert parses == [path]
+
+
+def test_stale_cache_is_parsed_again(tmp_path, parses):
+    path = writeYaml(tmp_path / "a.yml", "a: 1\n")
+    loadYaml(path)
+    configmodule._parsedFiles.clear()
+
+    writeYaml(tmp_path / "a.yml", "a: 22\n")
+    assert loadYaml(path) == {"a": 22}
+    assert parses == [path, path]
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: b"not a cache" + data,
+    lambda data: data[:len(configmodule.CACHE_MAGIC) + 4],
+    lambda data: data[:-3],
+    lambda data: data[:len(data) - 8] + b"\xff" * 8,
+])
+def test_corrupt_cache_falls_back_to_yaml(tmp_path, parses, corrupt):
+    path = writeYaml(tmp_path / "a.yml", "a: [1, 2, 3]\nb: {c: text}\n")
+    loadYaml(path)
+    configmodule._parsedFiles.clear()
+    cachePath = configmodule._cachePath(path)
+    with open(cachePath, "rb") as f:
+        data = f.read()
+    with open(cachePath, "wb") as f:
+        f.write(corrupt(data))
+
+    assert loadYaml(path) == {"a": [1, 2, 3], "b": {"c": "text"}}
+    assert parses == [path, path]
+    # the cache was written again
+    configmodule._parsedFiles.clear()
+    assert loadYaml(path) == {"a": [1, 2, 3], "b": {"c": "text"}}
+    assert len(parses) == 2
@@ -0,0 +1,51 @@
+import types
+
+from myapp.hooks import HookTable
+from myapp.hookprofiler import HookProfiler, CPU_SAMPLE
+
+
+def makeModule(loadFinished):
+    module = types.ModuleType("myapp.plugins.profiled")
+    module.loadFinished = loadFinished
+    return module
+
+
+def test_dispatch_records_every_call():
+    table = HookTable(profiler=HookProfiler())
+    table.register("profiled", makeModule(lambda page: None))
+    for _ in range(CPU_SAMPLE * 2):
+        table.dispatch("loadFinished", None)
+
+    stats = table.profiler.stats("profiled")["profiled"]["loadFinished"]
+    assert stats["calls"] == CPU_SAMPLE * 2
+    assert table.profiler.hookStats("profiled", "loadFinished").cpuCalls == 2
+
+
+def test_failing_hook_is_recorded():
+    def fail(page):
+        raise ValueError(page)
+
+    table = HookTable(profiler=HookProfiler())
+    table.register("profiled", makeModule(fail))
+    assert table.dispatch("loadFinished", None) == []
+    assert table.profiler.stats()["profiled"]["loadFinished"]["calls"] == 1
+
+
+def test_calls_over_budget():
+    profiler = HookProfiler(budget=10, disableAfter=2)
+    profiler.record("profiled", "loadFinished", 0.020)
+    profiler.record("profiled", "loadFinished", 0.001)
+    profiler.record("profiled", "loadFinished", 0.020)
+    stats = profiler.hookStats("profiled", "loadFinished")
+    assert stats.overBudget == 2 and stats.consecutive == 1
+
+
+def test_reset_keeps_the_statistics_of_the_table():
+    table = HookTable(profiler=HookProfiler())
+    table.register("profiled", makeModule(lambda page: None))
+    table.dispatch("loadFinished", None)
+    table.profiler.reset("profiled")
+    assert table.profiler.stats() == {"profiled": {}}
+
+    table.dispatch("loadFinished", None)
+    assert table.profiler.stats()["profiled"]["loadFinished"]["calls"] == 1
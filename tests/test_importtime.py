@@ -0,0 +1,42 @@
+import os
+import sys
+import subprocess
+
+from benchmarks.importtime import measureImport
+from benchmarks.bench_import import CORE, LAZY
+
+# milliseconds, generous enough for a loaded machine, the core modules
+# import in about 110 ms
+CORE_BUDGET = 500
+APPLICATION_BUDGET = 1500
+
+
+def assertLazy(records):
+    imported = {record.name for record in records}
+    assert not imported & set(LAZY)
+    assert "yaml._yaml" not in imported
+
+
+def test_core_import():
+    records, total, error = measureImport(CORE, repeat=3)
+    assert not error
+    assert total / 1000 < CORE_BUDGET
+    assertLazy(records)
+
+
+def test_application_import():
+    records, total, error = measureImport("myapp.MyApplication", repeat=3)
+    assert not error
+    assert total / 1000 < APPLICATION_BUDGET
+    assertLazy(records)
+
+
+def test_application_import_without_web_engine():
+    """QtWebEngine and the modules using it are imported when the application is created."""
+    code = ("import sys, myapp.MyApplication; "
+            "print(sorted(m for m in sys.modules if 'QtWebEngine' in m))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True,
+                             text=True, timeout=60)
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip() == "[]"
@@ -0,0 +1,71 @@
+import logging
+
+import pytest
+
+from myapp import log
+from myapp.log import RateLimitFilter
+
+
+def makeRecord(name="myapp.test", msg="plugin %s failed", args=("test",), lineno=1):
+    return logging.LogRecord(name, logging.ERROR, __file__, lineno, msg, args, None)
+
+
+def test_records_of_different_loggers_are_not_limited_together():
+    rateLimit = RateLimitFilter(burst=2)
+    passed = [rateLimit.filter(makeRecord(f"myapp.plugins.p{i}")) for i in range(8)]
+    assert all(passed)
+
+
+def test_records_of_different_messages_are_not_limited_together():
+    rateLimit = RateLimitFilter(burst=2)
+    passed = [rateLimit.filter(makeRecord(msg=f"message {i}")) for i in range(8)]
+    assert all(passed)
+
+
+def test_flushed_summary_reports_dropped_records():
+    rateLimit = RateLimitFilter(burst=2)
+    passed = [rateLimit.filter(makeRecord(args=(i,))) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert not rateLimit.pending
+
+    summaries = rateLimit.summaries(flush=True)
+    assert len(summaries) == 1
+    message = summaries[0].getMessage()
+    assert message == "3 similar messages suppressed, the last one: plugin 4 failed"
+    assert rateLimit.summaries(flush=True) == []
+
+
+def test_pruned_windows_are_summarized():
+    rateLimit = RateLimitFilter(burst=1, interval=0.0)
+    rateLimit.filter(makeRecord())
+    rateLimit.interval = 60.0
+    rateLimit.filter(makeRecord())
+    assert not rateLimit.filter(makeRecord())
+
+    rateLimit.interval = 0.0
+    rateLimit._prune(float("inf"))
+    assert rateLimit.pending
+    assert len(rateLimit.summaries()) == 1
+
+
+@pytest.fixture
+def restoreLogging():
+    yield
+    log.setup({"stream": "none"})
+    log.shutdown()
+    logging.getLogger(log.ROOT).propagate = True
+
+
+def test_shutdown_writes_the_summaries(capsys, restoreLogging):
+    log.setup({"format": "%(name)s %(message)s", "rateLimit": {"burst": 2}})
+    logger = logging.getLogger("myapp.test")
+    for i in range(5):
+        logger.warning("function %s not removed", i)
+    log.shutdown()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [
+        "myapp.test function 0 not removed",
+        "myapp.test function 1 not removed",
+        "myapp.test 3 similar messages suppressed, the last one: function 4 not removed",
+    ]
@@ -0,0 +1,164 @@
+import os
+import sys
+import marshal
+import zipfile
+import importlib
+import importlib.util
+
+import pytest
+
+from myapp.pluginarchive import (ArchiveFinder, closeArchive, pathExists, readFile,
+                                 readManifest, splitArchivePath)
+from myapp.pluginindex import PluginIndex
+from myapp.pluginscheduler import preparePlugin, execPlugin, unloadPluginModules
+
+NAME = "zipped"
+PACKAGE = f"myapp.plugins.{NAME}"
+
+MANIFEST = """[plugin]
+Name=zipped
+Module=zipped.py
+Resources=["data/style.css"]
+"""
+
+MAIN = """
+from . import helper
+from .sub import nested
+
+value = helper.value + nested.value
+"""
+
+
+def pyc(source: str, magic: bytes = None) -> bytes:
+    """A .pyc file of source, compiled for this interpreter unless magic is given."""
+    header = (magic or importlib.util.MAGIC_NUMBER) + b"\0" * 12
+    return header + marshal.dumps(compile(source, "<pyc>", "exec"))
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Factory of the zipped plugin archive, {member: content} are added to it."""
+    paths = []
+
+    def create(extra=None):
+        members = {
+            "zipped.plugin": MANIFEST,
+            "__init__.py": "",
+            "zipped.py": MAIN,
+            "helper.py": "value = 1\n",
+            "sub/__init__.py": "",
+            "sub/nested.py": "value = 10\n",
+            "data/style.css": "a{b:c}",
+        }
+        members.update(extra or {})
+        path = str(tmp_path / "zipped.zip")
+        with zipfile.ZipFile(path, "w") as f:
+            for member, content in members.items():
+                f.writestr(member, content)
+        paths.append(path)
+        return path
+
+    yield create
+    unloadPluginModules(NAME)
+    for path in paths:
+        closeArchive(path)
+
+
+def load(path):
+    info = PluginIndex().update([os.path.dirname(path)])[0]
+    return info, execPlugin(info, *preparePlugin(info))
+
+
+def test_manifest(archive):
+    path = archive()
+    name, options = readManifest(path)
+    assert name == "zipped.plugin"
+    assert options["name"] == NAME and options["module"] == "zipped.py"
+
+    info = PluginIndex().update([os.path.dirname(path)])[0]
+    assert info.name() == NAME and info.archive() == path
+    assert info.modulePath() == os.path.join(path, "zipped.py")
+    assert info.resources() == [os.path.join(path, "data", "style.css")]
+
+
+def test_not_a_plugin_archive(tmp_path):
+    path = str(tmp_path / "other.zip")
+    with zipfile.ZipFile(path, "w") as f:
+        f.writestr("readme.txt", "")
+    assert readManifest(path) == (None, None)
+    assert PluginIndex().update([str(tmp_path)]) == []
+
+
+def test_package_and_submodules_are_imported(archive):
+    path = archive()
+    info, module = load(path)
+
+    assert module.value == 11
+    assert module.__name__ == PACKAGE + ".zipped"
+    assert sys.modules[PACKAGE + ".helper"].__file__ == os.path.join(path, "helper.py")
+    assert PACKAGE + ".sub.nested" in sys.modules
+    assert isinstance(sys.path_importer_cache[path], ArchiveFinder)
+    assert isinstance(sys.path_importer_cache[os.path.join(path, "sub")], ArchiveFinder)
+    # imported on demand, after the plugin was loaded
+    assert importlib.import_module(PACKAGE + ".sub").__path__ == [os.path.join(path, "sub")]
+
+
+def test_resources(archive):
+    path = archive()
+    info, module = load(path)
+    resource = os.path.join(path, "data", "style.css")
+
+    assert splitArchivePath(resource) == (path, "data/style.css")
+    assert pathExists(resource) and not pathExists(os.path.join(path, "missing.css"))
+    assert readFile(resource) == b"a{b:c}"
+    assert readFile(os.path.join(path, "missing.css")) is None
+    assert module.__loader__.get_data(resource) == b"a{b:c}"
+    with pytest.raises(OSError):
+        module.__loader__.get_data(__file__)
+
+
+def test_unload_forgets_modules_and_finders(archive):
+    path = archive()
+    load(path)
+    assert path in sys.path_importer_cache
+
+    modules = unloadPluginModules(NAME)
+    assert {module.__name__ for module in modules} >= {PACKAGE, PACKAGE + ".zipped",
+                                                        PACKAGE + ".sub.nested"}
+    assert not [name for name in sys.modules if name.startswith(PACKAGE)]
+    assert path not in sys.path_importer_cache
+    assert os.path.join(path, "sub") not in sys.path_importer_cache
+
+    # loaded again from the archive
+    info, module = load(path)
+    assert module.value == 11
+
+
+def test_bytecode_is_used(archive):
+    path = archive({"helper.py": "value = 1\n", "helper.pyc": pyc("value = 2\n")})
+    info, module = load(path)
+    assert module.value == 12
+
+
+@pytest.mark.parametrize("data", [
+    pyc("value = 2\n", magic=b"\x00\x00\r\n"),
+    importlib.util.MAGIC_NUMBER + b"\0" * 4,
+    importlib.util.MAGIC_NUMBER + b"\0" * 12 + b"not marshal data",
+], ids=["other version", "truncated", "corrupt"])
+def test_incompatible_bytecode_is_not_run(archive, data):
+    path = archive({"helper.pyc": data})
+    info, module = load(path)
+    assert module.value == 11
+
+
+def test_incompatible_bytecode_without_source(archive):
+    path = archive({"helper.pyc": pyc("value = 2\n", magic=b"\x00\x00\r\n")})
+    with zipfile.ZipFile(path) as f:
+        members = {name: f.read(name) for name in f.namelist() if name != "helper.py"}
+    with zipfile.ZipFile(path, "w") as f:
+        for member, content in members.items():
+            f.writestr(member, content)
+    closeArchive(path)
+
+    with pytest.raises(ImportError, match="no source or compatible bytecode"):
+        load(path)
@@ -0,0 +1,104 @@
+import os
+import configparser
+
+import pytest
+
+from myapp import pluginindex
+from myapp.pluginindex import PluginIndex, PluginInfo
+
+
+def writeManifest(directory, name, hooks="beforeLoad"):
+    path = os.path.join(directory, name + ".plugin")
+    with open(path, "w") as f:
+        f.write("[plugin]\nName={}\nModule={}\nHooks={}\n".format(name, name, hooks))
+    with open(os.path.join(directory, name + ".py"), "w") as f:
+        f.write("")
+    return path
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Paths of the manifests parsed with configparser."""
+    paths = []
+    read = configparser.ConfigParser.read
+
+    def counting(self, filenames, encoding=None):
+        paths.append(filenames)
+        return read(self, filenames, encoding)
+
+    monkeypatch.setattr(configparser.ConfigParser, "read", counting)
+    return paths
+
+
+@pytest.fixture
+def plugins(tmp_path):
+    directory = str(tmp_path / "plugins")
+    os.mkdir(directory)
+    writeManifest(directory, "one")
+    writeManifest(directory, "two")
+    return directory, str(tmp_path / "index.json")
+
+
+def test_unchanged_index_is_reused(plugins, reads):
+    directory, indexPath = plugins
+    index = PluginIndex(indexPath)
+    assert sorted(info.name() for info in index.update([directory])) == ["one", "two"]
+    index.save()
+    assert len(reads) == 2
+
+    reads.clear()
+    index = PluginIndex(indexPath)
+    infos = index.update([directory])
+    assert reads == []
+    assert index.find("one").hooks() == ["beforeLoad"]
+    assert len(infos) == 2
+
+
+def test_changed_manifest_is_parsed_again(plugins, reads):
+    directory, indexPath = plugins
+    index = PluginIndex(indexPath)
+    index.update([directory])
+    index.save()
+
+    path = writeManifest(directory, "one", hooks="loadFinished")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000))
+    reads.clear()
+    index = PluginIndex(indexPath)
+    index.update([directory])
+    assert reads == [path]
+    assert index.find("one").hooks() == ["loadFinished"]
+
+
+def test_other_index_version_is_rebuilt(plugins, reads, monkeypatch):
+    directory, indexPath = plugins
+    index = PluginIndex(indexPath)
+    index.update([directory])
+    index.save()
+
+    monkeypatch.setattr(pluginindex, "INDEX_VERSION", pluginindex.INDEX_VERSION + 1)
+    reads.clear()
+    index = PluginIndex(indexPath)
+    index.update([directory])
+    assert len(reads) == 2
+
+
+def test_manifest_without_plugin_section(plugins, reads):
+    directory, indexPath = plugins
+    with open(os.path.join(directory, "other.plugin"), "w") as f:
+        f.write("[other]\nName=other\n")
+    index = PluginIndex(indexPath)
+    index.update([directory])
+    index.save()
+
+    reads.clear()
+    infos = PluginIndex(indexPath).update([directory])
+    assert reads == []
+    other = [info for info in infos if info.filepath.endswith("other.plugin")][0]
+    assert not other.has_section("plugin") and not other.isValid()
+
+
+def test_without_section_is_not_read(reads):
+    info = PluginInfo.withoutSection("/nonexistent/a.plugin")
+    assert reads == []
+    assert info.name() is None and info.options() == {}
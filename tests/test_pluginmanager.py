@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+
+import pytest
+
+from myapp.config import Configuration
+from myapp.pluginscheduler import unloadPluginModules
+
+PLUGIN_MODULE = """
+activations = 0
+calls = []
+
+
+def activate():
+    global activations
+    activations += 1
+
+
+def beforeLoad(channel, page):
+    calls.append("beforeLoad")
+
+
+def loadFinished(page):
+    calls.append("loadFinished")
+"""
+
+
+def makePlugin(directory, name, **options):
+    os.makedirs(os.path.join(directory, name))
+    manifest = {"Name": name, "Module": name + ".py", "Hooks": "beforeLoad"}
+    manifest.update(options)
+    with open(os.path.join(directory, name, name + ".plugin"), "w") as f:
+        f.write("[plugin]\n")
+        for key, value in manifest.items():
+            f.write("{}={}\n".format(key, value))
+    with open(os.path.join(directory, name, name + ".py"), "w") as f:
+        f.write(PLUGIN_MODULE)
+
+
+def pluginModule(name):
+    return sys.modules.get("myapp.plugins.{0}.{0}".format(name))
+
+
+@pytest.fixture
+def plugins(application, tmp_path):
+    """(plugin directory, PluginManager factory), the plugins are enabled."""
+    from myapp.PluginManager import PluginManager
+
+    directory = str(tmp_path / "plugins")
+    os.mkdir(directory)
+    names = []
+
+    def create(*plugins, settings="", **kwargs):
+        with open(str(tmp_path / "myapp.yml"), "w") as f:
+            f.write(settings)
+            f.write("plugins:\n")
+            for name, options in plugins:
+                makePlugin(directory, name, **options)
+                f.write("  {}:\n    enabled: true\n".format(name))
+                names.append(name)
+        Configuration(str(tmp_path / "myapp.yml"))
+        return PluginManager([directory], **kwargs)
+
+    yield directory, create
+    for name in names:
+        unloadPluginModules(name)
+
+
+def test_plugins_are_activated_at_startup_by_default(plugins):
+    directory, create = plugins
+    manager = create(("eager", {}))
+    assert not manager.isPending("eager")
+    assert pluginModule("eager").activations == 1
+
+
+def test_lazy_plugin_is_pending_until_its_event(plugins):
+    directory, create = plugins
+    manager = create(("pending", {}), lazy=True)
+    activated = []
+    manager.pluginActivated.connect(activated.append)
+    assert manager.isPending("pending")
+    assert pluginModule("pending") is None
+
+    manager.loadFinished.emit(None)
+    assert manager.isPending("pending") and pluginModule("pending") is None
+
+    manager.beforeLoad.emit(None, None)
+    assert not manager.isPending("pending")
+    assert activated == ["pending"]
+    module = pluginModule("pending")
+    assert module.activations == 1
+    # the event activating the plugin is delivered to it too
+    assert module.calls == ["beforeLoad"]
+
+    manager.beforeLoad.emit(None, None)
+    assert module.activations == 1 and module.calls == ["beforeLoad"] * 2
+
+
+def test_activate_on_overrides_hooks(plugins):
+    directory, create = plugins
+    manager = create(("activateon", {"Hooks": "beforeLoad, loadFinished",
+                                     "ActivateOn": "loadFinished"}), lazy=True)
+    manager.beforeLoad.emit(None, None)
+    assert manager.isPending("activateon") and pluginModule("activateon") is None
+
+    manager.loadFinished.emit(None)
+    assert not manager.isPending("activateon")
+    assert pluginModule("activateon").calls == ["loadFinished"]
+
+
+def test_disabled_pending_plugin_is_never_imported(plugins):
+    directory, create = plugins
+    manager = create(("disabled", {}), lazy=True)
+    assert manager.isPending("disabled")
+
+    manager.disablePlugin("disabled")
+    assert not manager.isPending("disabled")
+    manager.beforeLoad.emit(None, None)
+    assert pluginModule("disabled") is None
+
+    manager.enablePlugin("disabled")
+    assert manager.isPending("disabled")
+    manager.beforeLoad.emit(None, None)
+    assert pluginModule("disabled").activations == 1
+
+
+def test_changed_plugin_is_reloaded_once(plugins, application):
+    directory, create = plugins
+    manager = create(("reloaded", {}),
+                     settings="pluginManager:\n  hotReload: true\n  reloadDelay: 50\n")
+    reloaded = []
+    manager.pluginReloaded.connect(reloaded.append)
+
+    path = os.path.join(directory, "reloaded", "reloaded.py")
+    for i in range(3):
+        with open(path, "a") as f:
+            f.write("\nsaved = {}\n".format(i))
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        application.processEvents()
+        time.sleep(0.005)
+
+    assert reloaded == ["reloaded"]
+    assert pluginModule("reloaded").saved == 2
+    assert pluginModule("reloaded").activations == 1
@@ -0,0 +1,68 @@
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+from myapp.utils import disconnectModule
+from myapp.pluginindex import PluginIndex
+from myapp.pluginmemory import PluginMemory
+from myapp.pluginscheduler import preparePlugin, execPlugin, unloadPluginModules
+
+from benchmarks.bench_unload import NAME, Host, makePlugin
+
+CYCLES = 20
+PACKAGE = f"myapp.plugins.{NAME}"
+
+
+@pytest.fixture
+def plugin(tmp_path):
+    makePlugin(str(tmp_path))
+    info = PluginIndex().update([str(tmp_path)])[0]
+    memory = PluginMemory()
+    memory.start()
+    memory.watch(NAME, os.path.join(str(tmp_path), NAME))
+    host = Host()
+
+    def load():
+        module = execPlugin(info, *preparePlugin(info))
+        module.beforeLoad(host)
+        host.changed.emit(NAME)
+
+    def unload(disconnect=True):
+        memory.unloaded(NAME, unloadPluginModules(NAME))
+        if disconnect:
+            disconnectModule(PACKAGE)
+
+    yield memory, load, unload
+    unload()
+    memory.stop()
+
+
+def test_unloaded_plugin_returns_to_baseline(plugin):
+    memory, load, unload = plugin
+    load()
+    loaded = memory.usage(NAME)[NAME]
+    unload()
+    assert memory.leaked() == {}
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    for _ in range(CYCLES):
+        load()
+        unload()
+
+    assert memory.leaked() == {}
+    assert not [name for name in sys.modules if name.startswith(PACKAGE)]
+    assert memory.usage(NAME)[NAME] < loaded / 10
+    assert tracemalloc.get_traced_memory()[0] - baseline < loaded / 4
+
+
+def test_connected_subscriber_is_reported(plugin):
+    memory, load, unload = plugin
+    load()
+    unload(disconnect=False)
+    # the subscriber keeps the globals of the plugin module alive
+    assert PACKAGE + "." + NAME in memory.leaked()[NAME]
+
+    disconnectModule(PACKAGE)
+    assert memory.leaked() == {}
@@ -0,0 +1,113 @@
+import os
+import time
+import signal
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore", exc_type=ImportError)
+
+from myapp import asyncloop, pluginprocess
+from myapp.bridge import BridgeRegistry
+from myapp.pluginindex import PluginIndex
+from myapp.pluginprocess import WorkerPool, WorkerCrashed
+
+NAME = "isolated"
+
+MANIFEST = """[plugin]
+Name=isolated
+Module=isolated.py
+Isolated=true
+"""
+
+MODULE = """
+import os
+import time
+
+
+def pid():
+    return os.getpid()
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+
+
+def fail():
+    raise ValueError("broken")
+"""
+
+
+@pytest.fixture
+def pool(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(pluginprocess, "MAX_RESTARTS", 1)
+    os.makedirs(str(tmp_path / NAME))
+    (tmp_path / NAME / "isolated.plugin").write_text(MANIFEST)
+    (tmp_path / NAME / "isolated.py").write_text(MODULE)
+    info = PluginIndex().update([str(tmp_path)])[0]
+    pool = WorkerPool(1, methods=BridgeRegistry())
+    yield pool, info
+    pool.shutdown()
+
+
+def call(pool, func, *args):
+    """Call func of the plugin and wait for the reply, returns the future."""
+    future = pool.call(NAME, ("function", NAME, func), args)
+    asyncloop.driver().wait([future], 20)
+    return future
+
+
+def waitUntil(qapp, condition, timeout=20):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def kill(worker):
+    os.kill(worker.pid, signal.SIGKILL)
+
+
+def test_calls_and_errors(pool):
+    pool, info = pool
+    pool.load(info)
+    worker = pool.workers()[0]
+
+    assert call(pool, "pid").result() == worker.pid
+    error = call(pool, "fail").exception()
+    assert isinstance(error, RuntimeError) and "ValueError: broken" in str(error)
+    # the worker still serves calls
+    assert call(pool, "pid").result() == worker.pid
+
+
+def test_crashed_worker_is_restarted_then_given_up(qapp, pool):
+    pool, info = pool
+    proxy = pool.load(info)
+    assert repr(proxy) == "<PluginProxy isolated>"
+    first = pool.workers()[0]
+
+    # killed in the middle of a call
+    future = pool.call(NAME, ("function", NAME, "sleep"), (30,))
+    kill(first)
+    asyncloop.driver().wait([future], 20)
+    assert isinstance(future.exception(), WorkerCrashed)
+
+    # restarted with its plugin loaded again
+    assert waitUntil(qapp, lambda: pool.workers() and pool.workers()[0] is not first
+                     and NAME in pool.workers()[0].plugins)
+    second = pool.workers()[0]
+    assert call(pool, "pid").result() == second.pid != first.pid
+
+    # over MAX_RESTARTS in RESTART_WINDOW, the plugin is failed instead
+    kill(second)
+    assert waitUntil(qapp, lambda: NAME in pool.failed())
+    assert pool.workers() == []
+    waitUntil(qapp, lambda: False, timeout=0.5)
+    assert pool.workers() == []
+    error = call(pool, "pid").exception()
+    assert isinstance(error, RuntimeError) and "crashed 2 times" in str(error)
+
+    # loading it again starts a new worker
+    pool.load(info)
+    assert pool.failed() == {}
+    assert call(pool, "pid").result() == pool.workers()[0].pid
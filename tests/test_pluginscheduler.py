@@ -0,0 +1,105 @@
+import os
+import threading
+
+import pytest
+
+from myapp.pluginindex import PluginIndex
+from myapp.pluginscheduler import PluginScheduler, criticalPath, unloadPluginModules
+
+PLUGIN_MODULE = """
+import threading
+
+thread = threading.current_thread()
+"""
+
+
+@pytest.fixture
+def plugins(tmp_path):
+    """Factory of plugins {name: manifest options}, returns their manifests."""
+    directory = str(tmp_path)
+    names = []
+
+    def create(plugins):
+        for name, options in plugins.items():
+            os.makedirs(os.path.join(directory, name))
+            with open(os.path.join(directory, name, name + ".plugin"), "w") as f:
+                f.write("[plugin]\nName={0}\nModule={0}.py\n".format(name))
+                for key, value in options.items():
+                    f.write("{}={}\n".format(key, value))
+            with open(os.path.join(directory, name, name + ".py"), "w") as f:
+                f.write(PLUGIN_MODULE)
+            names.append(name)
+        return PluginIndex().update([directory])
+
+    yield create
+    for name in names:
+        unloadPluginModules(name)
+
+
+def run(scheduler):
+    activated = []
+    modules = scheduler.run(lambda name, module: activated.append(name))
+    return activated, modules
+
+
+def test_requirements_are_loaded_first(plugins):
+    infos = plugins({"schedc": {"Requires": "scheda, schedb"},
+                     "schedb": {"Requires": "scheda"},
+                     "scheda": {}})
+    scheduler = PluginScheduler(infos, workers=4)
+    activated, modules = run(scheduler)
+
+    assert activated == ["scheda", "schedb", "schedc"]
+    assert sorted(modules) == activated
+    assert scheduler.errors == {}
+    assert criticalPath(scheduler.timings) == ["scheda", "schedb", "schedc"]
+
+
+def test_dependency_cycle_is_reported(plugins):
+    infos = plugins({"cyclea": {"Requires": "cycleb"},
+                     "cycleb": {"Requires": "cyclea"},
+                     "cyclec": {"Requires": "cyclea"},
+                     "cycled": {}})
+    scheduler = PluginScheduler(infos)
+    activated, modules = run(scheduler)
+
+    assert activated == ["cycled"]
+    assert scheduler.errors["cyclea"] == "dependency cycle cyclea -> cycleb -> cyclea"
+    assert scheduler.errors["cycleb"] == "dependency cycle cycleb -> cyclea -> cycleb"
+    assert scheduler.errors["cyclec"] == "depends on a dependency cycle"
+    assert set(scheduler.timings) == {"cycled"}
+
+
+def test_missing_requirement_is_reported(plugins):
+    infos = plugins({"missinga": {"Requires": "notinstalled"},
+                     "missingb": {"Requires": "missinga"},
+                     "missingc": {"Requires": "alreadyloaded"}})
+    scheduler = PluginScheduler(infos, available=["alreadyloaded"])
+    activated, modules = run(scheduler)
+
+    assert activated == ["missingc"]
+    assert scheduler.errors == {
+        "missinga": "requires notinstalled which is not installed",
+        "missingb": "requires missinga which can't be loaded",
+    }
+
+
+def test_failing_import_skips_dependents(plugins, tmp_path):
+    infos = plugins({"brokena": {}, "brokenb": {"Requires": "brokena"}})
+    with open(str(tmp_path / "brokena" / "brokena.py"), "w") as f:
+        f.write("raise ImportError('broken')\n")
+    scheduler = PluginScheduler(infos)
+    activated, modules = run(scheduler)
+
+    assert activated == []
+    assert scheduler.errors == {"brokena": "broken",
+                                "brokenb": "requires brokena which failed to load"}
+
+
+def test_threaded_import_is_opt_in(plugins):
+    infos = plugins({"mainthread": {}, "poolthread": {"ThreadedImport": "true"}})
+    activated, modules = run(PluginScheduler(infos, workers=2))
+
+    assert sorted(activated) == ["mainthread", "poolthread"]
+    assert modules["mainthread"].thread is threading.current_thread()
+    assert modules["poolthread"].thread is not threading.current_thread()
@@ -0,0 +1,106 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore", exc_type=ImportError)
+
+from myapp.pluginwatcher import PluginWatcher
+
+DELAY = 100
+
+
+@pytest.fixture
+def watcher(qapp):
+    """(watcher, wait) where wait() processes events until the changes were
+    reported and returns the plugin names reported since the last call."""
+    watcher = PluginWatcher(delay=DELAY)
+    reported = []
+    watcher.pluginChanged.connect(reported.append)
+
+    def wait(timeout=2.0):
+        deadline = time.monotonic() + timeout
+        # the debounce timer only starts with the first notification
+        while time.monotonic() < deadline and (watcher._timer.isActive() or not reported):
+            qapp.processEvents()
+            time.sleep(0.005)
+        names = list(reported)
+        reported.clear()
+        return names
+
+    yield watcher, wait
+    watcher.deleteLater()
+
+
+def touch(path, content):
+    with open(path, "a") as f:
+        f.write(content)
+
+
+def test_changes_are_reported_once_after_the_delay(watcher, tmp_path):
+    watcher, wait = watcher
+    root = tmp_path / "plugin"
+    root.mkdir()
+    module = root / "plugin.py"
+    module.write_text("a = 1\n")
+    watcher.watchPlugin("plugin", str(root))
+
+    # an editor saving in several steps
+    start = time.monotonic()
+    for i in range(3):
+        touch(str(module), f"b{i} = 2\n")
+        time.sleep(0.01)
+    assert wait() == ["plugin"]
+    assert time.monotonic() - start >= DELAY / 1000
+
+    # nothing else is pending
+    assert wait(timeout=DELAY * 3 / 1000) == []
+
+
+def test_plugins_sharing_a_directory(watcher, tmp_path):
+    watcher, wait = watcher
+    root = tmp_path / "plugins"
+    root.mkdir()
+    (root / "a.py").write_text("")
+    (root / "b.py").write_text("")
+    watcher.watchPlugin("a", str(root))
+    watcher.watchPlugin("b", str(root))
+    assert watcher.watched() == {str(root): {"a", "b"}}
+
+    # the plugin a file belongs to can't be told, both are reloaded
+    touch(str(root / "a.py"), "x = 1\n")
+    assert sorted(wait()) == ["a", "b"]
+
+    # b is still watched after a is removed
+    watcher.unwatchPlugin("a")
+    assert watcher.watched() == {str(root): {"b"}}
+    touch(str(root / "b.py"), "y = 1\n")
+    assert wait() == ["b"]
+
+    watcher.unwatchPlugin("b")
+    assert watcher.watched() == {}
+
+
+def test_moved_plugin(watcher, tmp_path):
+    watcher, wait = watcher
+    for directory in ("old", "new"):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "plugin.py").write_text("")
+    watcher.watchPlugin("plugin", str(tmp_path / "old"))
+    watcher.watchPlugin("plugin", str(tmp_path / "new"))
+    assert watcher.watched() == {str(tmp_path / "new"): {"plugin"}}
+
+    touch(str(tmp_path / "old" / "plugin.py"), "x = 1\n")
+    assert wait(timeout=DELAY * 3 / 1000) == []
+    touch(str(tmp_path / "new" / "plugin.py"), "x = 1\n")
+    assert wait() == ["plugin"]
+
+
+def test_new_plugin_directory_entry(watcher, tmp_path):
+    watcher, wait = watcher
+    added = []
+    watcher.pluginsAdded.connect(lambda: added.append(True))
+    watcher.watchDirectory(str(tmp_path))
+    os.mkdir(str(tmp_path / "plugin"))
+    wait(timeout=DELAY * 3 / 1000)
+    assert added == [True]
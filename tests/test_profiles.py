@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+
+from myapp.profiles import DEFAULT_PROFILE, ProfileManager, configureProfile
+
+
+class Profile:
+    """Records the setters configureProfile calls."""
+
+    def __init__(self):
+        self.calls = {}
+
+    def storageName(self):
+        return "test"
+
+    def __getattr__(self, name):
+        if not name.startswith("set"):
+            raise AttributeError(name)
+        return lambda value: self.calls.__setitem__(name, value)
+
+
+def test_options_are_mapped():
+    profile = Profile()
+    configureProfile(profile, {
+        "storagePath": "storage",
+        "cachePath": "/var/cache/myapp",
+        "cacheType": "disk",
+        "cacheSize": "1048576",
+        "cookies": "session",
+        "userAgent": "myapp/1.0",
+    }, basePath="/home/user")
+
+    assert profile.calls == {
+        "setPersistentStoragePath": os.path.join("/home/user", "storage"),
+        "setCachePath": "/var/cache/myapp",
+        "setHttpCacheType": QWebEngineProfile.DiskHttpCache,
+        "setHttpCacheMaximumSize": 1048576,
+        "setPersistentCookiesPolicy": QWebEngineProfile.NoPersistentCookies,
+        "setHttpUserAgent": "myapp/1.0",
+    }
+
+
+@pytest.mark.parametrize("options, calls", [
+    ({"cacheType": "memory"}, {"setHttpCacheType": QWebEngineProfile.MemoryHttpCache}),
+    ({"cacheType": "none"}, {"setHttpCacheType": QWebEngineProfile.NoCache}),
+    ({"cookies": "persistent"},
+     {"setPersistentCookiesPolicy": QWebEngineProfile.AllowPersistentCookies}),
+    ({"cookies": "force"}, {"setPersistentCookiesPolicy": QWebEngineProfile.ForcePersistentCookies}),
+    ({"cacheSize": 0}, {"setHttpCacheMaximumSize": 0}),
+    # relative paths are kept without a base path
+    ({"storagePath": "storage"}, {"setPersistentStoragePath": "storage"}),
+    # empty values are left to Qt
+    ({"storagePath": "", "cachePath": None, "userAgent": ""}, {}),
+])
+def test_single_option(options, calls):
+    profile = Profile()
+    configureProfile(profile, options)
+    assert profile.calls == calls
+
+
+def test_unknown_values_are_ignored(caplog):
+    profile = Profile()
+    configureProfile(profile, {"cacheType": "cloud", "cookies": "never"})
+    assert profile.calls == {}
+    assert "unknown cacheType cloud for profile test" in caplog.text
+    assert "unknown cookies policy never for profile test" in caplog.text
+
+
+def test_manager_creates_profiles_once(application, tmp_path):
+    manager = ProfileManager({
+        "private": {"offTheRecord": True, "userAgent": "private"},
+        "work": {"storagePath": "work"},
+    }, basePath=str(tmp_path), parent=application)
+    created = []
+    manager.profileCreated.connect(lambda name, profile: created.append(name))
+
+    assert manager.names() == [DEFAULT_PROFILE, "private", "work"]
+    assert manager.profile() is QWebEngineProfile.defaultProfile()
+
+    private = manager.profile("private")
+    assert private.isOffTheRecord() and private.httpUserAgent() == "private"
+    work = manager.profile("work")
+    assert work.storageName() == "work"
+    assert work.persistentStoragePath() == str(tmp_path / "work")
+
+    assert manager.profile("private") is private
+    # unknown names use the default profile
+    assert manager.profile("missing") is QWebEngineProfile.defaultProfile()
+    assert created == [DEFAULT_PROFILE, "private", "work"]
@@ -0,0 +1,49 @@
+import os
+
+from myapp.resourcecache import ResourceCache
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_small_files_are_cached_in_memory(tmp_path):
+    path = str(tmp_path / "a.css")
+    write(path, b"a{b:c}")
+    cache = ResourceCache(mmapThreshold=1024)
+
+    resource = cache.get(path)
+    assert resource.data == b"a{b:c}" and resource.mapped is None
+    assert cache.get(path) is resource
+    assert cache.hits == 1 and cache.currentBytes == 6
+
+
+def test_large_files_keep_their_mapping(tmp_path):
+    paths = [str(tmp_path / "big{}.bin".format(i)) for i in range(3)]
+    for path in paths:
+        write(path, b"x" * 2048)
+    cache = ResourceCache(mmapThreshold=1024, maxMapped=2)
+
+    first = cache.get(paths[0])
+    assert first.mapped[:4] == b"xxxx"
+    assert cache.get(paths[0]) is first
+    assert cache.currentBytes == 0
+
+    cache.get(paths[1])
+    cache.get(paths[2])
+    # evicted, mapped again
+    assert cache.get(paths[0]) is not first
+
+
+def test_changed_file_is_mapped_again(tmp_path):
+    path = str(tmp_path / "big.bin")
+    write(path, b"x" * 2048)
+    cache = ResourceCache(mmapThreshold=1024)
+    first = cache.get(path)
+
+    write(path, b"y" * 4096)
+    second = cache.get(path)
+    assert second is not first
+    assert second.mapped[:1] == b"y" and len(second.mapped) == 4096
+    assert os.path.getsize(path) == second.size
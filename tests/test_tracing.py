@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import subprocess
+import collections
+
+from myapp import tracing
+
+SCRIPT = """
+import sys
+import threading
+from myapp import tracing
+
+sys.argv = tracing.configure(sys.argv)
+assert sys.argv == ["-c", "--other"], sys.argv
+
+@tracing.traced()
+def work():
+    with tracing.span("inner", "test", size=1):
+        pass
+
+with tracing.span("outer", "test"):
+    work()
+    tracing.begin("load", 1, "page", url="a")
+    tracing.begin("load", 2, "page", url="b")
+    tracing.instant("mark", "test")
+    tracing.end("load", 2, "page")
+
+thread = threading.Thread(target=work, name="worker")
+thread.start()
+thread.join()
+tracing.end("load", 1, "page", ok=True)
+try:
+    with tracing.span("failing", "test"):
+        raise ValueError()
+except ValueError:
+    pass
+"""
+
+
+def run(tmp_path, *args, env=None):
+    environ = dict(os.environ)
+    environ.pop(tracing.ENV_VARIABLE, None)
+    environ.update(env or {})
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environ["PYTHONPATH"] = os.pathsep.join(filter(None, [root, environ.get("PYTHONPATH")]))
+    subprocess.run([sys.executable, "-c", SCRIPT] + list(args), cwd=str(tmp_path),
+                   env=environ, check=True, timeout=60)
+
+
+def test_trace_written_at_exit(tmp_path):
+    path = tmp_path / "trace.json"
+    run(tmp_path, "--other", env={tracing.ENV_VARIABLE: str(path)})
+
+    trace = json.loads(path.read_text())
+    events = trace["traceEvents"]
+    assert trace["displayTimeUnit"] == "ms"
+    for event in events:
+        assert {"ph", "name", "pid", "tid"} <= set(event)
+        if event["ph"] != "M":
+            assert event["ts"] >= 0
+
+    spans = {}
+    for event in events:
+        if event["ph"] == "X":
+            assert event["dur"] >= 0
+            spans.setdefault(event["name"], []).append(event)
+    assert sorted(spans) == ["failing", "inner", "outer", "work"]
+    assert spans["failing"][0]["args"] == {"error": "ValueError"}
+    assert spans["inner"][0]["args"] == {"size": 1}
+
+    # nested spans are inside their parent
+    outer = spans["outer"][0]
+    mainWork = [span for span in spans["work"] if span["tid"] == outer["tid"]][0]
+    assert outer["ts"] <= mainWork["ts"]
+    assert mainWork["ts"] + mainWork["dur"] <= outer["ts"] + outer["dur"]
+
+    # async begin and end events are matched by name and id
+    pending = collections.Counter()
+    for event in events:
+        if event["ph"] == "b":
+            pending[(event["name"], event["id"])] += 1
+        elif event["ph"] == "e":
+            key = (event["name"], event["id"])
+            assert pending[key] > 0, f"{key} ended before it began"
+            pending[key] -= 1
+    assert not +pending
+    assert [e["id"] for e in events if e["ph"] == "b"] == ["1", "2"]
+    assert [e["id"] for e in events if e["ph"] == "e"] == ["2", "1"]
+
+    names = {event["args"]["name"] for event in events if event["ph"] == "M"}
+    assert {"MainThread", "worker"} <= names
+    assert [event["name"] for event in events if event["ph"] == "i"] == ["process start", "mark"]
+
+
+def test_trace_flag(tmp_path):
+    run(tmp_path, "--trace=flag.json", "--other")
+    assert json.loads((tmp_path / "flag.json").read_text())["traceEvents"]
+
+
+def test_disabled_by_default(tmp_path):
+    run(tmp_path, "--other")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disabled_span_is_shared():
+    assert not tracing.enabled()
+    assert tracing.span("a") is tracing.span("b", x=1)
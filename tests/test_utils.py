@@ -0,0 +1,92 @@
+import gc
+
+from myapp.utils import Signal
+
+
+class Subscriber:
+    def __init__(self):
+        self.calls = []
+
+    def handle(self, *args):
+        self.calls.append(args)
+
+
+class Owner:
+    changed = Signal()
+
+
+def test_collected_method_subscriber_is_dropped():
+    signal = Signal()
+    subscriber = Subscriber()
+    signal.connect(subscriber.handle)
+    signal.emit(1)
+    assert subscriber.calls == [(1,)]
+    assert signal.receivers() == 1
+
+    del subscriber
+    gc.collect()
+    assert signal.receivers() == 0
+    assert signal._subscribers == ()
+    signal.emit(2)
+
+
+def test_functions_are_kept_alive():
+    signal = Signal()
+    calls = []
+    signal.connect(lambda value: calls.append(value))
+    gc.collect()
+    signal.emit(1)
+    assert calls == [1]
+
+
+def test_disconnect_during_emit_uses_a_snapshot():
+    signal = Signal()
+    calls = []
+
+    def first():
+        calls.append("first")
+        signal.disconnect(second)
+
+    def second():
+        calls.append("second")
+
+    signal.connect(first)
+    signal.connect(second)
+    signal.emit()
+    assert calls == ["first", "second"]
+
+    calls.clear()
+    signal.connect(second)
+    signal.disconnect(first)
+    signal.emit()
+    assert calls == ["second"]
+
+
+def test_instances_have_their_own_signal():
+    a, b = Owner(), Owner()
+    calls = []
+    a.changed.connect(lambda: calls.append("a"))
+    b.changed.connect(lambda: calls.append("b"))
+    Owner.changed.connect(lambda: calls.append("class"))
+    assert a.changed is a.changed and a.changed is not b.changed
+
+    a.changed.emit()
+    assert calls == ["a"]
+
+
+def test_emit_queued_runs_on_the_event_loop(qapp):
+    signal = Signal()
+    calls = []
+    signal.connect(calls.append)
+
+    signal.emitQueued(1)
+    assert calls == []
+    qapp.processEvents()
+    assert calls == [1]
+
+    queued = Signal(queued=True)
+    queued.connect(calls.append)
+    queued.emit(2)
+    assert calls == [1]
+    qapp.processEvents()
+    assert calls == [1, 2]
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+
+from myapp.WebView import ScriptCache, installScript, minifyCss
+
+
+def test_minify_css_drops_block_semicolons():
+    css = "a { color: red; }\n/* comment */\nb > c { d: e ; }"
+    assert minifyCss(css) == "a{color: red}b>c{d: e}"
+
+
+def test_minify_css_keeps_quoted_strings():
+    assert minifyCss('a::after { content: ";}"; }') == 'a::after{content: ";}"}'
+    assert minifyCss("a { content: ';}' }") == "a{content: ';}'}"
+
+
+class Scripts:
+    """The part of QWebEngineScriptCollection installScript uses."""
+
+    def __init__(self):
+        self.scripts = []
+
+    def findScripts(self, name):
+        return [script for script in self.scripts if script.name() == name]
+
+    def insert(self, script):
+        self.scripts.append(script)
+
+
+def test_script_cache_hit(tmp_path):
+    path = tmp_path / "a.js"
+    path.write_text("var a = 1;")
+    cache = ScriptCache()
+    script = cache.script(str(path), "a", QWebEngineScript.DocumentReady, False)
+    assert script.name() == "a" and "var a = 1;" in script.sourceCode()
+
+    path.write_text("var a = 2;")
+    # served from the cache until the change is noticed
+    assert cache.script(str(path), "a", QWebEngineScript.DocumentReady, False) is script
+    assert cache.script(str(path), "b", QWebEngineScript.DocumentReady, False) is not script
+
+
+def test_script_cache_invalidated_on_change(qapp, tmp_path):
+    path = tmp_path / "a.js"
+    path.write_text("var a = 1;")
+    cache = ScriptCache()
+    script = cache.script(str(path), "a", QWebEngineScript.DocumentReady, False)
+
+    path.write_text("var a = 22;")
+    deadline = time.monotonic() + 5
+    while cache.source(str(path))[1] != "var a = 22;" and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+
+    changed = cache.script(str(path), "a", QWebEngineScript.DocumentReady, False)
+    assert changed is not script and "var a = 22;" in changed.sourceCode()
+
+
+def test_unreadable_script_is_not_installed(tmp_path, caplog):
+    missing = str(tmp_path / "missing.js")
+    assert ScriptCache().script(missing, "missing", QWebEngineScript.DocumentReady, False) is None
+
+    scripts = Scripts()
+    assert not installScript(scripts, missing, "missing", QWebEngineScript.DocumentReady)
+    assert not installScript(scripts, missing, "missing", QWebEngineScript.DocumentReady)
+    assert scripts.scripts == []
+    assert "cannot read script" in caplog.text
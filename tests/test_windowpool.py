@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+
+from PyQt5.QtCore import QUrl
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+
+from myapp.windowpool import WindowPool
+
+
+def waitUntil(qapp, condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+@pytest.fixture
+def pool(application, monkeypatch):
+    """A pool of one window, used by the windows of application when they're closed."""
+    pool = WindowPool(application, size=1, warmDelay=0)
+    monkeypatch.setattr(application, "windowPool", pool)
+    yield pool
+    for window in list(application.windows):
+        window.close()
+    pool.clear()
+    application.processEvents()
+
+
+def test_acquire_prepared_window(application, pool):
+    pool._warm()
+    assert pool.available() == 1
+    prepared = pool.windows()[0]
+    assert prepared.app is None and prepared.bridgeInitialized
+
+    window = pool.acquire()
+    assert window is prepared
+    assert window.app is application and window in application.windows
+    assert (pool.hits, pool.misses) == (1, 0)
+
+    # built on demand while the pool is empty
+    other = pool.acquire()
+    assert other is not window and other.app is application
+    assert (pool.hits, pool.misses) == (1, 1)
+
+
+def test_acquire_other_profile(application, pool):
+    profile = QWebEngineProfile(application)
+    window = pool.acquire(profile)
+    assert window.profile() is profile
+    assert (pool.hits, pool.misses) == (0, 0)
+    # not taken back, the pool only keeps windows of its profile
+    assert not pool.release(window)
+
+
+def test_closed_window_is_recycled(application, pool):
+    window = pool.acquire()
+    closed = []
+    window.onClose.connect(lambda: closed.append(True))
+
+    page = window.webview.page()
+    for i in range(2):
+        window.loadUrl(QUrl(f"data:text/html,<p>{i}</p>"))
+        assert waitUntil(application, lambda: page.history().count() == i + 1)
+    assert page.history().canGoBack()
+
+    window.close()
+    assert closed == [True]
+    assert window not in application.windows
+    assert pool.windows() == [window]
+
+    # reset for the next owner
+    assert window.app is None
+    assert window.onClose.receivers() == 0
+    assert not page.history().canGoBack()
+    assert window.warming
+
+    assert pool.acquire() is window
+    assert window.app is application
+    assert pool.hits == 1
+
+
+def test_release_when_full_or_disabled(application, pool):
+    window = pool.acquire()
+    pool._warm()
+    assert pool.available() == 1
+    assert not pool.release(window)
+
+    pool.recycle = False
+    pool.clear()
+    assert not pool.release(window)
+    assert pool.available() == 0